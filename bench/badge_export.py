@@ -0,0 +1,65 @@
+"""
+Bulk badge export: render-everything-into-memory vs run_export (cold,
+resumed after losing part of the cache, warm)
+
+Run from the repository root: python -m bench.badge_export [count]
+"""
+
+import time
+import zipfile
+from pathlib import Path
+
+from lib.badge_export import MAX_WORKERS, BadgeExport, run_export
+from lib.badges import badge_payload
+
+
+def benchmark(count: int = 400, size: int = 300) -> None:
+    import io
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    from lib.badges import render_badge
+
+    rows = [(f"{i}.0", f"Delegate {i}", f"Organization {i % 37}", "Delegate") for i in range(count)]
+    tmp = Path(tempfile.mkdtemp(prefix="badge-export-"))
+    try:
+        start = time.perf_counter()
+        images = {row[0]: render_badge(badge_payload(*row[:3]), row[0], row[2], row[3], size) for row in rows}
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+            for delegate_id, img in images.items():
+                png = io.BytesIO()
+                img.save(png, format="PNG")
+                zf.writestr(f"badge_qr_{delegate_id}.png", png.getvalue())
+        legacy = time.perf_counter() - start
+        # PIL pixel buffers are invisible to tracemalloc; count them directly
+        held = sum(img.width * img.height * len(img.getbands()) for img in images.values()) + len(buffer.getvalue())
+        del images, buffer
+
+        def timed(label: str) -> None:
+            job = BadgeExport(job_id=label, path=tmp / f"badges_{label}.zip", total=len(rows))
+            tracemalloc.start()
+            start = time.perf_counter()
+            run_export(job, rows, size, cache_dir=str(tmp / "cache"))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {label:<8} {elapsed * 1000:8.0f} ms  peak {peak / 2 ** 20:6.1f} MiB  "
+                  f"rendered {job.rendered}/{job.total}  ({job.status})")
+
+        print(f"{count} badges, {MAX_WORKERS} workers")
+        print(f"  {'legacy':<8} {legacy * 1000:8.0f} ms  holds {held / 2 ** 20:6.1f} MiB (images + ZIP buffer)")
+        timed("cold")
+        # Simulate an interrupted job: drop a third of the cache and re-run
+        for path in list((tmp / "cache").rglob("*.png"))[: count // 3]:
+            path.unlink()
+        timed("resume")
+        timed("warm")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,47 @@
+"""
+Print-ready badge sheets: cold and warm PDF builds, and the traced
+memory of the layout pass alone
+
+Run from the repository root: python -m bench.badge_sheets [count]
+"""
+
+import time
+from pathlib import Path
+
+from lib.badge_export import MAX_WORKERS, BadgeExport, render_badges
+from lib.badge_sheets import SheetLayout, run_sheets, write_sheets
+
+
+def benchmark(count: int = 2000, size: int = 300) -> None:
+    import shutil
+    import tempfile
+    import tracemalloc
+
+    categories = ["Delegate", "VIP", "Government Official", "Secretariat", "Exhibitor", "Speaker"]
+    rows = [(f"{i}.0", f"Delegate {i}", f"Organization {i % 37}", "Delegate") for i in range(count)]
+    labels = [categories[i % len(categories)] for i in range(count)]
+    tmp = Path(tempfile.mkdtemp(prefix="badge-sheets-"))
+    try:
+        print(f"{count} badges, {MAX_WORKERS} workers")
+        for label in ("cold", "warm"):
+            job = BadgeExport(job_id=label, path=tmp / f"sheets_{label}.pdf", total=count)
+            start = time.perf_counter()
+            run_sheets(job, rows, labels, SheetLayout(), size, cache_dir=str(tmp / "cache"))
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<5} {elapsed:7.1f} s  rendered {job.rendered:5d}  "
+                  f"{job.path.stat().st_size / 2 ** 20:6.1f} MiB PDF  ({job.status} {job.error or ''})")
+        # Layout alone, traced: memory stays flat however many pages there are
+        paths = [p for _, p, _ in sorted(render_badges(rows, size, str(tmp / "cache")))]
+        tracemalloc.start()
+        with open(tmp / "traced.pdf", "wb") as fp:
+            pages = write_sheets(fp, zip(paths, labels), SheetLayout())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  layout of {pages} pages: peak {peak / 2 ** 20:.1f} MiB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:2]))
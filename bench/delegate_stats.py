@@ -0,0 +1,86 @@
+"""
+Admin statistics: the legacy per-rerun aggregation vs DelegateStats
+snapshots (cold, unchanged, after each door scan)
+
+Run from the repository root: python -m bench.delegate_stats [delegates] [scans]
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from checkin_log import CheckinLog
+from lib.delegate_stats import DAYS, DelegateStats
+
+
+def benchmark(delegates: int = 5000, scans: int = 2000) -> None:
+    import shutil
+    import tempfile
+
+    df = pd.DataFrame({
+        "ID": [f"{i}.0" for i in range(delegates)],
+        "Name": [f"Delegate {i}" for i in range(delegates)],
+        "Category": [f"Category {i % 9}" for i in range(delegates)],
+        "Organization": [f"Organization {i % 400}" for i in range(delegates)],
+        "Nationality": [("Zambian", "South African", "")[i % 3] for i in range(delegates)],
+        "CheckedIn": [i % 4 == 0 for i in range(delegates)],
+        **{f"Day{d}_CheckIn": [i % (d + 1) == 0 for i in range(delegates)] for d in DAYS},
+    })
+
+    class Store:
+        def frame(self):
+            return df
+
+        def version(self):
+            return 1
+
+    def norm(value) -> str:
+        text = str(value).strip()
+        return text[:-2] if text.endswith(".0") else text
+
+    def legacy() -> None:
+        frame = df.copy()           # load_staff_df hands out a fresh copy on every rerun
+        frame["Category"].value_counts()
+        frame["Organization"].value_counts().head(10)
+        frame["Nationality"].value_counts()
+        len(frame[frame["CheckedIn"] == True])  # noqa: E712
+        for d in DAYS:
+            len(frame[frame[f"Day{d}_CheckIn"] == True])  # noqa: E712
+
+    tmp = Path(tempfile.mkdtemp(prefix="delegate-stats-"))
+    try:
+        log = CheckinLog(tmp / "checkin_events.jsonl", norm, compact_every=0, compact_after=10 ** 9)
+        store = Store()
+        stats = DelegateStats(lambda: store, log, norm)
+
+        def timed(label: str, fn, repeat: int = 20) -> None:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            print(f"  {label:<22} {(time.perf_counter() - start) / repeat * 1000:8.2f} ms")
+
+        print(f"{delegates} delegates")
+        timed("legacy rerun", legacy)
+        timed("snapshot (cold)", lambda: DelegateStats(lambda: store, log, norm).snapshot(), 3)
+        timed("snapshot (unchanged)", stats.snapshot)
+
+        # Door stations write between reruns; time only the dashboard side
+        elapsed = 0.0
+        for i in range(20):
+            log.append(f"{i}.0", 1 + i % 5, True, "door")
+            start = time.perf_counter()
+            stats.snapshot()
+            elapsed += time.perf_counter() - start
+        print(f"  {'snapshot after a scan':<22} {elapsed / 20 * 1000:8.2f} ms")
+        log.append_many([f"{i}.0" for i in range(scans)], 2, True, "door")
+        snap = stats.snapshot()
+        print(f"  after {scans} scans: day 2 rate {snap.day_rates[2]:.1%}, "
+              f"{int(snap.arrivals.to_numpy().sum())} arrivals in {len(snap.arrivals)} buckets")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:3]))
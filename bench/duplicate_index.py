@@ -0,0 +1,90 @@
+"""
+Fuzzy duplicate detection on synthetic delegate lists with planted
+near-duplicates: index build, bulk scoring, recall of the planted rows
+and a difflib double loop for comparison
+
+Run from the repository root: python -m bench.duplicate_index [existing] [incoming]
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from lib.duplicate_index import DuplicateIndex
+
+
+def synthetic(n_existing: int, n_incoming: int, seed: int = 7) -> Tuple[List[Dict], List[Dict], Dict[int, int]]:
+    rng = np.random.default_rng(seed)
+    first = ["John", "Mary", "Peter", "Grace", "Joseph", "Esther", "Moses", "Ruth", "Daniel", "Agnes",
+             "Chanda", "Mwila", "Bwalya", "Mulenga", "Lungu", "Phiri", "Tembo", "Zulu", "Sakala", "Mumba"]
+    last = [f"{a}{b}" for a in ("Ba", "Mu", "Ka", "Chi", "Nko", "Si", "Lu", "Mwa", "Ze", "Ngo")
+            for b in ("nda", "lenga", "bwe", "sanga", "mo", "tembo", "weme", "shiba", "yumba", "pande")]
+    orgs = ["Ministry of Mines and Minerals Development", "Ministry of Finance and National Planning",
+            "Zambia Chamber of Mines", "Bank of Zambia", "Zambia Revenue Authority"] + \
+           [f"Mining Company {i} Limited" for i in range(200)]
+    existing = [{"ID": str(i + 1), "Name": f"{rng.choice(first)} {rng.choice(last)} {rng.choice(last)}",
+                 "Organization": str(rng.choice(orgs)), "Email": f"user{i}@example.org" if i % 3 else "",
+                 "Phone": ""} for i in range(n_existing)]
+
+    def variant(name: str, org: str) -> Tuple[str, str]:
+        words = name.split()
+        kind = rng.integers(4)
+        if kind == 0:
+            name = f"{words[-1]}, {' '.join(words[:-1])}"                 # reordered
+        elif kind == 1:
+            name = "  ".join(words).upper()                              # spacing / case
+        elif kind == 2:
+            w = words[1]
+            name = " ".join([words[0], w[:2] + w[3:]] + words[2:])       # dropped letter
+        else:
+            name = "Dr. " + name
+        org = org.replace("Ministry of", "Min. of").replace(" and Minerals Development", "").replace("Limited", "Ltd")
+        return name, org
+
+    incoming, planted = [], {}
+    for i in range(n_incoming):
+        if i % 4 == 0:
+            j = int(rng.integers(n_existing))
+            name, org = variant(existing[j]["Name"], existing[j]["Organization"])
+            planted[i] = j
+        else:
+            name, org = f"{rng.choice(first)} {rng.choice(last)} {rng.choice(last)}", str(rng.choice(orgs))
+        incoming.append({"Name": name, "Organization": org, "Email": "", "Phone": ""})
+    return existing, incoming, planted
+
+
+def benchmark(n_existing: int = 10000, n_incoming: int = 10000) -> None:
+    import difflib
+    import time
+
+    existing, incoming, planted = synthetic(n_existing, n_incoming)
+    start = time.perf_counter()
+    index = DuplicateIndex(existing)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    results = index.score(incoming)
+    scored = time.perf_counter() - start
+
+    found = sum(1 for i, j in planted.items() if any(c.position == j for c in results[i]))
+    likely = sum(1 for i, j in planted.items() if results[i] and results[i][0].position == j and results[i][0].likely)
+    false_likely = sum(1 for i, r in enumerate(results) if i not in planted and r and r[0].likely)
+
+    # A Python double loop with difflib, timed on a slice and extrapolated
+    sample = incoming[:5]
+    start = time.perf_counter()
+    for r in sample:
+        for e in existing:
+            difflib.SequenceMatcher(None, r["Name"].lower(), e["Name"].lower()).ratio()
+    naive = (time.perf_counter() - start) / len(sample) * len(incoming)
+
+    print(f"{n_incoming} incoming x {n_existing} existing")
+    print(f"  index build   {built * 1000:8.0f} ms")
+    print(f"  bulk scoring  {scored * 1000:8.0f} ms")
+    print(f"  naive loop    {naive:8.0f} s (extrapolated from {len(sample)} rows)")
+    print(f"  planted near-duplicates: {len(planted)}, found in top-3 {found}, "
+          f"ranked first as likely {likely}; unrelated rows flagged likely: {false_likely}")
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:3]))
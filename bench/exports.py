@@ -0,0 +1,63 @@
+"""
+Excel workbook export: pandas ExcelWriter into memory vs the cached
+write-only artifact (cold and warm), with tracemalloc peaks
+
+Run from the repository root: python -m bench.exports [rows]
+"""
+
+import io
+
+import pandas as pd
+
+from lib.exports import data_version, frame_version, xlsx_artifact
+
+
+def benchmark(rows: int = 20000) -> None:
+    import shutil
+    import tempfile
+    import time
+    import tracemalloc
+
+    df = pd.DataFrame({
+        "ID": [str(i) for i in range(rows)],
+        "Name": [f"Delegate {i}" for i in range(rows)],
+        "Category": [f"Category {i % 9}" for i in range(rows)],
+        "Organization": [f"Organization {i % 400}" for i in range(rows)],
+        "Email": [f"delegate{i}@example.org" for i in range(rows)],
+        "CheckedIn": [i % 3 == 0 for i in range(rows)],
+    })
+
+    def sheets():
+        yield "All Delegates", df
+        for category, group in df.groupby("Category"):
+            yield f"Delegates - {category}", group
+        yield "Stats - By Organization", df.groupby("Organization").agg(Count=("ID", "count")).reset_index()
+
+    def legacy(_):
+        out = io.BytesIO()
+        with pd.ExcelWriter(out, engine="openpyxl") as writer:
+            for title, frame in sheets():
+                frame.to_excel(writer, sheet_name=title, index=False)
+        out.getvalue()
+
+    tmp = tempfile.mkdtemp(prefix="exports-")
+    try:
+        version = data_version(frame_version(df))
+        print(f"{rows} delegates")
+        for label, fn in (("legacy", legacy),
+                          ("cold", lambda d: xlsx_artifact("workbook", version, sheets, d)),
+                          ("warm", lambda d: xlsx_artifact("workbook", data_version(frame_version(df)), sheets, d))):
+            tracemalloc.start()
+            start = time.perf_counter()
+            fn(tmp)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"  {label:<7} {elapsed * 1000:8.0f} ms  peak {peak / 2 ** 20:6.1f} MiB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(*(int(a) for a in sys.argv[1:2]))
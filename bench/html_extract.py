@@ -0,0 +1,84 @@
+"""
+HTML extraction: the old parse-per-extraction scraping vs lib.html_extract
+(cold and warm caches), on saved pages or synthetic WordPress-like ones
+
+Run from the repository root: python -m bench.html_extract [page.html ...]
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+from lib.html_extract import (CONTENT_SELECTORS, PARSER, clear_caches, extract_page, extract_selector,
+                              images_html)
+
+
+def fixture(sections: int) -> bytes:
+    """A WordPress-like page: heavy header/nav, a content block and a footer"""
+    nav = "".join(f'<li><a href="/p{i}">Menu item {i}</a></li>' for i in range(80))
+    posts = "".join(
+        f'<div class="post"><h2>Session {i}</h2><p>Speaker {i} on mining investment, '
+        f'beneficiation and the energy transition in the region.</p>'
+        f'<img src="/wp-content/uploads/{i}.jpg" alt="Photo {i}"></div>'
+        for i in range(sections)
+    )
+    return (f'<html><head><title>Insaka Summit</title><style>body{{color:#000}}</style>'
+            f'<script>var x = 1;</script></head><body><header><nav><ul>{nav}</ul></nav></header>'
+            f'<div class="entry-content">{posts}</div><footer>Footer</footer></body></html>').encode()
+
+
+def benchmark(paths: List[str]) -> None:
+    fixtures: List[Tuple[str, bytes]] = []
+    for path in paths:
+        with open(path, "rb") as f:
+            fixtures.append((path, f.read()))
+    if not fixtures:
+        fixtures = [(f"synthetic-{n}", fixture(n)) for n in (20, 200, 1000)]
+
+    def legacy(content: bytes, url: str) -> None:
+        soup = BeautifulSoup(content, 'html.parser')
+        soup.find('title')
+        main = None
+        for selector in CONTENT_SELECTORS:
+            main = soup.select_one(selector)
+            if main:
+                break
+        main = main or soup.find('body')
+        images_html([main], url)
+        for tag in main(["script", "style", "nav", "header", "footer"]):
+            tag.decompose()
+        ' '.join(main.get_text().split())
+        for selector in ('.exhibitor-logo, .sponsor-logo, .company-logo, .logo, img', '.schedule, .agenda'):
+            BeautifulSoup(content, 'html.parser').select(selector)
+
+    def current(content: bytes, url: str) -> None:
+        extract_page(content, url)
+        extract_selector(content, url, '.exhibitor-logo, .sponsor-logo, .company-logo, .logo, img', False)
+        extract_selector(content, url, '.schedule, .agenda')
+
+    print(f"parser: {PARSER}")
+    for name, content in fixtures:
+        url = "https://example.org/page"
+        row = [f"{name} ({len(content) // 1024} KiB)"]
+        for label, fn in (("legacy", legacy), ("cold", current), ("warm", current)):
+            if label == "cold":
+                clear_caches()
+            start = time.perf_counter()
+            fn(content, url)
+            elapsed = time.perf_counter() - start
+            # Memory is measured on a separate run; tracing distorts the timing
+            if label == "cold":
+                clear_caches()
+            tracemalloc.start()
+            fn(content, url)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            row.append(f"{label} {elapsed * 1000:7.1f} ms / {peak / 2 ** 20:5.1f} MiB")
+        print("  " + " | ".join(row))
+
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1:])
@@ -0,0 +1,70 @@
+"""
+Concurrent fetching: the same slow sources fetched one after another, in
+one batch with fetch_all, and in a batch whose budget runs out first
+
+Runs against a local stub server, from the repository root:
+python -m bench.multi_fetch
+"""
+
+import http.server
+import os
+import threading
+import time
+from typing import List
+
+os.environ.setdefault("INSAKA_HTTP_CACHE_DIR", "")
+
+from lib.http_cache import HttpCache  # noqa: E402
+from lib.multi_fetch import FetchJob, fetch_all  # noqa: E402
+
+
+def benchmark(sources: int = 6, delay: float = 0.4, budget: float = 5.0) -> None:
+    class SlowHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = f"<html><title>{self.path}</title><main>source {self.path}</main></html>".encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up (budget run)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    def make_jobs(cache: HttpCache) -> List[FetchJob]:
+        return [FetchJob(f"s{i}", f"{base}/s{i}",
+                         lambda remaining, url=f"{base}/s{i}": {'success': True, 'status': cache.get(url, ttl=0, timeout=remaining).status_code})
+                for i in range(sources)]
+
+    start = time.perf_counter()
+    for job in make_jobs(HttpCache(disk_dir=None)):
+        job.run(budget)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = fetch_all(make_jobs(HttpCache(disk_dir=None)), budget=budget, per_host=sources)
+    concurrent = time.perf_counter() - start
+    ok = sum(r.get('success', False) for r in results.values())
+
+    start = time.perf_counter()
+    partial = fetch_all(make_jobs(HttpCache(disk_dir=None)), budget=delay / 2, per_host=sources)
+    cut = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"{sources} sources, {delay * 1000:.0f} ms each")
+    print(f"  sequential: {sequential * 1000:7.0f} ms")
+    print(f"  concurrent: {concurrent * 1000:7.0f} ms  ({ok}/{sources} ok, {sequential / concurrent:.1f}x)")
+    print(f"  budget {delay / 2 * 1000:.0f} ms: returned after {cut * 1000:.0f} ms with "
+          f"{sum(not r.get('success') for r in partial.values())} timed-out sources")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,26 @@
+"""
+Translation lookups: get_translation vs a shared Translator and
+Translator.many, per key over the whole English catalog
+
+Run from the repository root: python -m bench.translations
+"""
+
+import timeit
+
+from lib.translations import DEFAULT_LANGUAGE, get_translation, get_translator, load_catalog
+
+
+def benchmark(language: str = "fr", runs: int = 200) -> None:
+    keys = list(load_catalog(DEFAULT_LANGUAGE))
+    t = get_translator(language)
+    for label, fn in (
+        ("get_translation", lambda: [get_translation(k, language) for k in keys]),
+        ("Translator()", lambda: [t(k) for k in keys]),
+        ("Translator.many", lambda: t.many(keys)),
+    ):
+        per_call = min(timeit.repeat(fn, number=runs, repeat=5)) / (runs * len(keys))
+        print(f"{label:24s} {per_call * 1e9:6.0f} ns/key")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,180 @@
+# checkin_log.py
+"""
+Append-only log of daily check-in events.
+
+Each scan is one JSON line (delegate_id, day, checked, timestamp, station)
+appended and fsync'd to data/checkin_events.jsonl. The current state is a
+fold over the log held in memory; a background compactor periodically
+writes that state back into the delegate table through staff_service and
+moves the compacted log into data/checkin_archive/ so the audit trail is
+kept. Scans never compact inline: once compact_after entries are pending
+they wake the compactor early.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import datetime as dt
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from lib.jsonl_store import JsonlTail, append_records, file_lock
+
+_LOG = logging.getLogger(__name__)
+
+# Day number of the event-wide check-in (the CheckedIn flag); days 1-5 are the daily ones
+EVENT_DAY = 0
+
+# (normalized delegate id, day) -> checked
+CheckinState = Dict[Tuple[str, int], bool]
+
+
+class CheckinLog:
+    def __init__(self, path: Path, id_key: Callable[[object], str],
+                 compact_every: float = 60.0, compact_after: int = 500):
+        self.path = Path(path)
+        self.archive_dir = self.path.parent / "checkin_archive"
+        self.lock_path = self.path.with_suffix(".lock")
+        self.id_key = id_key
+        self.compact_every = compact_every
+        self.compact_after = compact_after
+        self._lock = threading.RLock()
+        self._state: CheckinState = {}
+        self._version = 0
+        self._tail = JsonlTail(self.path)
+        self._compactor: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self.last_error: Optional[str] = None   # latest background compaction failure, None once one succeeds
+        self._apply: Optional[Callable[[CheckinState], None]] = None
+
+    # --- folding -------------------------------------------------------------
+
+    def _catch_up(self) -> None:
+        """Fold any events appended since the last read (including by other processes)."""
+        restarted, events = self._tail.read_new()
+        if restarted or events:
+            self._version += 1
+        if restarted:
+            # The log was rotated by a compaction: start over on the new file
+            self._state = {}
+        for ev in events:
+            try:
+                self._state[(self.id_key(ev["delegate_id"]), int(ev["day"]))] = bool(ev["checked"])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    def state(self) -> CheckinState:
+        """Pending (not yet compacted) check-in state."""
+        with self._lock:
+            self._catch_up()
+            return dict(self._state)
+
+    def version(self) -> int:
+        """Changes whenever the pending state may have changed (new events or a compaction)."""
+        with self._lock:
+            self._catch_up()
+            return self._version
+
+    def get(self, delegate_id, day: int) -> Optional[bool]:
+        with self._lock:
+            self._catch_up()
+            return self._state.get((self.id_key(delegate_id), int(day)))
+
+    # --- writing -------------------------------------------------------------
+
+    def append(self, delegate_id, day: int, checked: bool, station: str = "") -> dict:
+        return self.append_many([delegate_id], day, checked, station)[0]
+
+    def append_many(self, delegate_ids: List, day: int, checked: bool, station: str = "") -> List[dict]:
+        """Append one event per ID with a single write + fsync."""
+        now = dt.datetime.now().isoformat(timespec="seconds")
+        events = [
+            {
+                "delegate_id": str(i),
+                "day": int(day),
+                "checked": bool(checked),
+                "timestamp": now,
+                "station": station or "",
+            }
+            for i in delegate_ids
+        ]
+        if not events:
+            return []
+        with self._lock, file_lock(self.lock_path):
+            self._catch_up()
+            append_records(self.path, events)
+            # Fold what we just wrote so we do not re-read it
+            self._catch_up()
+            pending = len(self._state)
+        self._ensure_compactor()
+        if pending >= self.compact_after:
+            self._wake.set()   # compacting here would rewrite the table inside the scan
+        return events
+
+    # --- compaction ----------------------------------------------------------
+
+    def set_compaction_target(self, apply: Callable[[CheckinState], None]) -> None:
+        """apply(state) must persist the folded state into the delegate table."""
+        self._apply = apply
+
+    def compact(self) -> int:
+        """
+        Write the folded state into the delegate table and archive the log.
+        Returns the number of (delegate, day) entries compacted.
+        """
+        if self._apply is None:
+            return 0
+        with self._lock, file_lock(self.lock_path):
+            self._catch_up()
+            if not self._state:
+                return 0
+            snapshot = dict(self._state)
+            self._apply(snapshot)
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            stamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            os.replace(self.path, self.archive_dir / f"checkin_events_{stamp}.jsonl")
+            self._state = {}
+            self._version += 1
+            self._tail.reset()
+            return len(snapshot)
+
+    def _ensure_compactor(self) -> None:
+        if self._compactor is not None or self.compact_every <= 0:
+            return
+        with self._lock:
+            if self._compactor is not None:
+                return
+
+            def run():
+                while True:
+                    self._wake.wait(self.compact_every)
+                    self._wake.clear()
+                    try:
+                        self.compact()
+                        self.last_error = None
+                    except Exception as e:
+                        self.last_error = str(e)
+                        _LOG.exception("Check-in log compaction failed")
+
+            self._compactor = threading.Thread(target=run, name="checkin-compactor", daemon=True)
+            self._compactor.start()
+
+    # --- audit trail ---------------------------------------------------------
+
+    def history(self, delegate_id=None) -> List[dict]:
+        """All events (archived and pending), oldest first, optionally for one delegate."""
+        key = self.id_key(delegate_id) if delegate_id is not None else None
+        files = sorted(self.archive_dir.glob("checkin_events_*.jsonl")) if self.archive_dir.exists() else []
+        if self.path.exists():
+            files.append(self.path)
+        events = []
+        for f in files:
+            with open(f, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        continue
+                    if key is None or self.id_key(ev.get("delegate_id", "")) == key:
+                        events.append(ev)
+        return events
@@ -1,19 +1,77 @@
 # door_check.py (optional page)
 import streamlit as st
-from staff_service import load_staff_df, set_checked_in
+from staff_service import load_staff_df, set_checked_in, bulk_daily_checkin, delegate_key
+from lib.qr_system import normalize_qr_payload
 
 st.title("Complimentary Pass Check-in")
-q = st.text_input("Search name/org")
-df = load_staff_df()
-if q.strip():
-    qq = q.lower().strip()
-    df = df[
-        df["Name"].str.lower().str.contains(qq, na=False) |
-        df["Organization"].str.lower().str.contains(qq, na=False)
-    ]
-st.dataframe(df, width='stretch', height=420)
-
-picked = st.multiselect("Select IDs to mark checked-in", options=df["ID"].tolist())
-if st.button("Check-in Selected"):
-    upd, nf = set_checked_in(picked, True)
-    st.success(f"Checked-in {upd}; Not found {nf}")
+
+col_target, col_station = st.columns(2)
+with col_target:
+    target = st.selectbox("Check in for", ["Event", "Day 1", "Day 2", "Day 3", "Day 4", "Day 5"])
+with col_station:
+    station = st.text_input("Station name", value="door", help="Recorded with each check-in")
+
+def _commit(ids):
+    """One check-in log append for the given IDs. Returns (updated, not_found)."""
+    if target == "Event":
+        return set_checked_in(ids, True, station=station)
+    return bulk_daily_checkin(ids, int(target.split()[-1]), True, station=station)
+
+mode = st.radio("Mode", ["Search & select", "Continuous scan"], horizontal=True)
+
+if mode == "Continuous scan":
+    # Every scan is appended to the check-in log as it arrives, so closing the tab
+    # never loses one; compaction batches the table writes and only the on-screen
+    # summary is batched here
+    st.session_state.setdefault("scan_tally", {"checked_in": 0, "not_found": 0, "repeats": 0})
+    st.session_state.setdefault("scan_recent", [])
+    st.session_state.setdefault("scan_seen", set())
+
+    def _on_scan():
+        raw = st.session_state.scan_input.strip()
+        st.session_state.scan_input = ""
+        if not raw:
+            return
+        # Accept either a badge QR payload or a bare delegate ID
+        _, payload = normalize_qr_payload(raw)
+        if isinstance(payload, dict) and payload.get("delegate_id"):
+            raw = str(payload["delegate_id"])
+        tally = st.session_state.scan_tally
+        seen = (target, delegate_key(raw))
+        if seen in st.session_state.scan_seen:
+            tally["repeats"] += 1  # repeat scans of the same badge count once
+        else:
+            upd, nf = _commit([raw])
+            tally["checked_in"] += upd
+            tally["not_found"] += nf
+            if upd:
+                st.session_state.scan_seen.add(seen)
+        st.session_state.scan_recent = (st.session_state.scan_recent + [raw])[-20:]
+
+    st.text_input("Scan badge QR or type an ID, then press Enter", key="scan_input", on_change=_on_scan)
+
+    tally = st.session_state.scan_tally
+    st.success(f"This session: checked-in {tally['checked_in']}; not found {tally['not_found']}; "
+               f"repeat scans {tally['repeats']}")
+    if st.session_state.scan_recent:
+        st.write("Recent scans: " + ", ".join(reversed(st.session_state.scan_recent)))
+    if st.button("Reset session counts"):
+        st.session_state.scan_tally = {"checked_in": 0, "not_found": 0, "repeats": 0}
+        st.session_state.scan_recent = []
+        st.session_state.scan_seen = set()
+        st.rerun()
+else:
+    q = st.text_input("Search name/org")
+    df = load_staff_df()
+    if q.strip():
+        qq = q.lower().strip()
+        df = df[
+            df["Name"].str.lower().str.contains(qq, na=False) |
+            df["Organization"].str.lower().str.contains(qq, na=False)
+        ]
+    st.dataframe(df, width='stretch', height=420)
+
+    picked = st.multiselect("Select IDs to mark checked-in", options=df["ID"].tolist())
+    if st.button("Check-in Selected"):
+        upd, nf = _commit(picked)
+        st.success(f"Checked-in {upd}; Not found {nf}")
@@ -0,0 +1,296 @@
+"""
+Compiled agenda for Insaka Conference App
+
+data/agenda.json is parsed once per file change into typed sessions with
+start/end minutes and a normalized (month, day) key, sorted per day. Each
+day keeps an interval index (starts plus a running maximum of ends), so
+"what is on now", "current + next N" and "which sessions overlap this
+meeting" are bisects with no file reads or time-string parsing per render.
+"""
+
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+AGENDA_FILE = "data/agenda.json"
+DEFAULT_START = 540       # 09:00 when a time cannot be parsed
+SESSION_MINUTES = 60      # length of a session that only lists a start time
+_CHECK_INTERVAL = 2.0     # seconds between checks for a changed agenda file
+
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DAY_RE = re.compile(r"(\d{1,2})\s+([A-Za-z]{3})")
+_TIME_RE = re.compile(r"(\d{1,2})[:.](\d{2})\s*([AP]M)?")
+
+DayKey = Tuple[int, int]  # (month, day); agenda labels such as "Mon 6 Oct" carry no year
+
+
+def _to_minutes(hour: int, minute: int, meridiem: Optional[str]) -> Optional[int]:
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "PM" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
+
+
+def parse_time_range(time_str) -> Tuple[int, int]:
+    """
+    (start, end) minutes since midnight for "09:30", "9:30 AM",
+    "07:00 - 13:00", "9:00 to 10:30 AM" and similar. A missing or
+    unreadable end gives a SESSION_MINUTES session; an unreadable start
+    falls back to DEFAULT_START.
+    """
+    matches = _TIME_RE.findall(str(time_str).upper())
+    if not matches:
+        return DEFAULT_START, DEFAULT_START + SESSION_MINUTES
+    (h1, m1, ap1) = matches[0]
+    end, ap2 = None, ""
+    if len(matches) > 1:
+        h2, m2, ap2 = matches[1]
+        end = _to_minutes(int(h2), int(m2), ap2 or None)
+    if ap1:
+        start = _to_minutes(int(h1), int(m1), ap1)
+    else:
+        start = _to_minutes(int(h1), int(m1), None)
+        if ap2 and end is not None and 1 <= int(h1) <= 12:
+            # The start shares the end's AM/PM only when that keeps it within the 12 hours
+            # before the end ("9:00 - 10:30 AM"); otherwise it is a morning start
+            # ("8:00 - 5:00 PM", "11:00 - 1:00 PM")
+            start = _to_minutes(int(h1), int(m1), ap2)
+            if start is None or not end - 720 <= start < end:
+                start = _to_minutes(int(h1), int(m1), "AM")
+    if start is None:
+        return DEFAULT_START, DEFAULT_START + SESSION_MINUTES
+    if end is not None and end <= start and not ap2 and end + 720 > start:
+        end += 720  # "11:30 - 1:00" written on a 12-hour clock
+    if end is None or end <= start:
+        end = start + SESSION_MINUTES
+    return start, end
+
+
+def parse_start_minutes(time_str) -> int:
+    """Minutes since midnight for the start of a session time"""
+    return parse_time_range(time_str)[0]
+
+
+def parse_day_key(day_label) -> Optional[DayKey]:
+    """(month, day) for labels like "Mon 6 Oct"; None for "UNASSIGNED"/"TBA" """
+    match = _DAY_RE.search(str(day_label))
+    if not match or match.group(2).lower() not in _MONTHS:
+        return None
+    return _MONTHS[match.group(2).lower()], int(match.group(1))
+
+
+@dataclass
+class Session:
+    day: str
+    day_key: Optional[DayKey]
+    start: int
+    end: int
+    item: Dict
+    people: str = ""  # lower-cased speakers and facilitators, for name matching
+
+
+class _DayIntervals:
+    """
+    Sessions of one day sorted by start, with a running maximum of their
+    end times so overlap queries can stop scanning as soon as no earlier
+    session can still be running.
+    """
+
+    def __init__(self, sessions: List[Session]):
+        self.sessions = sessions
+        self.starts = [s.start for s in sessions]
+        self.max_end = []
+        running = -1
+        for s in sessions:
+            running = max(running, s.end)
+            self.max_end.append(running)
+
+    def overlapping(self, start: int, end: int) -> List[Session]:
+        """Sessions intersecting [start, end), earliest start first"""
+        hi = bisect.bisect_left(self.starts, end)
+        found = []
+        for i in range(hi - 1, -1, -1):
+            if self.max_end[i] <= start:
+                break
+            if self.sessions[i].end > start:
+                found.append(self.sessions[i])
+        found.reverse()
+        return found
+
+
+class AgendaIndex:
+    """Sessions grouped by day label and by (month, day), each sorted by start time"""
+
+    def __init__(self, items: List[Dict]):
+        self.items = items
+        self.sessions: List[Session] = []
+        for item in items:
+            start, end = parse_time_range(item.get("time", "09:00"))
+            people = [str(p) for p in (item.get("speakers") or []) + (item.get("facilitators") or []) if p]
+            self.sessions.append(Session(
+                day=item.get("day", "TBA"),
+                day_key=parse_day_key(item.get("day", "")),
+                start=start,
+                end=end,
+                item=item,
+                people=" | ".join(people).lower(),
+            ))
+        # Stable sort: sessions at the same time keep their file order
+        self.by_start = sorted(self.sessions, key=lambda s: s.start)
+        by_label: Dict[str, List[Session]] = {}
+        by_date: Dict[DayKey, List[Session]] = {}
+        for s in self.by_start:
+            by_label.setdefault(s.day, []).append(s)
+            if s.day_key is not None:
+                by_date.setdefault(s.day_key, []).append(s)
+        self.by_label = {k: _DayIntervals(v) for k, v in by_label.items()}
+        self.by_date = {k: _DayIntervals(v) for k, v in by_date.items()}
+
+    def days(self) -> List[str]:
+        return sorted(self.by_label)
+
+    def day_items(self, day: str) -> List[Dict]:
+        day_index = self.by_label.get(day)
+        return [s.item for s in day_index.sessions] if day_index else []
+
+    def _day(self, day) -> Optional[_DayIntervals]:
+        """Day by agenda label ("Mon 6 Oct"), (month, day) key, or date/datetime"""
+        if isinstance(day, str):
+            return self.by_label.get(day) or self.by_date.get(parse_day_key(day))
+        if isinstance(day, tuple):
+            return self.by_date.get(day)
+        return self.by_date.get((day.month, day.day))
+
+    def overlapping(self, day, start: int, end: int) -> List[Dict]:
+        """Agenda items on `day` that intersect [start, end) minutes"""
+        day_index = self._day(day)
+        return [s.item for s in day_index.overlapping(start, end)] if day_index else []
+
+    def sessions_for_person(self, name: str) -> List[Session]:
+        """Sessions where `name` is listed as a speaker or facilitator"""
+        name = str(name or "").strip().lower()
+        if len(name) < 3:
+            return []
+        return [s for s in self.by_start if name in s.people]
+
+    def current_and_next(self, now: datetime, count: int = 2) -> Tuple[Optional[Dict], List[Dict]]:
+        """The session in progress at `now` (if any) and the next `count` sessions that day"""
+        day_index = self.by_date.get((now.month, now.day))
+        if day_index is None:
+            # Nothing scheduled today: show the earliest sessions of the event
+            return None, [s.item for s in self.by_start[:count]]
+        minutes = now.hour * 60 + now.minute
+        sessions = day_index.sessions
+        running = day_index.overlapping(minutes, minutes + 1)
+        if running:
+            # Earliest-started session still in progress
+            idx = sessions.index(running[0])
+            return running[0].item, [s.item for s in sessions[idx + 1:idx + 1 + count]]
+        started = bisect.bisect_right(day_index.starts, minutes)
+        return None, [s.item for s in sessions[started:started + count]]
+
+
+def meeting_interval(meeting: Dict) -> Optional[Tuple[str, int, int]]:
+    """(day label, start, end) for a scheduled meeting request, or None if it has no slot"""
+    day, when = meeting.get("meeting_day"), meeting.get("meeting_time")
+    if not day or not when:
+        return None
+    start = _TIME_RE.search(str(when).upper())
+    if not start:
+        return None
+    start = _to_minutes(int(start.group(1)), int(start.group(2)), start.group(3))
+    if start is None:
+        return None
+    try:
+        duration = int(meeting.get("duration_minutes") or 30)
+    except (TypeError, ValueError):
+        duration = 30
+    return day, start, start + max(duration, 1)
+
+
+def find_meeting_clashes(meetings: List[Dict], attending: Optional[List[Session]] = None,
+                         index: Optional["AgendaIndex"] = None) -> List[Tuple[Dict, Dict]]:
+    """
+    (meeting, agenda item) pairs where a scheduled meeting overlaps a
+    session. With `attending`, only those sessions count as clashes.
+    """
+    index = index or get_agenda_index()
+    attending_ids = None if attending is None else {id(s.item) for s in attending}
+    clashes = []
+    for meeting in meetings:
+        slot = meeting_interval(meeting)
+        if slot is None:
+            continue
+        for item in index.overlapping(*slot):
+            if attending_ids is None or id(item) in attending_ids:
+                clashes.append((meeting, item))
+    return clashes
+
+
+def get_schedule_clashes(meetings: List[Dict], person_name: str) -> List[Tuple[Dict, Dict]]:
+    """Meetings that overlap sessions where person_name is a speaker or facilitator"""
+    scheduled = [m for m in meetings if meeting_interval(m) is not None]
+    if not scheduled:
+        return []
+    index = get_agenda_index()
+    attending = index.sessions_for_person(person_name)
+    return find_meeting_clashes(scheduled, attending, index) if attending else []
+
+
+_LOCK = threading.Lock()
+_INDEX: Optional[AgendaIndex] = None
+_SIG = None
+_CHECKED_AT = 0.0
+
+
+def get_agenda_index(path: str = AGENDA_FILE) -> AgendaIndex:
+    """Compiled agenda, rebuilt only when the file's mtime/size changes"""
+    global _INDEX, _SIG, _CHECKED_AT
+    with _LOCK:
+        now = time.monotonic()
+        if _INDEX is not None and now - _CHECKED_AT < _CHECK_INTERVAL:
+            return _INDEX
+        _CHECKED_AT = now
+        try:
+            st = os.stat(path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            sig = None
+        if _INDEX is None or sig != _SIG:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    items = json.load(f)
+            except Exception:
+                items = []
+            _INDEX, _SIG = AgendaIndex(items if isinstance(items, list) else []), sig
+        return _INDEX
+
+
+def invalidate_agenda() -> None:
+    """Force the next get_agenda_index() to re-check the file (call after saving it)"""
+    global _CHECKED_AT
+    with _LOCK:
+        _CHECKED_AT = 0.0
+
+
+def load_agenda() -> List[Dict]:
+    """Agenda items as stored in data/agenda.json"""
+    return get_agenda_index().items
+
+
+def get_current_and_upcoming_sessions(now: Optional[datetime] = None, count: int = 2) -> Tuple[Optional[Dict], List[Dict]]:
+    """Current session and the next `count` upcoming sessions"""
+    index = get_agenda_index()
+    if not index.items:
+        return None, []
+    return index.current_and_next(now or datetime.now(), count)
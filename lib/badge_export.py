@@ -0,0 +1,197 @@
+"""
+Bulk badge export: every delegate's badge PNG in one ZIP on disk
+
+- Badges missing from the badge cache are rendered across a process pool
+  (QR encoding is CPU-bound, so threads would serialize on the GIL)
+- PNGs are streamed into the ZIP file as their chunk completes; nothing
+  is held in memory beyond one chunk of paths
+- Jobs are resumable: rendered badges land in the content-addressed cache
+  (lib.badges) as they finish, so re-running an interrupted export only
+  renders what is still missing and re-packs the rest from disk
+- A job is identified by its inputs (delegates, size, TEMPLATE_VERSION);
+  an identical finished export is returned as is
+
+Jobs run on a daemon thread and publish progress on the BadgeExport
+object, so a page can poll it across reruns.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from lib.badges import (BADGE_CACHE_DIR, TEMPLATE_VERSION, badge_key, badge_path,
+                        badge_payload, badge_png, delegate_badge_fields)
+from lib.exports import prune_exports
+
+EXPORT_DIR = os.environ.get("INSAKA_BADGE_EXPORT_DIR", "data/badge_exports")
+CHUNK_SIZE = 32          # badges per pool task: amortizes pickling and process hops
+MAX_WORKERS = max(1, min(8, os.cpu_count() or 1))
+POOL_THRESHOLD = 64      # fewer misses than this render in-thread (pool start-up costs more)
+
+Row = Tuple[str, str, str, str]   # (id, name, organization, title)
+
+
+@dataclass
+class BadgeExport:
+    job_id: str
+    path: Path
+    total: int
+    done: int = 0
+    rendered: int = 0        # badges that were not in the cache
+    status: str = "pending"  # pending | running | done | failed
+    stage: str = ""          # what a running job is doing, for display
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status in ("pending", "running")
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+
+
+def delegate_rows(staff_df) -> Iterator[Tuple[Dict, Row]]:
+    """(delegate record, badge fields) for every delegate with an ID, in sheet order"""
+    for delegate in staff_df.to_dict("records"):
+        row = delegate_badge_fields(delegate)
+        if row[0] and row[0].lower() != "nan":
+            yield delegate, row
+
+
+def badge_rows(staff_df) -> List[Row]:
+    """Badge fields for every delegate with an ID, in sheet order"""
+    return [row for _, row in delegate_rows(staff_df)]
+
+
+def export_id(rows: List[Row], size: int) -> str:
+    digest = hashlib.sha256(f"{TEMPLATE_VERSION}:{size}".encode())
+    for row in rows:
+        digest.update("\x1f".join(row).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:16]
+
+
+def _arcnames(rows: List[Row]) -> List[str]:
+    names, seen = [], {}
+    for delegate_id, *_ in rows:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in delegate_id)
+        seen[safe] = seen.get(safe, 0) + 1
+        names.append(f"badge_qr_{safe}.png" if seen[safe] == 1 else f"badge_qr_{safe}_{seen[safe]}.png")
+    return names
+
+
+def _cached_path(row: Row, size: int, cache_dir: str) -> Path:
+    delegate_id, name, organization, title = row
+    return badge_path(badge_key(badge_payload(delegate_id, name, organization), title, size), cache_dir)
+
+
+def _render_chunk(chunk: List[Tuple[int, Row]], size: int, cache_dir: str) -> List[Tuple[int, str]]:
+    """Pool worker: render a chunk of badges into the cache, return (index, path)"""
+    return [(index, str(badge_png(*row, size=size, cache_dir=cache_dir)[0])) for index, row in chunk]
+
+
+def _chunks(items: List, n: int):
+    for i in range(0, len(items), n):
+        yield items[i:i + n]
+
+
+def render_badges(rows: List[Row], size: int = 300,
+                  cache_dir: Optional[str] = None) -> Iterator[Tuple[int, Path, bool]]:
+    """
+    (index, cached PNG path, freshly rendered) for every row: cache hits
+    first, then misses as their chunk finishes on the process pool
+    """
+    cache_dir = os.path.abspath(cache_dir or BADGE_CACHE_DIR)
+    missing = []
+    for index, row in enumerate(rows):
+        path = _cached_path(row, size, cache_dir)
+        if path.exists():
+            yield index, path, False
+        else:
+            missing.append((index, row))
+
+    if len(missing) < POOL_THRESHOLD:
+        for chunk in _chunks(missing, CHUNK_SIZE):
+            for index, path in _render_chunk(chunk, size, cache_dir):
+                yield index, Path(path), True
+        return
+    # spawn, not fork: the parent is a threaded Streamlit server
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context) as pool:
+        futures = [pool.submit(_render_chunk, chunk, size, cache_dir)
+                   for chunk in _chunks(missing, CHUNK_SIZE)]
+        for future in as_completed(futures):
+            for index, path in future.result():
+                yield index, Path(path), True
+
+
+def run_export(job: BadgeExport, rows: List[Row], size: int = 300,
+               cache_dir: Optional[str] = None) -> BadgeExport:
+    """Render and pack every badge for job; blocking"""
+    names = _arcnames(rows)
+    part = job.path.with_name(job.path.name + ".part")
+    job.status = "running"
+    try:
+        job.path.parent.mkdir(parents=True, exist_ok=True)
+        # PNGs are already deflated; storing them keeps packing IO-bound
+        with zipfile.ZipFile(part, "w", zipfile.ZIP_STORED) as zf:
+            for index, path, fresh in render_badges(rows, size, cache_dir):
+                zf.write(path, names[index])
+                job.done += 1
+                job.rendered += fresh
+        os.replace(part, job.path)
+        job.status = "done"
+        prune_exports(job.path.parent, "badges_*.zip", keep=job.path)
+    except Exception as e:
+        job.status, job.error = "failed", str(e)
+        try:
+            part.unlink()
+        except OSError:
+            pass
+    job.finished_at = time.time()
+    return job
+
+
+_JOBS: Dict[str, BadgeExport] = {}
+_JOBS_LOCK = threading.Lock()
+
+
+def start_job(job_id: str, path: Path, total: int, target: Callable, *args) -> BadgeExport:
+    """
+    Run target(job, *args) on a daemon thread, unless the same job is
+    already running or its output already exists
+    """
+    with _JOBS_LOCK:
+        job = _JOBS.get(job_id)
+        if job is not None and (job.running or (job.status == "done" and path.exists())):
+            return job
+        job = BadgeExport(job_id=job_id, path=path, total=total)
+        if path.exists():
+            job.done, job.status, job.finished_at = job.total, "done", path.stat().st_mtime
+        else:
+            threading.Thread(target=target, args=(job, *args),
+                             name=f"badge-job-{job_id}", daemon=True).start()
+        _JOBS[job_id] = job
+        return job
+
+
+def start_badge_export(staff_df, size: int = 300, export_dir: Optional[str] = None,
+                       cache_dir: Optional[str] = None) -> BadgeExport:
+    """
+    Start (or join, or resume) the export for these delegates on a
+    background thread; an identical finished export is returned at once
+    """
+    rows = badge_rows(staff_df)
+    job_id = export_id(rows, size)
+    path = Path(export_dir or EXPORT_DIR) / f"badges_{job_id}.zip"
+    return start_job(job_id, path, len(rows), run_export, rows, size, cache_dir)
@@ -0,0 +1,335 @@
+"""
+Print-ready badge sheets: N badges per A4/Letter page in one PDF
+
+- Badges come from the badge cache (lib.badges); misses are rendered on
+  the process pool in lib.badge_export first
+- Each badge sits above a colour band naming its category, with crop
+  marks at the trim corners; sheets are ordered by category, organization
+  and name so a print shop gets grouped stacks
+- The PDF is written page by page to a file: cached PNGs are embedded as
+  they are (their zlib data is valid PDF Flate data with PNG predictors),
+  so no page is ever rasterized or held in memory, and only object
+  offsets are kept until the cross-reference table is written at the end
+"""
+
+import hashlib
+import os
+import re
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from lib.badge_export import (EXPORT_DIR, BadgeExport, Row, delegate_rows, export_id,
+                              render_badges, start_job)
+from lib.exports import prune_exports
+
+LAYOUT_VERSION = 1
+MM = 72 / 25.4                       # points per millimetre
+
+PAPER_SIZES = {
+    "A4": (210 * MM, 297 * MM),
+    "Letter": (612.0, 792.0),
+}
+PER_PAGE = {4: (2, 2), 6: (2, 3), 8: (2, 4), 9: (3, 3)}   # badges per page: (columns, rows)
+
+MARGIN = 10 * MM
+GUTTER = 8 * MM                      # room for crop marks between badges
+BAND_HEIGHT = 7 * MM
+MARK_OFFSET = 1 * MM                 # crop marks stop short of the trim line
+MARK_LENGTH = 4 * MM
+
+# First keyword starting a word of the (lower-cased) category picks the band colour
+CATEGORY_COLOURS: List[Tuple[str, Tuple[int, int, int]]] = [
+    ("vip", (209, 0, 0)),
+    ("minister", (209, 0, 0)),
+    ("speaker", (239, 125, 0)),
+    ("diplomat", (106, 27, 154)),
+    ("gov", (0, 91, 170)),
+    ("ps", (0, 91, 170)),
+    ("secretariat", (0, 0, 0)),
+    ("organizing", (0, 0, 0)),
+    ("event manager", (0, 0, 0)),
+    ("sponsor", (191, 144, 0)),
+    ("exhibitor", (0, 137, 123)),
+    ("media", (120, 120, 120)),
+    ("delegate", (25, 138, 0)),
+]
+DEFAULT_COLOUR = (102, 102, 102)
+
+# Helvetica-Bold advance widths (1/1000 em) for centring band labels
+_HELVETICA_BOLD = dict(zip("ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+                           [722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833,
+                            722, 778, 667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611]))
+_HELVETICA_BOLD.update({c: 556 for c in "0123456789"}, **{" ": 278, "-": 333, ".": 278, "&": 722, "/": 278})
+
+
+def category_colour(category: str) -> Tuple[int, int, int]:
+    lowered = str(category or "").lower()
+    for keyword, colour in CATEGORY_COLOURS:
+        # Match at a word start: "gov" covers "Government Official", "ps" is not "Ellipse"
+        if re.search(rf"\b{re.escape(keyword)}", lowered):
+            return colour
+    return DEFAULT_COLOUR
+
+
+def select_delegates(staff_df: pd.DataFrame, categories: Optional[Iterable[str]] = None,
+                     organizations: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Delegates in any of the categories / organizations (case-insensitive; None = all)"""
+    mask = pd.Series(True, index=staff_df.index)
+    for column, wanted in (("Category", categories), ("Organization", organizations)):
+        if wanted:
+            values = staff_df[column].fillna("").astype(str).str.strip().str.casefold()
+            mask &= values.isin({str(w).strip().casefold() for w in wanted})
+    selected = staff_df[mask]
+    order = (selected[["Category", "Organization", "Name"]].fillna("").astype(str)
+             .apply(lambda col: col.str.strip().str.casefold()))
+    return selected.loc[order.sort_values(["Category", "Organization", "Name"], kind="stable").index]
+
+
+# --- streaming PDF writer --------------------------------------------------------
+
+def _pdf_text(text: str) -> bytes:
+    raw = text.encode("latin-1", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _png_image(path: Path) -> Tuple[int, int, bytes, bytes]:
+    """(width, height, image dict entries, stream data) for an image XObject"""
+    data = path.read_bytes()
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        pos, idat, header = 8, [], None
+        while pos < len(data):
+            length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+            body = data[pos + 8:pos + 8 + length]
+            if kind == b"IHDR":
+                header = struct.unpack(">IIBBBBB", body)
+            elif kind == b"IDAT":
+                idat.append(body)
+            elif kind == b"IEND":
+                break
+            pos += 12 + length
+        if header:
+            width, height, depth, colour_type, _, _, interlace = header
+            colours = {0: 1, 2: 3}.get(colour_type)
+            if colours and depth == 8 and not interlace:
+                space = b"/DeviceRGB" if colours == 3 else b"/DeviceGray"
+                entries = (b"/ColorSpace %s /BitsPerComponent 8 /Filter /FlateDecode "
+                           b"/DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent 8 /Columns %d >>"
+                           % (space, colours, width))
+                return width, height, entries, b"".join(idat)
+    # Anything else (palette, alpha, 16-bit): decode and re-compress
+    from PIL import Image
+    with Image.open(path) as img:
+        rgb = img.convert("RGB")
+        return (rgb.width, rgb.height,
+                b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode",
+                zlib.compress(rgb.tobytes(), 6))
+
+
+class PdfWriter:
+    """Minimal PDF 1.4 writer that streams pages to a file"""
+
+    CATALOG, PAGES, FONT = 1, 2, 3
+
+    def __init__(self, fp: BinaryIO, page_size: Tuple[float, float]):
+        self.fp = fp
+        self.page_size = page_size
+        self.offsets: Dict[int, int] = {}
+        self.pages: List[int] = []
+        self.next_id = 4
+        fp.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(self.FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold "
+                                b"/Encoding /WinAnsiEncoding >>")
+
+    def _allocate(self) -> int:
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _object(self, obj_id: int, body: bytes) -> None:
+        self.offsets[obj_id] = self.fp.tell()
+        self.fp.write(b"%d 0 obj\n%s\nendobj\n" % (obj_id, body))
+
+    def _stream(self, obj_id: int, entries: bytes, data: bytes) -> None:
+        self._object(obj_id, b"<< %s /Length %d >>\nstream\n%s\nendstream" % (entries, len(data), data))
+
+    def image(self, path: Path) -> int:
+        width, height, entries, data = _png_image(path)
+        obj_id = self._allocate()
+        self._stream(obj_id, b"/Type /XObject /Subtype /Image /Width %d /Height %d %s"
+                     % (width, height, entries), data)
+        return obj_id
+
+    def page(self, content: bytes, images: Dict[str, int]) -> None:
+        content_id, page_id = self._allocate(), self._allocate()
+        self._stream(content_id, b"/Filter /FlateDecode", zlib.compress(content, 6))
+        xobjects = b" ".join(b"/%s %d 0 R" % (name.encode(), ref) for name, ref in images.items())
+        self._object(page_id, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+                              b"/Resources << /Font << /F1 %d 0 R >> /XObject << %s >> >> "
+                              b"/Contents %d 0 R >>"
+                     % (self.PAGES, *self.page_size, self.FONT, xobjects, content_id))
+        self.pages.append(page_id)
+
+    def close(self) -> None:
+        kids = b" ".join(b"%d 0 R" % p for p in self.pages)
+        self._object(self.PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.pages)))
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        xref = self.fp.tell()
+        size = self.next_id
+        self.fp.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for obj_id in range(1, size):
+            self.fp.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.fp.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                      % (size, self.CATALOG, xref))
+
+
+# --- layout ----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class SheetLayout:
+    paper: str = "A4"
+    per_page: int = 6
+    badge_aspect: float = 400 / 450          # width / height of a badge PNG
+
+    @property
+    def grid(self) -> Tuple[int, int]:
+        return PER_PAGE[self.per_page]
+
+    def cells(self) -> List[Tuple[float, float, float, float]]:
+        """(x, y, width, badge height) of each badge's trim box, top-left first; band sits below"""
+        page_w, page_h = PAPER_SIZES[self.paper]
+        columns, rows = self.grid
+        cell_w = (page_w - 2 * MARGIN - (columns - 1) * GUTTER) / columns
+        cell_h = (page_h - 2 * MARGIN - (rows - 1) * GUTTER) / rows
+        width = min(cell_w, (cell_h - BAND_HEIGHT) * self.badge_aspect)
+        height = width / self.badge_aspect
+        # Centre the whole grid on the page
+        grid_w = columns * width + (columns - 1) * GUTTER
+        grid_h = rows * (height + BAND_HEIGHT) + (rows - 1) * GUTTER
+        left, top = (page_w - grid_w) / 2, (page_h + grid_h) / 2
+        cells = []
+        for row in range(rows):
+            for column in range(columns):
+                x = left + column * (width + GUTTER)
+                y = top - row * (height + BAND_HEIGHT + GUTTER) - height - BAND_HEIGHT
+                cells.append((x, y, width, height))
+        return cells
+
+
+def _crop_marks(x0: float, y0: float, x1: float, y1: float) -> List[bytes]:
+    ops = []
+    for x, y, dx, dy in ((x0, y0, -1, -1), (x1, y0, 1, -1), (x0, y1, -1, 1), (x1, y1, 1, 1)):
+        ops.append(b"%.2f %.2f m %.2f %.2f l S" % (x + dx * MARK_OFFSET, y, x + dx * (MARK_OFFSET + MARK_LENGTH), y))
+        ops.append(b"%.2f %.2f m %.2f %.2f l S" % (x, y + dy * MARK_OFFSET, x, y + dy * (MARK_OFFSET + MARK_LENGTH)))
+    return ops
+
+
+def _band_label(category: str, width: float, font_size: float) -> Tuple[str, float]:
+    label = " ".join(str(category or "").upper().split()) or "DELEGATE"
+    measure = lambda s: sum(_HELVETICA_BOLD.get(c, 611) for c in s) * font_size / 1000
+    while len(label) > 1 and measure(label) > width - 8:
+        label = label[:-1]
+    return label, measure(label)
+
+
+def _page_content(cells, placed: List[Tuple[str, str]]) -> bytes:
+    """Drawing ops for one page: badges (by XObject name), bands, labels, crop marks"""
+    ops, marks = [], []
+    font_size = min(11.0, BAND_HEIGHT * 0.55)
+    for (x, y, width, height), (image_name, category) in zip(cells, placed):
+        band_y = y
+        badge_y = y + BAND_HEIGHT
+        ops.append(b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q" % (width, height, x, badge_y, image_name.encode()))
+        r, g, b = (c / 255 for c in category_colour(category))
+        ops.append(b"%.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f" % (r, g, b, x, band_y, width, BAND_HEIGHT))
+        label, label_w = _band_label(category, width, font_size)
+        ops.append(b"BT 1 1 1 rg /F1 %.1f Tf %.2f %.2f Td %s Tj ET"
+                   % (font_size, x + (width - label_w) / 2, band_y + (BAND_HEIGHT - font_size * 0.7) / 2,
+                      _pdf_text(label)))
+        marks.extend(_crop_marks(x, y, x + width, y + height + BAND_HEIGHT))
+    ops.append(b"0 G 0.25 w")
+    ops.extend(marks)
+    return b"\n".join(ops)
+
+
+def write_sheets(fp: BinaryIO, badges: Iterable[Tuple[Path, str]], layout: SheetLayout,
+                 job: Optional[BadgeExport] = None) -> int:
+    """Write (badge PNG, category) pairs as imposed pages; returns the page count"""
+    writer = PdfWriter(fp, PAPER_SIZES[layout.paper])
+    cells = layout.cells()
+    images: Dict[str, int] = {}
+    placed: List[Tuple[str, str]] = []
+
+    def flush() -> None:
+        writer.page(_page_content(cells, placed), images)
+        images.clear()
+        placed.clear()
+
+    for path, category in badges:
+        name = f"Im{len(placed)}"
+        images[name] = writer.image(path)
+        placed.append((name, category))
+        if job is not None:
+            job.done += 1
+        if len(placed) == len(cells):
+            flush()
+    if placed or not writer.pages:
+        flush()
+    writer.close()
+    return len(writer.pages)
+
+
+def run_sheets(job: BadgeExport, rows: List[Row], categories: List[str], layout: SheetLayout,
+               size: int = 300, cache_dir: Optional[str] = None) -> BadgeExport:
+    """Render missing badges on the pool, then stream the PDF; blocking"""
+    part = job.path.with_name(job.path.name + ".part")
+    job.status = "running"
+    try:
+        job.stage = "Rendering badges"
+        paths: List[Optional[Path]] = [None] * len(rows)
+        for index, path, fresh in render_badges(rows, size, cache_dir):
+            paths[index] = path
+            job.done += 1
+            job.rendered += fresh
+
+        job.stage, job.done = "Laying out pages", 0
+        job.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(part, "wb") as fp:
+            write_sheets(fp, zip(paths, categories), layout, job)
+        os.replace(part, job.path)
+        job.status, job.stage = "done", ""
+        prune_exports(job.path.parent, "sheets_*.pdf", keep=job.path)
+    except Exception as e:
+        job.status, job.error = "failed", str(e)
+        try:
+            part.unlink()
+        except OSError:
+            pass
+    job.finished_at = time.time()
+    return job
+
+
+def start_sheet_export(staff_df: pd.DataFrame, categories: Optional[Iterable[str]] = None,
+                       organizations: Optional[Iterable[str]] = None, paper: str = "A4",
+                       per_page: int = 6, size: int = 300, export_dir: Optional[str] = None,
+                       cache_dir: Optional[str] = None) -> BadgeExport:
+    """
+    Start (or join) building the sheet PDF for the selected delegates on a
+    background thread; an identical finished PDF is returned at once
+    """
+    selected = select_delegates(staff_df, categories, organizations)
+    rows, labels = [], []
+    # Label from the same record as the badge: rows without an ID are skipped for both
+    for delegate, row in delegate_rows(selected):
+        category = delegate.get("Category")
+        rows.append(row)
+        labels.append("" if category is None or pd.isna(category) else str(category).strip())
+    layout = SheetLayout(paper=paper, per_page=per_page, badge_aspect=(size + 100) / (size + 150))
+    key = f"{export_id(rows, size)}:{LAYOUT_VERSION}:{paper}:{per_page}:" + "\x1e".join(labels)
+    job_id = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    path = Path(export_dir or EXPORT_DIR) / f"sheets_{job_id}.pdf"
+    return start_job(job_id, path, len(rows), run_sheets, rows, labels, layout, size, cache_dir)
@@ -0,0 +1,159 @@
+"""
+Badge rendering pipeline for delegate QR badges
+
+- Stable payload per delegate (no render timestamp), so the same delegate
+  always gets the same QR code
+- Content-addressed PNG cache on disk, keyed by (payload, title, size,
+  TEMPLATE_VERSION): an unchanged delegate is a file read, a changed one
+  simply gets a new file
+- Fonts and the static template layer (background, border, conference
+  title) are built once per process and per size
+
+Bump TEMPLATE_VERSION whenever the badge layout changes.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+TEMPLATE_VERSION = 1
+CONFERENCE = "Insaka Conference 2025"
+BADGE_TYPE = "delegate_badge"
+BADGE_CACHE_DIR = os.environ.get("INSAKA_BADGE_CACHE_DIR", "data/badge_cache")
+
+GREEN = '#198A00'
+GREY = '#666666'
+BACKGROUND = '#f0f8f0'
+# A fixed mask skips qrcode's search over all eight (most of the render time);
+# every mask is a valid code, and the choice is part of the template
+QR_MASK_PATTERN = 2
+
+
+def badge_payload(delegate_id, delegate_name, organization) -> str:
+    """QR payload printed on a badge; identical for identical delegate details"""
+    return json.dumps({
+        "type": BADGE_TYPE,
+        "delegate_id": str(delegate_id),
+        "delegate_name": str(delegate_name or ""),
+        "organization": str(organization or ""),
+        "conference": CONFERENCE,
+    })
+
+
+def delegate_badge_fields(delegate) -> Tuple[str, str, str, str]:
+    """(id, name, organization, title) from a delegate row or dict, whichever column names it uses"""
+    def field(*names):
+        for name in names:
+            value = delegate.get(name)
+            if value is not None and str(value).strip() and str(value).lower() != "nan":
+                return str(value).strip()
+        return ""
+    return (field('ID'), field('Full Name', 'Name'), field('Organization', 'Company'),
+            field('Title', 'RoleTitle'))
+
+
+# --- template layers (built once per process) --------------------------------
+
+@lru_cache(maxsize=None)
+def _fonts() -> Dict[str, ImageFont.ImageFont]:
+    try:
+        return {
+            "title": ImageFont.truetype("arial.ttf", 16),
+            "name": ImageFont.truetype("arial.ttf", 14),
+            "org": ImageFont.truetype("arial.ttf", 12),
+        }
+    except OSError:
+        default = ImageFont.load_default()
+        return {"title": default, "name": default, "org": default}
+
+
+@lru_cache(maxsize=8)
+def _template(size: int) -> Image.Image:
+    """Background, border and conference title for a badge of this QR size"""
+    width, height = size + 100, size + 150
+    frame = Image.new('RGB', (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(frame)
+    draw.rectangle([0, 0, width, height], outline=GREEN, width=8)
+    _centered(draw, width, 20, "INSAKA CONFERENCE 2025", _fonts()["title"], GREEN)
+    return frame
+
+
+def _centered(draw: ImageDraw.ImageDraw, width: int, y: int, text: str, font, fill) -> None:
+    bbox = draw.textbbox((0, 0), text, font=font)
+    draw.text(((width - (bbox[2] - bbox[0])) // 2, y), text, fill=fill, font=font)
+
+
+def _clip(text: str, limit: int) -> str:
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def render_qr(payload: str, size: int) -> Image.Image:
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=8,
+        border=4,
+        mask_pattern=QR_MASK_PATTERN,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").get_image().convert('RGB')
+    # Nearest-neighbour keeps module edges sharp for scanners
+    return img.resize((size, size), Image.Resampling.NEAREST)
+
+
+def render_badge(payload: str, delegate_id, organization, title="", size=300) -> Image.Image:
+    """Draw a badge: template copy + QR code + ID, organization and title"""
+    badge = _template(size).copy()
+    draw = ImageDraw.Draw(badge)
+    width = badge.width
+    fonts = _fonts()
+    qr_y = 60
+    badge.paste(render_qr(payload, size), ((width - size) // 2, qr_y))
+    _centered(draw, width, qr_y + size + 20, f"ID: {delegate_id}", fonts["name"], GREEN)
+    if organization:
+        _centered(draw, width, qr_y + size + 50, _clip(str(organization), 30), fonts["org"], GREY)
+    if title:
+        _centered(draw, width, qr_y + size + 80, _clip(str(title), 25), fonts["org"], GREY)
+    return badge
+
+
+# --- content-addressed cache ---------------------------------------------------
+
+def badge_key(payload: str, title="", size=300) -> str:
+    material = json.dumps([TEMPLATE_VERSION, payload, str(title or ""), int(size)])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def badge_path(key: str, cache_dir: Optional[str] = None) -> Path:
+    return Path(cache_dir or BADGE_CACHE_DIR) / key[:2] / f"{key}.png"
+
+
+def badge_png(delegate_id, delegate_name, organization, title="", size=300,
+              cache_dir: Optional[str] = None) -> Tuple[Path, str]:
+    """
+    Path of the cached badge PNG for these details (rendered on a miss) and
+    the QR payload on it
+    """
+    payload = badge_payload(delegate_id, delegate_name, organization)
+    path = badge_path(badge_key(payload, title, size), cache_dir)
+    if not path.exists():
+        badge = render_badge(payload, delegate_id, organization, title, size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        badge.save(tmp, format="PNG")
+        os.replace(tmp, path)  # atomic; concurrent renders of one key write identical bytes
+    return path, payload
+
+
+def badge_for_delegate(delegate, size=300, cache_dir: Optional[str] = None) -> Tuple[Path, str]:
+    """badge_png for a delegate row or dict"""
+    delegate_id, name, organization, title = delegate_badge_fields(delegate)
+    return badge_png(delegate_id, name, organization, title, size, cache_dir)
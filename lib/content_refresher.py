@@ -0,0 +1,198 @@
+"""
+Background refresher for external content sources
+
+A daemon thread polls each configured source on its own schedule, parses
+it off the request path and publishes an immutable snapshot. Pages only
+read snapshots, so a render never waits on the network:
+
+- per-source interval and timeout
+- exponential backoff after failures (capped at the source's interval)
+- the last good snapshot stays published while a source is failing
+- sources that fall due together are fetched concurrently
+
+Sources come from data/external_sources.json when present, otherwise
+DEFAULT_SOURCES. Sources that would fetch and parse the same thing are
+kept once.
+
+Fetching is off unless INSAKA_EXTERNAL_FETCH=1: the summit site has had
+SSL certificate problems, and a deployment has to opt in to polling it.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+
+from lib.http_cache import cached_get, memo
+from lib.multi_fetch import FetchJob, fetch_all
+
+SOURCES_FILE = "data/external_sources.json"
+FETCH_ENABLED = os.environ.get("INSAKA_EXTERNAL_FETCH", "").strip().lower() in ("1", "true", "yes")
+SUMMIT_URL = "https://www.mmmd.gov.zm/insakasummit/?page_id=5228"
+
+DEFAULT_SOURCES = [
+    {"name": "updates", "label": "Latest Updates", "url": SUMMIT_URL, "kind": "page", "interval": 15 * 60},
+    {"name": "exhibitor_logos", "label": "Exhibitor Logos & Photos", "url": SUMMIT_URL, "kind": "selector",
+     "selector": ".exhibitor-logo, .sponsor-logo, .company-logo, .logo, img", "text_only": False, "interval": 30 * 60},
+]
+
+RETRY_BASE = 30.0   # seconds before the first retry of a failing source
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    url: str
+    label: str = ""
+    kind: str = "page"                  # "page" (title/main text/images) or "selector"
+    selector: Optional[str] = None
+    text_only: bool = True
+    interval: float = 30 * 60           # seconds between refreshes
+    timeout: float = 10.0               # per-request timeout
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """What pages read: the last good parse plus the state of the latest attempt"""
+    source: str
+    data: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    fetched_at: Optional[float] = None  # when `data` was fetched
+    checked_at: Optional[float] = None  # when the latest attempt finished
+    error: Optional[str] = None         # latest attempt's error (data is then the last good copy)
+    failures: int = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.fetched_at is not None
+
+
+def load_sources(path: str = SOURCES_FILE) -> List[Source]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            configured = json.load(f)
+    except (OSError, ValueError):
+        configured = DEFAULT_SOURCES
+    sources, seen = [], set()
+    for cfg in configured:
+        try:
+            source = Source(**{k: v for k, v in cfg.items() if k in Source.__dataclass_fields__})
+        except TypeError:
+            continue
+        # Two sources with the same request and parse would only fetch the page twice
+        key = (source.url, source.kind, source.selector if source.kind == "selector" else None, source.text_only)
+        if key in seen or source.name in {s.name for s in sources}:
+            continue
+        seen.add(key)
+        sources.append(source)
+    return sources
+
+
+def _parser(source: Source) -> Callable:
+    # Imported lazily: web_scraper pulls in BeautifulSoup and streamlit
+    from lib.web_scraper import extract_specific_content, extract_web_content
+    if source.kind == "selector":
+        return lambda r: extract_specific_content(r, source.selector, source.text_only)
+    return extract_web_content
+
+
+class ContentRefresher:
+    def __init__(self, sources: List[Source]):
+        self.sources = {s.name: s for s in sources}
+        self._snapshots: Mapping[str, Snapshot] = MappingProxyType(
+            {name: Snapshot(source=name) for name in self.sources})
+        self._next_due: Dict[str, float] = {name: 0.0 for name in self.sources}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- reading -------------------------------------------------------------
+
+    def snapshot(self, name: str) -> Optional[Snapshot]:
+        return self._snapshots.get(name)
+
+    def snapshots(self) -> Mapping[str, Snapshot]:
+        return self._snapshots
+
+    # --- refreshing ----------------------------------------------------------
+
+    def _publish(self, snap: Snapshot) -> None:
+        # Copy-on-write: readers always hold a complete, never-mutated mapping
+        with self._lock:
+            updated = dict(self._snapshots)
+            updated[snap.source] = snap
+            self._snapshots = MappingProxyType(updated)
+
+    def refresh(self, name: str, timeout: Optional[float] = None) -> Snapshot:
+        """Fetch and parse one source now, publish the result and schedule the next run"""
+        source = self.sources[name]
+        timeout = source.timeout if timeout is None else min(timeout, source.timeout)
+        previous = self._snapshots[name]
+        now = time.time()
+        try:
+            # ttl=0: always revalidate (a 304 is cheap); fallback=False so failures surface here
+            response = cached_get(source.url, ttl=0, stale=0, timeout=timeout, fallback=False)
+            result = memo(response, ("refresher", source.kind, source.selector, source.text_only), _parser(source))
+            if not result.get("success"):
+                raise ValueError(result.get("error") or "no content")
+            snap = Snapshot(source=name, data=MappingProxyType(dict(result)),
+                            fetched_at=response.fetched_at, checked_at=now)
+            self._next_due[name] = now + source.interval
+        except Exception as e:
+            failures = previous.failures + 1
+            snap = Snapshot(source=name, data=previous.data, fetched_at=previous.fetched_at,
+                            checked_at=now, error=str(e), failures=failures)
+            self._next_due[name] = now + min(source.interval, RETRY_BASE * 2 ** (failures - 1))
+        self._publish(snap)
+        return snap
+
+    def request_refresh(self, name: Optional[str] = None) -> None:
+        """Ask the background thread to refresh one (or every) source soon"""
+        for n in ([name] if name else list(self.sources)):
+            if n in self._next_due:
+                self._next_due[n] = 0.0
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            now = time.time()
+            due = [n for n, at in self._next_due.items() if at <= now]
+            if due:
+                # Due sources are fetched concurrently; the batch takes as long as the slowest
+                fetch_all([FetchJob(n, self.sources[n].url, lambda remaining, n=n: self.refresh(n, remaining))
+                           for n in due],
+                          budget=max(self.sources[n].timeout for n in due) + 1)
+            wait = max(1.0, min(self._next_due.values(), default=now + 60) - time.time())
+            self._wake.wait(timeout=wait)
+            self._wake.clear()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None or not self.sources:
+                return
+            self._thread = threading.Thread(target=self._run, name="content-refresher", daemon=True)
+            self._thread.start()
+
+
+_REFRESHER: Optional[ContentRefresher] = None
+_START_LOCK = threading.Lock()
+
+
+def get_refresher() -> Optional[ContentRefresher]:
+    """The process-wide refresher, started on first use; None unless fetching is enabled"""
+    global _REFRESHER
+    if not FETCH_ENABLED:
+        return None
+    with _START_LOCK:
+        if _REFRESHER is None:
+            _REFRESHER = ContentRefresher(load_sources())
+            _REFRESHER.start()
+        return _REFRESHER
+
+
+def get_content_snapshot(name: str) -> Optional[Snapshot]:
+    """Latest published snapshot for a source (never blocks on the network)"""
+    refresher = get_refresher()
+    return refresher.snapshot(name) if refresher else None
@@ -0,0 +1,239 @@
+"""
+Statistics for the admin dashboard, served as one cached snapshot
+
+- Table aggregates (category / organization / nationality counts, overall
+  check-ins, per-day check-in flags) are recomputed only when the delegate
+  table's signature changes
+- Overall and per-day check-in counts lay the pending (not yet compacted)
+  check-in events over those flags, so a door scan costs a few dict lookups rather
+  than a reload of the table
+- Arrivals (first check-in of a delegate on a day) are folded into
+  10-minute buckets incrementally: archived event files are read once, and
+  only lines appended to the live log since the last refresh are parsed
+
+A snapshot is rebuilt only when one of these versions moved, so dashboard
+reruns between scans are a version check.
+"""
+
+import datetime as dt
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+from checkin_log import EVENT_DAY
+from lib.jsonl_store import JsonlTail
+
+DAYS = (1, 2, 3, 4, 5)
+ARRIVAL_BUCKET_MINUTES = 10
+TOP_ORGANIZATIONS = 10
+
+ArrivalKey = Tuple[str, int]          # (normalized delegate id, day)
+
+
+def _truthy(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    try:
+        return bool(value) and not pd.isna(value)
+    except (TypeError, ValueError):
+        return bool(value)
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    version: tuple
+    built_at: float
+    total: int
+    checked_in: int
+    by_category: pd.Series        # treat the Series/DataFrame fields as read-only
+    by_organization: pd.Series    # top-k only
+    organizations: int
+    by_nationality: pd.Series     # empty nationalities left out
+    day_checkins: Dict[int, int]
+    arrivals: pd.DataFrame        # index "HH:MM" bucket start, one column per day ("Day 1"...)
+
+    @property
+    def checked_in_rate(self) -> float:
+        return self.checked_in / self.total if self.total else 0.0
+
+    @property
+    def day_rates(self) -> Dict[int, float]:
+        return {day: (count / self.total if self.total else 0.0) for day, count in self.day_checkins.items()}
+
+
+class _TableStats:
+    """Aggregates of one version of the delegate table"""
+
+    def __init__(self, df: pd.DataFrame, id_key: Callable[[object], str]):
+        self.total = len(df)
+        self.checked_in = int(df["CheckedIn"].map(_truthy).sum()) if "CheckedIn" in df.columns else 0
+        self.by_category = df["Category"].value_counts() if "Category" in df.columns else pd.Series(dtype=int)
+        self.by_organization = (df["Organization"].value_counts() if "Organization" in df.columns
+                                else pd.Series(dtype=int))
+        nationalities = df["Nationality"].value_counts() if "Nationality" in df.columns else pd.Series(dtype=int)
+        self.by_nationality = nationalities[nationalities.index != ""]
+        flags = {day: df[f"Day{day}_CheckIn"].map(_truthy).tolist() if f"Day{day}_CheckIn" in df.columns
+                 else [False] * len(df) for day in DAYS}
+        self.day_checkins = {day: int(sum(values)) for day, values in flags.items()}
+        # (id, day) -> flag in the table, to correct the counts for pending events;
+        # the event-wide CheckedIn flag is logged as EVENT_DAY
+        flags[EVENT_DAY] = (df["CheckedIn"].map(_truthy).tolist() if "CheckedIn" in df.columns
+                            else [False] * len(df))
+        ids = [id_key(v) for v in df["ID"].tolist()] if "ID" in df.columns else []
+        self.flags: Dict[ArrivalKey, bool] = {}
+        for day, values in flags.items():
+            self.flags.update(zip(((i, day) for i in ids), values))
+
+    def counts(self, pending: Dict[ArrivalKey, bool]) -> Tuple[int, Dict[int, int]]:
+        """(checked in for the event, {day: checked in}) with pending events applied"""
+        counts = {EVENT_DAY: self.checked_in, **self.day_checkins}
+        for key, checked in pending.items():
+            base = self.flags.get(key)
+            if base is not None and base != checked:
+                counts[key[1]] += 1 if checked else -1
+        return counts.pop(EVENT_DAY), counts
+
+
+class ArrivalCounter:
+    """
+    First check-in per (delegate, day) in 10-minute buckets, folded
+    incrementally from the check-in log and its compaction archives
+    """
+
+    def __init__(self, log_path, archive_dir, id_key: Callable[[object], str],
+                 bucket_minutes: int = ARRIVAL_BUCKET_MINUTES):
+        self.log_path = Path(log_path)
+        self.archive_dir = Path(archive_dir)
+        self.id_key = id_key
+        self.bucket_minutes = bucket_minutes
+        self.version = 0
+        self._lock = threading.Lock()
+        self._archives: Set[str] = set()
+        self._archive_bins: Counter = Counter()
+        self._archive_seen: Set[ArrivalKey] = set()
+        # The live log is folded separately: a compaction moves it into an archive
+        self._tail = JsonlTail(self.log_path)
+        self._live_bins: Counter = Counter()
+        self._live_seen: Set[ArrivalKey] = set()
+
+    def _bucket(self, timestamp) -> Optional[str]:
+        try:
+            when = dt.datetime.fromisoformat(str(timestamp))
+        except ValueError:
+            return None
+        return f"{when.hour:02d}:{when.minute - when.minute % self.bucket_minutes:02d}"
+
+    def _fold(self, events: Iterable[dict], bins: Counter, seen: Set[ArrivalKey]) -> bool:
+        changed = False
+        for ev in events:
+            try:
+                if not ev["checked"]:
+                    continue
+                key = (self.id_key(ev["delegate_id"]), int(ev["day"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if key[1] not in DAYS or key in self._archive_seen or key in seen:
+                continue
+            bucket = self._bucket(ev.get("timestamp", ""))
+            if bucket is None:
+                continue
+            seen.add(key)
+            bins[(key[1], bucket)] += 1
+            changed = True
+        return changed
+
+    def refresh(self) -> int:
+        """Fold new archives and newly appended events; returns the arrivals version"""
+        with self._lock:
+            changed = False
+            # Archives first: a compaction archives the live log before it restarts
+            if self.archive_dir.exists():
+                for path in sorted(self.archive_dir.glob("checkin_events_*.jsonl")):
+                    if path.name in self._archives:
+                        continue
+                    events = []
+                    with open(path, "r", encoding="utf-8") as fh:
+                        for line in fh:
+                            try:
+                                events.append(json.loads(line))
+                            except ValueError:
+                                continue
+                    changed |= self._fold(events, self._archive_bins, self._archive_seen)
+                    self._archives.add(path.name)
+            restarted, events = self._tail.read_new()
+            if restarted:
+                changed |= bool(self._live_bins)
+                self._live_bins, self._live_seen = Counter(), set()
+            changed |= self._fold(events, self._live_bins, self._live_seen)
+            if changed:
+                self.version += 1
+            return self.version
+
+    def series(self) -> pd.DataFrame:
+        """Arrivals per bucket (rows, "HH:MM") and day (columns)"""
+        with self._lock:
+            bins = self._archive_bins + self._live_bins
+        if not bins:
+            return pd.DataFrame(columns=[f"Day {d}" for d in DAYS])
+        frame = pd.Series(bins).unstack(level=0, fill_value=0).sort_index()
+        frame = frame.reindex(columns=list(DAYS), fill_value=0)
+        frame.columns = [f"Day {d}" for d in frame.columns]
+        frame.index.name = "Time"
+        return frame
+
+
+class DelegateStats:
+    """
+    Cached dashboard snapshot over a delegate store and a check-in log.
+    `store()` returns the current store (it can be swapped at runtime);
+    it must provide frame() and version().
+    """
+
+    def __init__(self, store: Callable[[], object], log, id_key: Callable[[object], str]):
+        self._store = store
+        self._log = log
+        self._id_key = id_key
+        self._lock = threading.Lock()
+        self._table: Optional[_TableStats] = None
+        self._table_store = None      # held so its id cannot be reused by another store
+        self._table_version = None
+        self._arrivals: Optional[ArrivalCounter] = None
+        self._snapshot: Optional[StatsSnapshot] = None
+
+    def _arrival_counter(self) -> ArrivalCounter:
+        if self._arrivals is None or self._arrivals.log_path != self._log.path:
+            self._arrivals = ArrivalCounter(self._log.path, self._log.archive_dir, self._id_key)
+        return self._arrivals
+
+    def snapshot(self, top_k: int = TOP_ORGANIZATIONS) -> StatsSnapshot:
+        with self._lock:
+            store = self._store()
+            table_version = (id(store), store.version())
+            if self._table is None or store is not self._table_store or table_version != self._table_version:
+                self._table = _TableStats(store.frame(), self._id_key)
+                self._table_store, self._table_version = store, table_version
+            arrivals = self._arrival_counter()
+            version = (table_version, self._log.version(), arrivals.refresh(), top_k)
+            if self._snapshot is not None and self._snapshot.version == version:
+                return self._snapshot
+            table = self._table
+            checked_in, day_checkins = table.counts(self._log.state())
+            self._snapshot = StatsSnapshot(
+                version=version,
+                built_at=time.time(),
+                total=table.total,
+                checked_in=checked_in,
+                by_category=table.by_category,
+                by_organization=table.by_organization.head(top_k),
+                organizations=len(table.by_organization),
+                by_nationality=table.by_nationality,
+                day_checkins=day_checkins,
+                arrivals=arrivals.series(),
+            )
+            return self._snapshot
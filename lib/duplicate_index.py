@@ -0,0 +1,319 @@
+"""
+Fuzzy duplicate detection for delegate imports and registration
+
+Exact "name|organization" keys miss near-duplicates ("Min. of Mines" vs
+"Ministry of Mines and Minerals Development", "John  Banda" vs "Banda,
+John"). This index scores incoming rows against existing delegates in
+bulk and returns ranked candidate matches:
+
+- names are normalized (accents, titles, punctuation, token order) and
+  organizations have common abbreviations expanded
+- blocking: a pair is only scored when the two names share the Soundex
+  codes of two tokens, a MinHash LSH band of their character trigrams, an
+  email or a phone number, so work grows with the number of plausible
+  pairs and not with incoming x existing
+- scoring is vectorized over all candidate pairs at once: name similarity
+  is the MinHash estimate of trigram Jaccard, organization similarity the
+  token overlap coefficient (computed once per distinct organization pair)
+- a shared email or phone number is treated as the same person when the
+  names are also similar (ministry lists share inboxes and switchboards)
+
+Indexes are cached per delegate list and rebuilt whenever it changes.
+"""
+
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+NAME_WEIGHT = 0.7
+ORG_WEIGHT = 0.3
+MIN_SCORE = 0.6          # weakest candidate worth showing an admin
+LIKELY_SCORE = 0.85      # treated as the same person (import skips, registration asks)
+LIKELY_ORG_SCORE = 0.75  # ...and only when the organizations agree too
+CONTACT_NAME_SCORE = 0.5 # a shared email/phone only counts with at least this name similarity
+
+NUM_PERM = 60
+BANDS = 12               # LSH: 12 bands of 5 rows; Jaccard 0.7 collides ~88% of the time, 0.8 ~99%
+MAX_BLOCK = 400          # ignore blocking keys shared by more existing delegates than this
+_PRIME = (1 << 31) - 1
+
+_TITLES = {"mr", "mrs", "ms", "miss", "dr", "prof", "hon", "eng", "sir", "madam", "rev", "amb", "h.e", "he"}
+_ORG_ABBREVIATIONS = {
+    "min": "ministry", "dept": "department", "dep": "department", "govt": "government",
+    "gov": "government", "intl": "international", "int": "international", "natl": "national",
+    "nat": "national", "assoc": "association", "assn": "association", "univ": "university",
+    "co": "company", "corp": "corporation", "ltd": "limited", "inc": "incorporated",
+    "dev": "development", "devt": "development", "mgmt": "management", "&": "and",
+}
+_ORG_STOPWORDS = {"of", "the", "and", "for", "in", "on", "at", "de", "la", "le", "et", "plc", "limited"}
+_WORD_RE = re.compile(r"[^\W_]+|&", re.UNICODE)
+
+_SEEDS = np.random.default_rng(20250).integers(1, _PRIME, size=(2, NUM_PERM), dtype=np.uint64)
+
+
+class Candidate(NamedTuple):
+    position: int            # row in the existing delegate list
+    delegate_id: str
+    name: str
+    organization: str
+    score: float
+    name_score: float
+    org_score: float
+    reason: str              # "email", "phone" or "name"
+
+    @property
+    def likely(self) -> bool:
+        """
+        Same person with high confidence: a shared email/phone with a similar
+        name, or a close name at a matching organization
+        """
+        return self.reason != "name" or (self.score >= LIKELY_SCORE and self.org_score >= LIKELY_ORG_SCORE)
+
+
+def _clean(value) -> str:
+    """Lower-cased ASCII-folded text, or "" for missing values (None / NaN / "nan")"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    text = unicodedata.normalize("NFKD", str(value)).encode("ascii", "ignore").decode().strip().lower()
+    return "" if text in ("nan", "none", "null") else text
+
+
+def name_tokens(value) -> List[str]:
+    """Name words without titles, sorted so "Banda, John" == "John Banda" """
+    return sorted(t for t in _WORD_RE.findall(_clean(value)) if t not in _TITLES)
+
+
+def org_tokens(value) -> Tuple[str, ...]:
+    """Organization words in order, abbreviations expanded, stopwords and repeats dropped"""
+    words = (_ORG_ABBREVIATIONS.get(t, t) for t in _WORD_RE.findall(_clean(value).replace(".", " ")))
+    return tuple(dict.fromkeys(w for w in words if w not in _ORG_STOPWORDS))
+
+
+def _email(value) -> str:
+    text = _clean(value)
+    return text if "@" in text else ""
+
+
+def _phone(value) -> str:
+    digits = re.sub(r"\D", "", _clean(value))
+    return digits[-9:] if len(digits) >= 7 else ""   # last 9 digits: ignores +260 / 0 prefixes
+
+
+def soundex(word: str) -> str:
+    codes = {**dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+             "l": "4", **dict.fromkeys("mn", "5"), "r": "6"}
+    word = "".join(c for c in word.lower() if c.isalpha())
+    if not word:
+        return ""
+    out, last = word[0], codes.get(word[0], "")
+    for c in word[1:]:
+        code = codes.get(c, "")
+        if code and code != last:
+            out += code
+        if c not in "hw":
+            last = code
+    return (out + "000")[:4]
+
+
+def _trigram_hashes(tokens: List[str]) -> List[int]:
+    text = f" {' '.join(tokens)} "
+    return sorted({zlib.crc32(text[i:i + 3].encode()) for i in range(len(text) - 2)})
+
+
+def _signatures(token_lists: List[List[str]]) -> np.ndarray:
+    """MinHash signature per name, (n, NUM_PERM) uint64, computed in one pass"""
+    hashes = [_trigram_hashes(t) if t else [] for t in token_lists]
+    lengths = np.array([len(h) for h in hashes])
+    sigs = np.full((len(hashes), NUM_PERM), np.iinfo(np.uint64).max, dtype=np.uint64)
+    nonempty = lengths > 0
+    if nonempty.any():
+        flat = np.fromiter((x for h in hashes for x in h), dtype=np.uint64, count=int(lengths.sum()))
+        permuted = (_SEEDS[0][:, None] * flat[None, :] + _SEEDS[1][:, None]) % _PRIME   # (NUM_PERM, total)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+        sigs[nonempty] = np.minimum.reduceat(permuted, starts, axis=1).T
+    return sigs
+
+
+class _Encoded:
+    """
+    Names, organizations and blocking keys of a list of delegate records.
+    Blocking keys become integer ids from `vocab`; with grow=False, keys the
+    vocabulary has never seen are dropped (they cannot block with anything).
+    """
+
+    def __init__(self, records: Sequence[Dict], vocab: Dict[tuple, int], grow: bool):
+        self.names = [name_tokens(r.get("Name")) for r in records]
+        self.orgs = [org_tokens(r.get("Organization")) for r in records]
+        org_codes: Dict[Tuple[str, ...], int] = {}
+        self.org_code = np.array([org_codes.setdefault(o, len(org_codes)) for o in self.orgs], dtype=np.int64)
+        self.org_values = list(org_codes)
+        self.has_name = np.array([bool(t) for t in self.names], dtype=bool)
+        self.sigs = _signatures(self.names)
+
+        def code(key: tuple) -> int:
+            if grow:
+                return vocab.setdefault(key, len(vocab))
+            return vocab.get(key, -1)
+
+        emails = [_email(r.get("Email")) for r in records]
+        phones = [_phone(r.get("Phone")) for r in records]
+        self.email_code = np.array([code(("email", e)) if e else -1 for e in emails], dtype=np.int64)
+        self.phone_code = np.array([code(("phone", p)) if p else -1 for p in phones], dtype=np.int64)
+
+        bands = self.sigs.reshape(len(records), BANDS, NUM_PERM // BANDS)
+        key_rows, key_ids = [], []
+        for i, tokens in enumerate(self.names):
+            keys = []
+            if tokens:
+                sounds = sorted({soundex(t) for t in tokens if len(t) > 1} - {""})
+                # Pairs of token sounds: selective, and survive a typo in any one other token
+                keys.extend(("sx", a, b) for n, a in enumerate(sounds) for b in sounds[n + 1:])
+                if len(sounds) == 1:
+                    keys.append(("sx", sounds[0]))
+                keys.extend(("lsh", band, bands[i, band].tobytes()) for band in range(BANDS))
+            ids = [code(key) for key in keys] + [c for c in (self.email_code[i], self.phone_code[i]) if c >= 0]
+            ids = [c for c in ids if c >= 0]
+            key_rows.extend([i] * len(ids))
+            key_ids.extend(ids)
+        self.key_rows = np.array(key_rows, dtype=np.int64)
+        self.key_ids = np.array(key_ids, dtype=np.int64)
+
+
+def _overlap(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    """Token overlap coefficient; an acronym matches the organization it abbreviates"""
+    if not a or not b:
+        return 0.0
+    numbers_a, numbers_b = {t for t in a if t.isdigit()}, {t for t in b if t.isdigit()}
+    if numbers_a and numbers_b and numbers_a != numbers_b:
+        return 0.0       # "Mining Company 9" is not "Mining Company 52"
+    shared = len(set(a) & set(b))
+    if shared:
+        return shared / min(len(a), len(b))
+    # "MMMD" vs "Ministry of Mines and Minerals Development"
+    for short, long in ((a, b), (b, a)):
+        if len(short) == 1 and len(long) > 1 and short[0] == "".join(w[0] for w in long):
+            return 1.0
+    return 0.0
+
+
+class DuplicateIndex:
+    """Blocking + similarity index over existing delegates"""
+
+    def __init__(self, records: Sequence[Dict]):
+        self.records = list(records)
+        self.ids = [str(r.get("ID", "")) for r in self.records]
+        self.vocab: Dict[tuple, int] = {}
+        self.enc = _Encoded(self.records, self.vocab, grow=True)
+        # Postings sorted by key id; very common name keys are dropped (emails/phones never are)
+        keys, rows = self.enc.key_ids, self.enc.key_rows
+        counts = np.bincount(keys, minlength=len(self.vocab)) if len(keys) else np.zeros(0, dtype=np.int64)
+        strong = np.zeros(len(self.vocab), dtype=bool)
+        strong[self.enc.email_code[self.enc.email_code >= 0]] = True
+        strong[self.enc.phone_code[self.enc.phone_code >= 0]] = True
+        keep = (counts[keys] <= MAX_BLOCK) | strong[keys] if len(keys) else np.zeros(0, dtype=bool)
+        order = np.argsort(keys[keep], kind="stable")
+        self.post_keys = keys[keep][order]
+        self.post_rows = rows[keep][order]
+
+    def _pairs(self, incoming: _Encoded) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct (incoming row, existing row) pairs sharing at least one blocking key"""
+        lo = np.searchsorted(self.post_keys, incoming.key_ids, side="left")
+        hi = np.searchsorted(self.post_keys, incoming.key_ids, side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        left = np.repeat(incoming.key_rows, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+        right = self.post_rows[offsets]
+        n = max(len(self.records), 1)
+        pairs = np.unique(left * n + right)
+        return pairs // n, pairs % n
+
+    def score(self, records: Sequence[Dict], k: int = 3,
+              min_score: float = MIN_SCORE) -> List[List[Candidate]]:
+        """Ranked candidates (best first, at most k, score >= min_score) per incoming record"""
+        results: List[List[Candidate]] = [[] for _ in records]
+        if not records or not self.records:
+            return results
+        incoming = _Encoded(records, self.vocab, grow=False)
+        inc, ex = self._pairs(incoming)
+        if not len(inc):
+            return results
+
+        name_sim = (incoming.sigs[inc] == self.enc.sigs[ex]).mean(axis=1)
+        name_sim[~(incoming.has_name[inc] & self.enc.has_name[ex])] = 0.0
+
+        # Organization similarity once per distinct (incoming org, existing org) pair
+        org_pairs = incoming.org_code[inc] * (len(self.enc.org_values) + 1) + self.enc.org_code[ex]
+        unique_pairs, inverse = np.unique(org_pairs, return_inverse=True)
+        width = len(self.enc.org_values) + 1
+        org_table = np.array([_overlap(incoming.org_values[p // width], self.enc.org_values[p % width])
+                              for p in unique_pairs.tolist()])
+        org_sim = org_table[inverse]
+
+        score = NAME_WEIGHT * name_sim + ORG_WEIGHT * org_sim
+        same_email = (incoming.email_code[inc] >= 0) & (incoming.email_code[inc] == self.enc.email_code[ex])
+        same_phone = (incoming.phone_code[inc] >= 0) & (incoming.phone_code[inc] == self.enc.phone_code[ex])
+        # Shared office inboxes and switchboards are common: contact details only
+        # identify a person together with a similar name
+        named = name_sim >= CONTACT_NAME_SCORE
+        same_email &= named
+        same_phone &= named
+        score = np.where(same_email | same_phone, 1.0, score)
+
+        keep = score >= min_score
+        inc, ex, score, name_sim, org_sim = inc[keep], ex[keep], score[keep], name_sim[keep], org_sim[keep]
+        same_email, same_phone = same_email[keep], same_phone[keep]
+        # Sort by incoming row, then best score first
+        order = np.lexsort((-score, inc))
+        for o in order.tolist():
+            bucket = results[inc[o]]
+            if len(bucket) >= k:
+                continue
+            j = int(ex[o])
+            record = self.records[j]
+            bucket.append(Candidate(
+                position=j, delegate_id=self.ids[j],
+                name=str(record.get("Name", "")), organization=str(record.get("Organization", "")),
+                score=round(float(score[o]), 3), name_score=round(float(name_sim[o]), 3),
+                org_score=round(float(org_sim[o]), 3),
+                reason="email" if same_email[o] else "phone" if same_phone[o] else "name",
+            ))
+        return results
+
+    def match(self, name, organization="", email="", phone="", k: int = 3,
+              min_score: float = MIN_SCORE) -> List[Candidate]:
+        return self.score([{"Name": name, "Organization": organization, "Email": email, "Phone": phone}],
+                          k, min_score)[0]
+
+
+_LOCK = threading.Lock()
+_INDEXES: "OrderedDict[int, DuplicateIndex]" = OrderedDict()
+
+
+def _fingerprint(records: Sequence[Dict]) -> int:
+    return hash(tuple((str(r.get("ID", "")), str(r.get("Name", "")), str(r.get("Organization", "")),
+                       str(r.get("Email", "")), str(r.get("Phone", ""))) for r in records))
+
+
+def get_index(records: Sequence[Dict]) -> DuplicateIndex:
+    """Index for this delegate list, reused until the list changes"""
+    key = _fingerprint(records)
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is not None:
+            _INDEXES.move_to_end(key)
+            return index
+    index = DuplicateIndex(records)
+    with _LOCK:
+        _INDEXES[key] = index
+        while len(_INDEXES) > 2:
+            _INDEXES.popitem(last=False)
+    return index
@@ -0,0 +1,252 @@
+"""
+Streaming, cached export artifacts (Excel workbooks and the delegate package ZIP)
+
+- Workbooks are written with openpyxl in write-only mode: rows stream to
+  the file as they are appended instead of building every cell object in
+  memory first
+- The package ZIP is written to a file on disk; photos are streamed in
+  from their files (stored, they are already compressed) and CSVs are
+  written through the archive, never held as one string
+- Finished artifacts are cached on disk under a version derived from the
+  data that went into them, so an unchanged export is a hash and a file
+  open; a concurrent request for the same artifact waits for the first
+  build instead of starting another
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+EXPORT_CACHE_DIR = os.environ.get("INSAKA_EXPORT_CACHE_DIR", "data/exports")
+EXPORT_VERSION = 1       # bump whenever an artifact's layout changes
+KEEP_EXPORTS = 3         # finished artifacts kept per kind
+MISSING_VALUES = ("", "nan", "none", "null")
+
+Sheet = Tuple[str, pd.DataFrame]
+
+_LOCKS: Dict[Path, threading.Lock] = {}
+_LOCKS_LOCK = threading.Lock()
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content hash of a frame (columns and values, not the index)"""
+    digest = hashlib.sha256("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df.astype(object), index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def file_version(path) -> str:
+    """Cheap change marker for a file on disk: size and mtime"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def data_version(*parts) -> str:
+    digest = hashlib.sha256(str(EXPORT_VERSION).encode())
+    for part in parts:
+        digest.update(b"\x1e" + str(part).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _LOCKS_LOCK:
+        return _LOCKS.setdefault(path, threading.Lock())
+
+
+def prune_exports(directory: Path, pattern: str, keep: Path) -> None:
+    """Delete all but the newest KEEP_EXPORTS files matching pattern"""
+    exports = sorted(directory.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in [p for p in exports if p != keep][KEEP_EXPORTS - 1:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def cached_artifact(kind: str, version: str, suffix: str, build: Callable[[Path], None],
+                    cache_dir: Optional[str] = None) -> Path:
+    """
+    Path of the `kind` artifact for this data version, calling build(part_path)
+    to write it on a miss; older artifacts of the same kind are pruned
+    """
+    directory = Path(cache_dir or EXPORT_CACHE_DIR)
+    path = directory / f"{kind}_{version}{suffix}"
+    if path.exists():
+        return path
+    with _lock_for(path):
+        if path.exists():
+            return path
+        directory.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(f"{path.name}.{os.getpid()}.part")
+        try:
+            build(part)
+            os.replace(part, path)
+        finally:
+            if part.exists():
+                part.unlink()
+        prune_exports(directory, f"{kind}_*{suffix}", keep=path)
+    return path
+
+
+def _cell(value):
+    """openpyxl-friendly scalar: None for missing values, plain Python types otherwise"""
+    if value is None:
+        return None
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if hasattr(value, "item") else value
+
+
+def _sheet_title(title: str, used: set) -> str:
+    """Unique sheet name within Excel's 31 character limit"""
+    name, n = title[:31], 1
+    while name.lower() in used:
+        n += 1
+        suffix = f" ({n})"
+        name = title[:31 - len(suffix)] + suffix
+    used.add(name.lower())
+    return name
+
+
+def write_xlsx(path, sheets: Iterable[Sheet]) -> None:
+    """Write (sheet name, frame) pairs to an .xlsx file, streaming rows (write-only mode)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    used = set()
+    for title, frame in sheets:
+        sheet = workbook.create_sheet(title=_sheet_title(str(title), used))
+        sheet.append([str(c) for c in frame.columns])
+        for row in frame.itertuples(index=False, name=None):
+            sheet.append([_cell(v) for v in row])
+    workbook.save(path)
+
+
+def xlsx_artifact(kind: str, version: str, sheets: Callable[[], Iterable[Sheet]],
+                  cache_dir: Optional[str] = None) -> Path:
+    """Cached workbook; sheets() is only called when the workbook has to be built"""
+    return cached_artifact(kind, version, ".xlsx", lambda part: write_xlsx(part, sheets()), cache_dir)
+
+
+# --- delegate package ----------------------------------------------------------
+
+def _safe_name(text: str) -> str:
+    return "".join(c for c in str(text) if c.isalnum() or c in (" ", "-", "_")).strip()
+
+
+def _photo(value) -> Optional[Path]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    text = str(value).strip()
+    if text.lower() in MISSING_VALUES:
+        return None
+    path = Path(text)
+    return path if path.is_file() else None
+
+
+def _photo_entries(records: Sequence[Dict], folder: str, name_key: str, id_key: str,
+                   photo_key: str) -> Tuple[List[Tuple[Path, str]], int]:
+    """([(photo file, archive name)], missing count) for delegate or speaker records"""
+    found, missing = [], 0
+    for record in records:
+        path = _photo(record.get(photo_key))
+        if path is None:
+            missing += 1
+            continue
+        name = _safe_name(str(record.get(name_key, "Unknown") or "Unknown").strip())
+        found.append((path, f"{folder}/{name}_{record.get(id_key, 'unknown')}.jpg"))
+    return found, missing
+
+
+def _write_csv(zf: zipfile.ZipFile, arcname: str, frame: pd.DataFrame) -> None:
+    with zf.open(arcname, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+        frame.to_csv(text, index=False)
+
+
+def _readme(export_df: pd.DataFrame, speakers: Sequence[Dict], summary: Dict) -> str:
+    report = f"""Conference Export Summary
+Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+PARTICIPANTS:
+- Total Delegates: {len(export_df)}
+- Total Speakers: {len(speakers)}
+- Total Participants: {len(export_df) + len(speakers)}
+
+PHOTOS:
+- Delegate Photos Included: {summary['delegate_photos']}
+- Delegate Photos Missing: {summary['delegate_photos_missing']}
+- Speaker Photos Included: {summary['speaker_photos']}
+- Speaker Photos Missing: {summary['speaker_photos_missing']}
+- Total Photos: {summary['photos']}
+- Total Missing: {summary['photos_missing']}
+
+ORGANIZATIONS:
+- Total Organizations: {export_df['Organization'].nunique() if len(export_df) > 0 else 0}
+- Organizations with Delegates: {', '.join(map(str, export_df['Organization'].unique()[:10])) if len(export_df) > 0 else 'None'}
+"""
+    if len(export_df) > 0:
+        report += "\nCATEGORIES:\n"
+        for category, count in export_df['Category'].value_counts().items():
+            report += f"- {category}: {count} delegates\n"
+    return report
+
+
+def delegate_package(export_df: pd.DataFrame, speakers: Sequence[Dict], workbook: Path,
+                     workbook_name: str, cache_dir: Optional[str] = None) -> Tuple[Path, Dict]:
+    """
+    ZIP with the conference workbook, delegate/category/speaker CSVs, photos
+    and a README, built on disk (cached per data version). Returns the path
+    and photo/participant counts.
+    """
+    delegate_photos, delegate_missing = _photo_entries(
+        export_df[["Name", "ID", "BadgePhoto"]].to_dict("records"), "delegate_photos", "Name", "ID", "BadgePhoto")
+    speaker_photos, speaker_missing = _photo_entries(speakers, "speaker_photos", "name", "id", "photo")
+    summary = {
+        "delegates": len(export_df),
+        "speakers": len(speakers),
+        "delegate_photos": len(delegate_photos),
+        "delegate_photos_missing": delegate_missing,
+        "speaker_photos": len(speaker_photos),
+        "speaker_photos_missing": speaker_missing,
+        "photos": len(delegate_photos) + len(speaker_photos),
+        "photos_missing": delegate_missing + speaker_missing,
+    }
+    photos = delegate_photos + speaker_photos
+    speakers_df = pd.DataFrame(list(speakers))
+    version = data_version(
+        frame_version(export_df), workbook.name, workbook_name,
+        hashlib.sha256(json.dumps(list(speakers), sort_keys=True, default=str).encode("utf-8")).hexdigest(),
+        *(f"{arcname}:{file_version(path)}" for path, arcname in photos),
+    )
+
+    def build(part: Path) -> None:
+        with zipfile.ZipFile(part, "w", zipfile.ZIP_DEFLATED) as zf:
+            # xlsx and photos are already compressed: store them, stream them from disk
+            zf.write(workbook, workbook_name, compress_type=zipfile.ZIP_STORED)
+            _write_csv(zf, "delegates_detailed.csv", export_df)
+            for category in sorted(export_df['Category'].dropna().unique()):
+                _write_csv(zf, f"delegates_by_category/{_safe_name(category)}.csv",
+                           export_df[export_df['Category'] == category])
+            if len(speakers_df):
+                _write_csv(zf, "speakers_detailed.csv", speakers_df)
+            for path, arcname in photos:
+                zf.write(path, arcname, compress_type=zipfile.ZIP_STORED)
+            zf.writestr("README.txt", _readme(export_df, speakers, summary))
+
+    return cached_artifact("package", version, ".zip", build, cache_dir), summary
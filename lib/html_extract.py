@@ -0,0 +1,191 @@
+"""
+HTML extraction for the web scrapers
+
+- Each document is parsed once per content hash, with lxml when it is
+  installed (html.parser otherwise), and the tree is shared by every
+  extraction from that body
+- Extracted blocks (page title/text/images, selector results) are cached
+  per (content hash, url, request), so a re-fetched but unchanged page
+  costs a hash
+- The main-content selector that matched a host is remembered and tried
+  first on that host's next page
+- Trees are never modified: script/style/nav/header/footer are skipped
+  while collecting text instead of being decomposed
+"""
+
+import hashlib
+import importlib.util
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from urllib.parse import urljoin, urlsplit
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+CONTENT_SELECTORS = [
+    'main', 'article', '.content', '.post-content',
+    '.entry-content', '.main-content', '#content'
+]
+SKIP_TAGS = frozenset(["script", "style", "nav", "header", "footer"])
+MAX_CONTENT_CHARS = 5000
+MAX_TREES = 8        # parsed trees are large; keep only the most recent few
+MAX_BLOCKS = 256
+
+IMG_STYLE = "max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;"
+
+_LOCK = threading.Lock()
+_TREES: "OrderedDict[str, BeautifulSoup]" = OrderedDict()
+_BLOCKS: "OrderedDict[tuple, Dict]" = OrderedDict()
+_HOST_SELECTOR: Dict[str, str] = {}
+
+
+def _lru_get(cache: OrderedDict, key):
+    with _LOCK:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def _lru_put(cache: OrderedDict, key, value, limit: int) -> None:
+    with _LOCK:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def parse_html(content: bytes, digest: Optional[str] = None) -> BeautifulSoup:
+    """Parsed tree for a document body, shared between callers (treat as read-only)"""
+    digest = digest or content_hash(content)
+    soup = _lru_get(_TREES, digest)
+    if soup is None:
+        soup = BeautifulSoup(content, PARSER)
+        _lru_put(_TREES, digest, soup, MAX_TREES)
+    return soup
+
+
+def absolute_url(src: str, base_url: str) -> str:
+    if src.startswith('//'):
+        return 'https:' + src
+    if not src.startswith('http'):
+        return urljoin(base_url, src)
+    return src
+
+
+def images_html(elements: List[Tag], base_url: str, default_alt: str = 'Image') -> str:
+    """<img> markup for every image inside elements, with absolute URLs"""
+    parts = []
+    for element in elements:
+        for img in element.find_all('img'):
+            src = img.get('src')
+            if src:
+                alt_text = img.get('alt', default_alt)
+                parts.append(f'<img src="{absolute_url(src, base_url)}" alt="{alt_text}" style="{IMG_STYLE}" /><br/>')
+    return "".join(parts)
+
+
+def _strings(element: Tag, skip=SKIP_TAGS):
+    """Text nodes under element, leaving out skipped subtrees (no tree mutation)"""
+    stack = [iter(element.children)]
+    while stack:
+        for child in stack[-1]:
+            if isinstance(child, Tag):
+                if child.name not in skip:
+                    stack.append(iter(child.children))
+                    break
+            elif type(child) in (NavigableString, CData):
+                yield child
+        else:
+            stack.pop()
+
+
+def visible_text(element: Tag, skip=SKIP_TAGS) -> str:
+    """Whitespace-normalized text of element without scripts, styles and page chrome"""
+    return ' '.join(''.join(_strings(element, skip)).split())
+
+
+def _main_block(soup: BeautifulSoup, host: str) -> Optional[Tag]:
+    remembered = _HOST_SELECTOR.get(host)
+    if remembered:
+        found = soup.select_one(remembered)
+        if found:
+            return found
+    for selector in CONTENT_SELECTORS:
+        if selector == remembered:
+            continue
+        found = soup.select_one(selector)
+        if found:
+            _HOST_SELECTOR[host] = selector
+            return found
+    return soup.find('body')
+
+
+def extract_page(content: bytes, url: str) -> Dict:
+    """Title, main text (capped) and images of a page; cached per body and URL"""
+    digest = content_hash(content)
+    key = (digest, url, "page")
+    block = _lru_get(_BLOCKS, key)
+    if block is not None:
+        return block
+
+    soup = parse_html(content, digest)
+    title = soup.find('title')
+    main_content = _main_block(soup, urlsplit(url).netloc.lower())
+    if main_content:
+        images = images_html([main_content], url)
+        text = visible_text(main_content)
+        if len(text) > MAX_CONTENT_CHARS:
+            text = text[:MAX_CONTENT_CHARS] + "..."
+    else:
+        images, text = "", "No main content found"
+    block = {
+        'title': title.get_text().strip() if title else "No Title Found",
+        'content': text,
+        'images_html': images,
+    }
+    _lru_put(_BLOCKS, key, block, MAX_BLOCKS)
+    return block
+
+
+def extract_selector(content: bytes, url: str, selector: Optional[str] = None,
+                     text_only: bool = True) -> Optional[Dict]:
+    """
+    Content and images for a CSS selector (whole page when selector is
+    None); None when the selector matches nothing. Cached per body and URL.
+    """
+    digest = content_hash(content)
+    key = (digest, url, "selector", selector, text_only)
+    with _LOCK:
+        if key in _BLOCKS:
+            _BLOCKS.move_to_end(key)
+            return _BLOCKS[key]
+
+    soup = parse_html(content, digest)
+    if selector:
+        elements = soup.select(selector)
+        if not elements:
+            block = None
+        elif text_only:
+            block = {'content': ' '.join(elem.get_text().strip() for elem in elements),
+                     'images_html': images_html(elements, url)}
+        else:
+            block = {'content': str(elements[0]), 'images_html': images_html(elements, url)}
+    else:
+        block = {'content': ' '.join(soup.get_text().split()),
+                 'images_html': images_html([soup], url)}
+    _lru_put(_BLOCKS, key, block, MAX_BLOCKS)
+    return block
+
+
+def clear_caches() -> None:
+    with _LOCK:
+        _TREES.clear()
+        _BLOCKS.clear()
+        _HOST_SELECTOR.clear()
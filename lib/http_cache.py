@@ -0,0 +1,391 @@
+"""
+Shared HTTP layer for the external-content fetchers
+
+- One pooled requests.Session (keep-alive, per-host connection pool) for
+  the whole process instead of a fresh connection per requests.get()
+- A process-wide response cache keyed on URL, shared by every browser
+  session: fresh entries are served directly, stale entries are served
+  while a single background request revalidates them (ETag /
+  Last-Modified, so an unchanged page costs a 304), and only one request
+  per URL is ever in flight
+- An optional on-disk tier (data/http_cache/) so a restarted app does not
+  refetch everything at once
+- Bodies are streamed and capped at MAX_RESPONSE_BYTES (per call with
+  max_bytes), and a caller can stop the read early once it has seen what
+  it needs (StopWhen), so one huge or endless page cannot pin a worker
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+DEFAULT_TIMEOUT = 10
+DEFAULT_TTL = 30 * 60           # seconds a response is served without revalidating
+DEFAULT_STALE = 24 * 60 * 60    # seconds a stale response may be served while revalidating
+HTTP_CACHE_DIR = os.environ.get("INSAKA_HTTP_CACHE_DIR", "data/http_cache")  # "" disables the disk tier
+MAX_MEMORY_ENTRIES = 256
+MAX_RESPONSE_BYTES = int(os.environ.get("INSAKA_HTTP_MAX_BYTES", 1024 * 1024))  # per response body
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StopWhen:
+    """
+    Early-termination rule for a streamed read. new() returns a fresh
+    feed(chunk) -> bool that answers True once enough of the body has been
+    seen. `key` names the rule, so a body cut short by it is only reused by
+    callers asking for the same rule.
+    """
+    key: str
+    new: Callable[[], Callable[[bytes], bool]]
+
+
+@dataclass
+class CachedResponse:
+    """The parts of a requests.Response the fetchers use, safe to share between sessions"""
+    url: str
+    status_code: int
+    content: bytes
+    encoding: Optional[str]
+    headers: Dict[str, str]
+    fetched_at: float                 # time.time() of the last successful (re)validation
+    ssl_fallback_used: bool = False
+    truncated: bool = False           # the body was cut short (size cap or a StopWhen rule)
+    stopped_by: Optional[str] = None  # "size" or the StopWhen key that cut it short
+    limit: int = 0                    # byte budget the body was read with
+    # Per-response memo for parsed/extracted results (see HttpCache.memo)
+    derived: Dict = field(default_factory=dict, repr=False, compare=False)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.fromtimestamp(self.fetched_at).isoformat()
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def json(self):
+        return json.loads(self.text)
+
+    def covers(self, max_bytes: int, until: Optional[StopWhen] = None) -> bool:
+        """Whether this body holds everything a read with max_bytes/until would have"""
+        if not self.truncated:
+            return True
+        if self.limit < max_bytes:
+            return False
+        return self.stopped_by == "size" or (until is not None and self.stopped_by == until.key)
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+_SESSION = _make_session()
+
+
+def get_session() -> requests.Session:
+    """The shared keep-alive session"""
+    return _SESSION
+
+
+def http_get(url: str, headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT, **kwargs):
+    """
+    GET through the pooled session. Retries once without certificate
+    verification on an SSL error, like the original fetchers did.
+    Returns (response, ssl_fallback_used).
+    """
+    try:
+        return _SESSION.get(url, headers=headers, timeout=timeout, verify=True, **kwargs), False
+    except requests.exceptions.SSLError:
+        # Fallback to unverified SSL for problematic certificates
+        return _SESSION.get(url, headers=headers, timeout=timeout, verify=False, **kwargs), True
+
+
+def read_capped(response, max_bytes: int = MAX_RESPONSE_BYTES,
+                until: Optional[Callable[[bytes], bool]] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    Read a response opened with stream=True, keeping at most max_bytes and
+    stopping as soon as until(chunk) is true. Returns (body, stopped_by),
+    where stopped_by is None when the whole body was read.
+    """
+    body = bytearray()
+    stopped_by = None
+    try:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            room = max_bytes - len(body)
+            if len(chunk) >= room:
+                body += chunk[:room]
+                stopped_by = "size"
+                break
+            body += chunk
+            if until is not None and until(chunk):
+                stopped_by = "until"
+                break
+    finally:
+        response.close()
+    return bytes(body), stopped_by
+
+
+def _sniff_encoding(content: bytes) -> Optional[str]:
+    # Same detector requests uses for apparent_encoding, on at most the first 64 KiB
+    try:
+        import charset_normalizer
+        best = charset_normalizer.from_bytes(content[:CHUNK_SIZE]).best()
+        return best.encoding if best else None
+    except ImportError:
+        return None
+
+
+def get_json(url: str, headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT,
+             max_bytes: int = MAX_RESPONSE_BYTES):
+    """GET and decode a JSON body of at most max_bytes (ValueError when it is larger)"""
+    response, _ = http_get(url, headers=headers, timeout=timeout, stream=True)
+    if response.status_code >= 400:
+        response.close()
+    response.raise_for_status()
+    content, stopped_by = read_capped(response, max_bytes)
+    if stopped_by:
+        raise ValueError(f"Response larger than {max_bytes} bytes")
+    return json.loads(content.decode(response.encoding or "utf-8", errors="replace"))
+
+
+class HttpCache:
+    def __init__(self, disk_dir: Optional[str] = HTTP_CACHE_DIR, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedResponse] = {}
+        self._inflight: Dict[str, threading.Lock] = {}
+        self._revalidating: set = set()
+
+    # --- disk tier -----------------------------------------------------------
+
+    def _disk_paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.disk_dir / f"{key}.json", self.disk_dir / f"{key}.body"
+
+    def _load_disk(self, url: str) -> Optional[CachedResponse]:
+        if self.disk_dir is None:
+            return None
+        meta_path, body_path = self._disk_paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("url") != url:
+                return None
+            return CachedResponse(
+                url=url,
+                status_code=meta["status_code"],
+                content=body_path.read_bytes(),
+                encoding=meta.get("encoding"),
+                headers=meta.get("headers", {}),
+                fetched_at=meta["fetched_at"],
+                ssl_fallback_used=meta.get("ssl_fallback_used", False),
+                truncated=meta.get("truncated", False),
+                stopped_by=meta.get("stopped_by"),
+                limit=meta.get("limit", 0),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_disk(self, entry: CachedResponse) -> None:
+        if self.disk_dir is None:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            meta_path, body_path = self._disk_paths(entry.url)
+            tmp = body_path.with_suffix(".body.tmp")
+            tmp.write_bytes(entry.content)
+            os.replace(tmp, body_path)
+            meta = {
+                "url": entry.url,
+                "status_code": entry.status_code,
+                "encoding": entry.encoding,
+                "headers": entry.headers,
+                "fetched_at": entry.fetched_at,
+                "ssl_fallback_used": entry.ssl_fallback_used,
+                "truncated": entry.truncated,
+                "stopped_by": entry.stopped_by,
+                "limit": entry.limit,
+            }
+            tmp = meta_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, meta_path)
+        except OSError:
+            pass  # the disk tier is best-effort
+
+    # --- memory tier ---------------------------------------------------------
+
+    def _lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            entry = self._load_disk(url)
+            if entry is not None:
+                self._store(entry, persist=False)
+        return entry
+
+    def _store(self, entry: CachedResponse, persist: bool = True) -> None:
+        with self._lock:
+            self._entries.pop(entry.url, None)
+            self._entries[entry.url] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        if persist:
+            self._save_disk(entry)
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._inflight.setdefault(url, threading.Lock())
+
+    # --- fetching ------------------------------------------------------------
+
+    def _fetch(self, url: str, previous: Optional[CachedResponse], headers: Optional[Dict],
+               timeout: float, max_bytes: int = MAX_RESPONSE_BYTES,
+               until: Optional[StopWhen] = None) -> CachedResponse:
+        request_headers = dict(headers or {})
+        if previous is not None and not previous.covers(max_bytes, until):
+            previous = None  # a partial body cannot be revalidated into a full one
+        if previous is not None:
+            if previous.headers.get("etag"):
+                request_headers["If-None-Match"] = previous.headers["etag"]
+            if previous.headers.get("last-modified"):
+                request_headers["If-Modified-Since"] = previous.headers["last-modified"]
+        response, ssl_fallback_used = http_get(url, headers=request_headers, timeout=timeout, stream=True)
+        if response.status_code == 304 and previous is not None:
+            response.close()
+            # Unchanged upstream: keep the body (and anything derived from it), reset the clock
+            previous.fetched_at = time.time()
+            self._store(previous)
+            return previous
+        if response.status_code >= 400:
+            response.close()
+        response.raise_for_status()
+        content, stopped_by = read_capped(response, max_bytes, until.new() if until else None)
+        if stopped_by == "until":
+            stopped_by = until.key
+        entry = CachedResponse(
+            url=url,
+            status_code=response.status_code,
+            content=content,
+            # apparent_encoding would sniff the body, so only do that for what was kept
+            encoding=response.encoding or _sniff_encoding(content),
+            headers={k.lower(): v for k, v in response.headers.items()
+                     if k.lower() in ("etag", "last-modified", "content-type")},
+            fetched_at=time.time(),
+            ssl_fallback_used=ssl_fallback_used,
+            truncated=stopped_by is not None,
+            stopped_by=stopped_by,
+            limit=max_bytes,
+        )
+        self._store(entry)
+        return entry
+
+    def _revalidate_in_background(self, url: str, entry: CachedResponse, headers, timeout,
+                                  max_bytes: int, until: Optional[StopWhen]) -> None:
+        with self._lock:
+            if url in self._revalidating:
+                return
+            self._revalidating.add(url)
+
+        def run():
+            try:
+                with self._url_lock(url):
+                    self._fetch(url, entry, headers, timeout, max_bytes, until)
+            except Exception:
+                pass  # keep serving the stale copy; the next request retries
+            finally:
+                with self._lock:
+                    self._revalidating.discard(url)
+
+        threading.Thread(target=run, name="http-revalidate", daemon=True).start()
+
+    def get(self, url: str, ttl: float = DEFAULT_TTL, stale: float = DEFAULT_STALE,
+            headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT,
+            force: bool = False, fallback: bool = True, max_bytes: int = MAX_RESPONSE_BYTES,
+            until: Optional[StopWhen] = None) -> CachedResponse:
+        """
+        Cached GET. Raises requests exceptions only when there is no usable
+        cached copy to fall back on (or always, with fallback=False).
+        """
+        entry = self._lookup(url)
+        if entry is not None and not entry.covers(max_bytes, until):
+            entry = None  # cut short for a different caller; fetch what this one needs
+        if entry is not None and not force:
+            age = entry.age()
+            if age < ttl:
+                return entry
+            if age < ttl + stale:
+                self._revalidate_in_background(url, entry, headers, timeout, max_bytes, until)
+                return entry
+        # Single flight: concurrent callers for the same URL wait for one request
+        with self._url_lock(url):
+            current = self._lookup(url)
+            if (current is not None and current is not entry and not force and current.age() < ttl
+                    and current.covers(max_bytes, until)):
+                return current  # another caller fetched it while we waited
+            try:
+                return self._fetch(url, current, headers, timeout, max_bytes, until)
+            except requests.exceptions.RequestException:
+                if current is not None and fallback and current.covers(max_bytes, until):
+                    return current
+                raise
+
+    def memo(self, response: CachedResponse, key, compute):
+        """Cache compute(response) on the response, so each body is parsed once per key"""
+        if key not in response.derived:
+            response.derived[key] = compute(response)
+        return response.derived[key]
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(url, None)
+        if self.disk_dir is not None and self.disk_dir.exists():
+            paths = self._disk_paths(url) if url else list(self.disk_dir.glob("*.json")) + list(self.disk_dir.glob("*.body"))
+            for p in paths:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+
+_CACHE = HttpCache()
+
+
+def cached_get(url: str, ttl: float = DEFAULT_TTL, stale: float = DEFAULT_STALE,
+               headers: Optional[Dict] = None, timeout: float = DEFAULT_TIMEOUT,
+               force: bool = False, fallback: bool = True, max_bytes: int = MAX_RESPONSE_BYTES,
+               until: Optional[StopWhen] = None) -> CachedResponse:
+    """Process-wide cached GET shared by every session (see HttpCache.get)"""
+    return _CACHE.get(url, ttl=ttl, stale=stale, headers=headers, timeout=timeout,
+                      force=force, fallback=fallback, max_bytes=max_bytes, until=until)
+
+
+def memo(response: CachedResponse, key, compute):
+    """Parse/extract a cached response once per key (see HttpCache.memo)"""
+    return _CACHE.memo(response, key, compute)
+
+
+def invalidate(url: Optional[str] = None) -> None:
+    """Drop one URL (or everything) from the memory and disk tiers"""
+    _CACHE.invalidate(url)
@@ -0,0 +1,137 @@
+"""
+Append-only JSON-lines helpers shared by the data stores
+(check-in events, notifications, matchmaking).
+
+- file_lock(): cross-process exclusive lock (fcntl on POSIX, a thread lock elsewhere)
+- append_records(): one write + fsync for a batch of records
+- JsonlTail: remembers how far a file has been read so callers only parse
+  lines appended since last time, and notices when the file was rewritten
+- next_sequence(): monotonic integer IDs that survive restarts and
+  concurrent writers
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows dev machines
+    fcntl = None
+
+# Without fcntl we can at least serialize threads within this process
+_FALLBACK_LOCK = threading.RLock()
+
+
+@contextmanager
+def file_lock(lock_path):
+    """Hold an exclusive lock on lock_path for the duration of the block"""
+    if fcntl is None:
+        with _FALLBACK_LOCK:
+            yield
+        return
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def append_records(path, records: Iterable[Dict], fsync: bool = True) -> None:
+    """Append records as JSON lines with a single write"""
+    data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    if not data:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def rewrite_records(path, records: Iterable[Dict]) -> None:
+    """Atomically replace a JSON-lines file (used for compaction)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        for r in records:
+            fh.write(json.dumps(r, ensure_ascii=False) + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+
+
+class JsonlTail:
+    """Incremental reader for an append-only JSON-lines file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.inode = None
+
+    def reset(self) -> None:
+        self.offset, self.inode = 0, None
+
+    def read_new(self) -> Tuple[bool, List[Dict]]:
+        """
+        Return (restarted, records). restarted is True when the file was
+        replaced or truncated since the last read; the caller should drop
+        anything it folded before and apply records from scratch.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            restarted = self.inode is not None
+            self.reset()
+            return restarted, []
+        restarted = False
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            restarted = self.inode is not None or self.offset != 0
+            self.offset, self.inode = 0, st.st_ino
+        if st.st_size == self.offset:
+            return restarted, []
+        with open(self.path, "rb") as fh:
+            fh.seek(self.offset)
+            chunk = fh.read(st.st_size - self.offset)
+        # Only consume complete lines; a partial trailing line is picked up next time
+        end = chunk.rfind(b"\n") + 1
+        records = []
+        for line in chunk[:end].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass  # a torn or hand-edited line should not break readers
+        self.offset += end
+        return restarted, records
+
+
+def next_sequence(counter_path, count: int = 1, floor: int = 0) -> int:
+    """
+    Reserve `count` consecutive IDs and return the first one.
+    IDs never go below floor + 1 (so a migrated store continues after its
+    existing maximum).
+    """
+    counter_path = Path(counter_path)
+    with file_lock(counter_path.with_suffix(".lock")):
+        try:
+            current = int(counter_path.read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            current = 0
+        current = max(current, floor)
+        tmp = counter_path.with_suffix(".tmp")
+        tmp.write_text(str(current + count))
+        os.replace(tmp, counter_path)
+    return current + 1
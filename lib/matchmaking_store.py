@@ -0,0 +1,269 @@
+"""
+Matchmaking interaction store for Insaka Conference App
+Connection requests, chat messages, meeting requests and contact sharing
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from lib.jsonl_store import JsonlTail, append_records, file_lock, next_sequence, rewrite_records
+
+# Legacy single-file store; imported into the log on first use
+MATCHMAKING_FILE = "data/matchmaking.json"
+MATCHMAKING_DIR = "data/matchmaking"
+
+def _uid(user_id) -> str:
+    return "" if user_id is None else str(user_id)
+
+def _pair(user1_id, user2_id) -> Tuple[str, str]:
+    a, b = _uid(user1_id), _uid(user2_id)
+    return (a, b) if a <= b else (b, a)
+
+class _MatchmakingStore:
+    """
+    Interactions kept in an append-only JSON-lines log of operations
+    (add / update) folded into in-memory indexes:
+
+    - id -> interaction, in the order interactions were appended
+    - (min_id, max_id) -> interaction IDs between that pair of users
+    - user_id -> interaction IDs the user sent or received
+
+    Connection status between two users is a dict lookup, and a page of
+    delegate cards is answered with one call. IDs come from an on-disk
+    counter, so concurrent writers never hand out the same ID. The log is
+    rewritten once updates far outnumber live interactions.
+    """
+
+    def __init__(self, root: str, legacy_file: str):
+        self.root = Path(root)
+        self.legacy_file = Path(legacy_file)
+        self.path = self.root / "interactions.jsonl"
+        self.counter = self.root / "next_id"
+        self.lock_path = self.root / "store.lock"
+        self._lock = threading.RLock()
+        self._tail = JsonlTail(self.path)
+        self._by_id: Dict[int, Dict] = {}
+        self._by_pair: Dict[Tuple[str, str], List[int]] = {}
+        self._by_user: Dict[str, List[int]] = {}
+        self._ops = 0
+        self._migrated = False
+
+    # --- layout --------------------------------------------------------------
+
+    def _migrate_legacy(self) -> None:
+        if self._migrated:
+            return
+        self._migrated = True
+        if self.root.exists() or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception:
+            legacy = []
+        with file_lock(self.lock_path):
+            if self.path.exists():
+                return  # another process got there first
+            self._write_all(legacy)
+
+    def _write_all(self, interactions: List[Dict]) -> None:
+        # Legacy records numbered themselves len(list) + 1, so IDs can repeat;
+        # renumber duplicates past the current maximum to keep every ID unique
+        max_id = max((int(i.get("id", 0) or 0) for i in interactions), default=0)
+        seen = set()
+        records = []
+        for i in interactions:
+            i = dict(i)
+            iid = int(i.get("id", 0) or 0)
+            if iid <= 0 or iid in seen:
+                max_id += 1
+                iid = max_id
+            i["id"] = iid
+            seen.add(iid)
+            records.append({"op": "add", "i": i})
+        rewrite_records(self.path, records)
+        next_sequence(self.counter, count=0, floor=max_id)
+
+    # --- folding -------------------------------------------------------------
+
+    def _reset(self) -> None:
+        self._by_id, self._by_pair, self._by_user = {}, {}, {}
+        self._ops = 0
+
+    def _apply(self, rec: Dict) -> None:
+        op = rec.get("op")
+        if op == "add":
+            i = rec["i"]
+            iid = i["id"]
+            if iid in self._by_id:
+                return
+            self._by_id[iid] = i
+            self._by_pair.setdefault(_pair(i.get("from_user_id"), i.get("to_user_id")), []).append(iid)
+            users = {_uid(i.get("from_user_id")), _uid(i.get("to_user_id"))}
+            for u in users:
+                self._by_user.setdefault(u, []).append(iid)
+        elif op == "update":
+            i = self._by_id.get(rec.get("id"))
+            if i is not None:
+                i.update(rec.get("fields", {}))
+        self._ops += 1
+
+    def _catch_up(self) -> None:
+        self._migrate_legacy()
+        restarted, records = self._tail.read_new()
+        if restarted:
+            self._reset()
+        for rec in records:
+            try:
+                self._apply(rec)
+            except (KeyError, TypeError):
+                pass
+
+    # --- writing -------------------------------------------------------------
+
+    def _append(self, records: List[Dict]) -> None:
+        with file_lock(self.lock_path):
+            self._catch_up()
+            append_records(self.path, records)
+            self._catch_up()
+            if self._ops > 2 * len(self._by_id) + 64:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the log as one add record per live interaction (lock held)"""
+        rewrite_records(self.path, [{"op": "add", "i": i} for i in self._by_id.values()])
+        self._tail.reset()
+        self._reset()
+        self._catch_up()
+
+    # --- public operations ---------------------------------------------------
+
+    def add(self, interaction: Dict) -> Dict:
+        with self._lock:
+            self._migrate_legacy()
+            interaction["id"] = next_sequence(self.counter)
+            self._append([{"op": "add", "i": interaction}])
+            return interaction
+
+    def update(self, interaction_ids: Iterable[int], fields: Dict) -> int:
+        with self._lock:
+            self._catch_up()
+            ids = [iid for iid in dict.fromkeys(interaction_ids) if iid in self._by_id]
+            if ids:
+                self._append([{"op": "update", "id": iid, "fields": fields} for iid in ids])
+            return len(ids)
+
+    def for_user(self, user_id) -> List[Dict]:
+        with self._lock:
+            self._catch_up()
+            return [dict(self._by_id[iid]) for iid in self._by_user.get(_uid(user_id), [])]
+
+    def for_pair(self, user1_id, user2_id) -> List[Dict]:
+        with self._lock:
+            self._catch_up()
+            return [dict(self._by_id[iid]) for iid in self._by_pair.get(_pair(user1_id, user2_id), [])]
+
+    def statuses(self, user_id, other_ids: Iterable) -> Dict[str, str]:
+        with self._lock:
+            self._catch_up()
+            result = {}
+            for other in other_ids:
+                ids = self._by_pair.get(_pair(user_id, other))
+                # The first interaction between a pair decides the connection status
+                result[_uid(other)] = self._by_id[ids[0]].get("status", "pending") if ids else "none"
+            return result
+
+    def connected(self, user_id) -> Set[str]:
+        with self._lock:
+            self._catch_up()
+            me = _uid(user_id)
+            result = set()
+            for iid in self._by_user.get(me, []):
+                i = self._by_id[iid]
+                other = _uid(i.get("to_user_id")) if _uid(i.get("from_user_id")) == me else _uid(i.get("from_user_id"))
+                ids = self._by_pair.get(_pair(me, other))
+                if ids and self._by_id[ids[0]].get("status") == "accepted":
+                    result.add(other)
+            return result
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            self._catch_up()
+            return [dict(i) for i in self._by_id.values()]
+
+    def replace_all(self, interactions: List[Dict]) -> None:
+        with self._lock:
+            self._migrate_legacy()
+            with file_lock(self.lock_path):
+                self._write_all(interactions)
+            self._catch_up()
+
+
+_STORE = _MatchmakingStore(MATCHMAKING_DIR, MATCHMAKING_FILE)
+
+def load_matchmaking_data() -> List[Dict]:
+    """Load all matchmaking interactions"""
+    try:
+        return _STORE.all()
+    except Exception:
+        return []
+
+def save_matchmaking_data(data: List[Dict]) -> bool:
+    """Replace every matchmaking interaction (bulk maintenance only)"""
+    try:
+        _STORE.replace_all(data)
+        return True
+    except Exception:
+        return False
+
+def add_interaction(interaction: Dict) -> Optional[Dict]:
+    """Append an interaction and assign it a unique ID"""
+    try:
+        return _STORE.add(interaction)
+    except Exception:
+        return None
+
+def update_interaction(interaction_id: int, **fields) -> bool:
+    """Update fields (e.g. status) of one interaction"""
+    return update_interactions([interaction_id], **fields) > 0
+
+def update_interactions(interaction_ids: Iterable[int], **fields) -> int:
+    """Update the same fields on several interactions with one write"""
+    try:
+        return _STORE.update(interaction_ids, fields)
+    except Exception:
+        return 0
+
+def get_user_interactions(user_id) -> List[Dict]:
+    """Get all interactions a user sent or received"""
+    try:
+        return _STORE.for_user(user_id)
+    except Exception:
+        return []
+
+def get_pair_interactions(user1_id, user2_id) -> List[Dict]:
+    """Get all interactions between two users"""
+    try:
+        return _STORE.for_pair(user1_id, user2_id)
+    except Exception:
+        return []
+
+def get_connection_status(user1_id, user2_id) -> str:
+    """Get connection status between two users ('none' if they never interacted)"""
+    return get_connection_statuses(user1_id, [user2_id]).get(_uid(user2_id), "none")
+
+def get_connection_statuses(user_id, other_ids: Iterable) -> Dict[str, str]:
+    """Connection status between user_id and each of other_ids, keyed by str(other_id)"""
+    try:
+        return _STORE.statuses(user_id, other_ids)
+    except Exception:
+        return {}
+
+def get_connected_user_ids(user_id) -> Set[str]:
+    """IDs (as strings) of everyone user_id has an accepted connection with"""
+    try:
+        return _STORE.connected(user_id)
+    except Exception:
+        return set()
@@ -0,0 +1,89 @@
+"""
+Concurrent fetching of several external sources
+
+Sources run concurrently on an asyncio loop, so a page waits for the
+slowest source instead of the sum of them all:
+
+- one timeout budget shared by the whole batch (each request gets at most
+  what is left of it)
+- at most PER_HOST_LIMIT requests in flight per host
+- partial results: a source that misses the budget or fails gets an error
+  result, the others are returned as they are
+
+The blocking fetchers (requests through lib.http_cache) run on a private
+thread pool. A source that misses the budget keeps running there and warms
+the shared HTTP cache, so the next render usually has it.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+from urllib.parse import urlsplit
+
+DEFAULT_BUDGET = 15.0   # seconds for a whole batch
+PER_HOST_LIMIT = 4
+MAX_WORKERS = 16
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="multi-fetch")
+
+
+@dataclass(frozen=True)
+class FetchJob:
+    name: str
+    url: str                          # used for the per-host limit
+    run: Callable[[float], Dict]      # called with the seconds left in the budget
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _error(message: str) -> Dict:
+    return {'success': False, 'content': None, 'images_html': None, 'error': message}
+
+
+async def gather_jobs(jobs: List[FetchJob], budget: float = DEFAULT_BUDGET,
+                      per_host: int = PER_HOST_LIMIT) -> Dict[str, Dict]:
+    """Run jobs concurrently; returns {job.name: result}, in job order"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    limits: Dict[str, asyncio.Semaphore] = {}
+
+    async def run_one(job: FetchJob) -> Dict:
+        async with limits.setdefault(_host(job.url), asyncio.Semaphore(per_host)):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return _error("Timed out waiting for other requests to the same site")
+            return await loop.run_in_executor(_EXECUTOR, job.run, remaining)
+
+    tasks = {job.name: asyncio.ensure_future(run_one(job)) for job in jobs}
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=max(0.0, deadline - loop.time()))
+
+    results = {}
+    for name, task in tasks.items():
+        if not task.done():
+            task.cancel()
+            results[name] = _error(f"Timed out after {budget:g}s")
+        elif task.exception() is not None:
+            results[name] = _error(f"Error fetching content: {task.exception()}")
+        else:
+            results[name] = task.result()
+    return results
+
+
+def fetch_all(jobs: List[FetchJob], budget: float = DEFAULT_BUDGET,
+              per_host: int = PER_HOST_LIMIT) -> Dict[str, Dict]:
+    """Blocking wrapper around gather_jobs for Streamlit pages and worker threads"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(gather_jobs(jobs, budget, per_host))
+    # Called from inside a running loop: run the batch on its own loop in a thread
+    box: Dict[str, Dict] = {}
+    worker = threading.Thread(target=lambda: box.update(asyncio.run(gather_jobs(jobs, budget, per_host))))
+    worker.start()
+    worker.join()
+    return box
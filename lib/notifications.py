@@ -3,29 +3,322 @@ Notification System for Insaka Conference App
 Handles notification tracking and display across all components
 """
 
+import bisect
 import json
-import os
+import threading
+import zlib
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, List, Optional
 
+from lib.jsonl_store import JsonlTail, append_records, file_lock, next_sequence, rewrite_records
+
+# Legacy single-file store; imported into the sharded store on first use
 NOTIFICATIONS_FILE = "data/notifications.json"
+NOTIFICATIONS_DIR = "data/notifications"
+NOTIFICATION_SHARDS = 16
+# Recipient for broadcast notifications; other topics (e.g. a delegate category) can be used too
+ALL_USERS = "all"
+
+class _NotificationStore:
+    """
+    Notifications sharded by user_id into append-only JSON-lines files.
+
+    Each shard is a log of operations (add / read / read_all / clear /
+    cursor) folded into an in-memory index of user_id -> notifications plus
+    a cached unread counter, so badge counts are a dict lookup and adding a
+    notification is a single append. Shards are compacted once their log
+    grows well past the number of live notifications.
+
+    Broadcast (topic) notifications are stored once in broadcast.jsonl.
+    Each user only has a read cursor: the highest broadcast ID they have
+    read. Unread broadcasts are counted with a bisect over the topic's
+    sorted IDs, so announcing to every delegate costs one write.
+    """
+
+    def __init__(self, root: str, legacy_file: str, shards: int = NOTIFICATION_SHARDS):
+        self.root = Path(root)
+        self.legacy_file = Path(legacy_file)
+        self.shards = shards
+        self.counter = self.root / "next_id"
+        self.lock_path = self.root / "store.lock"
+        self._lock = threading.RLock()
+        self._tails = [JsonlTail(self._shard_path(i)) for i in range(shards)]
+        self._by_user: Dict[str, Dict[int, Dict]] = {}
+        self._unread: Dict[str, int] = {}
+        self._owner: Dict[int, str] = {}
+        self._shard_users: List[set] = [set() for _ in range(shards)]
+        self._ops = [0] * shards
+        self._cursor: Dict[str, int] = {}
+        self._bcast_path = self.root / "broadcast.jsonl"
+        self._bcast_tail = JsonlTail(self._bcast_path)
+        self._bcast_ids: Dict[str, List[int]] = {}
+        self._bcast_by_id: Dict[int, Dict] = {}
+        self._migrated = False
+
+    # --- layout --------------------------------------------------------------
+
+    def _shard_of(self, user_id) -> int:
+        return zlib.crc32(str(user_id).encode("utf-8")) % self.shards
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.root / f"shard_{shard:02d}.jsonl"
+
+    def _migrate_legacy(self) -> None:
+        if self._migrated:
+            return
+        self._migrated = True
+        if self.root.exists() or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception:
+            legacy = []
+        with file_lock(self.lock_path):
+            if any(self._shard_path(i).exists() for i in range(self.shards)):
+                return  # another process got there first
+            self._write_all(legacy)
+
+    def _write_all(self, notifications: List[Dict]) -> None:
+        grouped: List[List[Dict]] = [[] for _ in range(self.shards)]
+        broadcasts = []
+        for n in notifications:
+            if n.get("broadcast") or n.get("user_id") == ALL_USERS:
+                n = {k: v for k, v in n.items() if k not in ("read", "read_at")}
+                n.setdefault("topic", n.get("user_id", ALL_USERS))
+                broadcasts.append(n)
+            else:
+                grouped[self._shard_of(n.get("user_id"))].append({"op": "add", "n": n})
+        # Keep existing read cursors so a bulk save does not mark broadcasts unread again
+        for user_id, upto in self._cursor.items():
+            grouped[self._shard_of(user_id)].append({"op": "cursor", "user_id": user_id, "upto": upto})
+        for i, records in enumerate(grouped):
+            rewrite_records(self._shard_path(i), records)
+        rewrite_records(self._bcast_path, broadcasts)
+        max_id = max((int(n.get("id", 0) or 0) for n in notifications), default=0)
+        next_sequence(self.counter, count=0, floor=max_id)
+
+    # --- folding -------------------------------------------------------------
+
+    def _drop_shard(self, shard: int) -> None:
+        for user_id in self._shard_users[shard]:
+            for nid in self._by_user.pop(user_id, {}):
+                self._owner.pop(nid, None)
+            self._unread.pop(user_id, None)
+            self._cursor.pop(user_id, None)
+        self._shard_users[shard] = set()
+        self._ops[shard] = 0
+
+    def _apply(self, shard: int, rec: Dict) -> None:
+        op = rec.get("op")
+        if op == "add":
+            n = rec["n"]
+            user_id = n.get("user_id")
+            self._by_user.setdefault(user_id, {})[n["id"]] = n
+            self._owner[n["id"]] = user_id
+            self._shard_users[shard].add(user_id)
+            if not n.get("read", False):
+                self._unread[user_id] = self._unread.get(user_id, 0) + 1
+        elif op == "read":
+            user_id = self._owner.get(rec.get("id"))
+            n = self._by_user.get(user_id, {}).get(rec.get("id"))
+            if n is not None and not n.get("read", False):
+                n["read"], n["read_at"] = True, rec.get("at")
+                self._unread[user_id] -= 1
+        elif op == "read_all":
+            for n in self._by_user.get(rec.get("user_id"), {}).values():
+                if not n.get("read", False):
+                    n["read"], n["read_at"] = True, rec.get("at")
+            self._unread[rec.get("user_id")] = 0
+        elif op == "clear":
+            for nid in self._by_user.pop(rec.get("user_id"), {}):
+                self._owner.pop(nid, None)
+            self._unread.pop(rec.get("user_id"), None)
+        elif op == "cursor":
+            user_id = rec.get("user_id")
+            self._cursor[user_id] = max(self._cursor.get(user_id, 0), int(rec.get("upto", 0)))
+            self._shard_users[shard].add(user_id)
+        self._ops[shard] += 1
+
+    def _catch_up(self, shard: int) -> None:
+        self._migrate_legacy()
+        restarted, records = self._tails[shard].read_new()
+        if restarted:
+            self._drop_shard(shard)
+        for rec in records:
+            try:
+                self._apply(shard, rec)
+            except (KeyError, TypeError):
+                pass
+
+    def _catch_up_all(self) -> None:
+        for i in range(self.shards):
+            self._catch_up(i)
+
+    def _catch_up_broadcasts(self) -> None:
+        self._migrate_legacy()
+        restarted, records = self._bcast_tail.read_new()
+        if restarted:
+            self._bcast_ids, self._bcast_by_id = {}, {}
+        for n in records:
+            if "id" not in n or n["id"] in self._bcast_by_id:
+                continue
+            n["broadcast"] = True
+            self._bcast_by_id[n["id"]] = n
+            # IDs are reserved before the append, so concurrent writers can land slightly out of order
+            bisect.insort(self._bcast_ids.setdefault(n.get("topic", ALL_USERS), []), n["id"])
+
+    def _topics(self, topics) -> List[str]:
+        return [ALL_USERS] + [t for t in (topics or []) if t and t != ALL_USERS]
+
+    def _unread_broadcasts(self, user_id, topics) -> int:
+        cursor = self._cursor.get(user_id, 0)
+        total = 0
+        for topic in self._topics(topics):
+            ids = self._bcast_ids.get(topic, [])
+            total += len(ids) - bisect.bisect_right(ids, cursor)
+        return total
+
+    def _latest_broadcast(self, topics) -> int:
+        return max((self._bcast_ids[t][-1] for t in self._topics(topics) if self._bcast_ids.get(t)), default=0)
+
+    # --- writing -------------------------------------------------------------
+
+    def _append(self, shard: int, records: List[Dict]) -> None:
+        with file_lock(self.lock_path):
+            self._catch_up(shard)
+            append_records(self._shard_path(shard), records)
+            self._catch_up(shard)
+            live = sum(len(self._by_user.get(u, {})) for u in self._shard_users[shard])
+            if self._ops[shard] > 2 * live + 64:
+                self._compact(shard)
+
+    def _compact(self, shard: int) -> None:
+        """Rewrite a shard as one add record per live notification (lock held)"""
+        records = [
+            {"op": "add", "n": n}
+            for u in sorted(self._shard_users[shard], key=str)
+            for n in self._by_user.get(u, {}).values()
+        ]
+        records += [
+            {"op": "cursor", "user_id": u, "upto": self._cursor[u]}
+            for u in sorted(self._shard_users[shard], key=str)
+            if u in self._cursor
+        ]
+        rewrite_records(self._shard_path(shard), records)
+        self._tails[shard].reset()
+        self._drop_shard(shard)
+        self._catch_up(shard)
+
+    # --- public operations ---------------------------------------------------
+
+    def add(self, notification: Dict) -> Dict:
+        with self._lock:
+            self._migrate_legacy()
+            notification["id"] = next_sequence(self.counter)
+            self._append(self._shard_of(notification["user_id"]), [{"op": "add", "n": notification}])
+            return notification
+
+    def add_broadcast(self, notification: Dict) -> Dict:
+        with self._lock:
+            self._migrate_legacy()
+            notification["id"] = next_sequence(self.counter)
+            with file_lock(self.lock_path):
+                append_records(self._bcast_path, [notification])
+            self._catch_up_broadcasts()
+            return notification
+
+    def for_user(self, user_id, topics=None) -> List[Dict]:
+        with self._lock:
+            self._catch_up(self._shard_of(user_id))
+            self._catch_up_broadcasts()
+            cursor = self._cursor.get(user_id, 0)
+            notifications = [dict(n) for n in self._by_user.get(user_id, {}).values()]
+            for topic in self._topics(topics):
+                for nid in self._bcast_ids.get(topic, []):
+                    n = dict(self._bcast_by_id[nid])
+                    n["read"] = nid <= cursor
+                    notifications.append(n)
+            return notifications
+
+    def count(self, user_id, unread_only: bool = True, topics=None) -> int:
+        with self._lock:
+            self._catch_up(self._shard_of(user_id))
+            self._catch_up_broadcasts()
+            if unread_only:
+                return self._unread.get(user_id, 0) + self._unread_broadcasts(user_id, topics)
+            return len(self._by_user.get(user_id, {})) + sum(
+                len(self._bcast_ids.get(t, [])) for t in self._topics(topics)
+            )
+
+    def _advance_cursor(self, user_id, upto: int) -> None:
+        if upto > self._cursor.get(user_id, 0):
+            self._append(self._shard_of(user_id), [{"op": "cursor", "user_id": user_id, "upto": upto}])
+
+    def mark_read(self, notification_id, user_id=None) -> bool:
+        with self._lock:
+            self._catch_up_broadcasts()
+            if notification_id in self._bcast_by_id:
+                # Broadcast reads are per user: move that user's high-water mark
+                if user_id is None:
+                    return False
+                self._catch_up(self._shard_of(user_id))
+                self._advance_cursor(user_id, notification_id)
+                return True
+            if notification_id not in self._owner:
+                self._catch_up_all()
+            user_id = self._owner.get(notification_id)
+            if user_id is None:
+                return False
+            at = datetime.now().isoformat()
+            self._append(self._shard_of(user_id), [{"op": "read", "id": notification_id, "at": at}])
+            return True
+
+    def mark_all_read(self, user_id, topics=None) -> None:
+        with self._lock:
+            at = datetime.now().isoformat()
+            self._append(self._shard_of(user_id), [{"op": "read_all", "user_id": user_id, "at": at}])
+            self._catch_up_broadcasts()
+            self._advance_cursor(user_id, self._latest_broadcast(topics))
+
+    def clear(self, user_id) -> None:
+        with self._lock:
+            self._append(self._shard_of(user_id), [{"op": "clear", "user_id": user_id}])
+            # Broadcasts are shared, so "clearing" them just marks them read for this user
+            self._catch_up_broadcasts()
+            self._advance_cursor(user_id, max(self._bcast_by_id, default=0))
+
+    def all(self) -> List[Dict]:
+        with self._lock:
+            self._catch_up_all()
+            self._catch_up_broadcasts()
+            notifications = [dict(n) for notes in self._by_user.values() for n in notes.values()]
+            notifications += [dict(n, user_id=n.get("topic", ALL_USERS)) for n in self._bcast_by_id.values()]
+            return sorted(notifications, key=lambda n: n.get("id", 0))
+
+    def replace_all(self, notifications: List[Dict]) -> None:
+        with self._lock:
+            self._migrate_legacy()
+            with file_lock(self.lock_path):
+                self._write_all(notifications)
+            self._catch_up_all()
+            self._catch_up_broadcasts()
+
+
+_STORE = _NotificationStore(NOTIFICATIONS_DIR, NOTIFICATIONS_FILE)
 
 def load_notifications() -> List[Dict]:
-    """Load notifications from JSON file"""
+    """Load all notifications (every shard)"""
     try:
-        if os.path.exists(NOTIFICATIONS_FILE):
-            with open(NOTIFICATIONS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
+        return _STORE.all()
     except Exception:
         return []
 
 def save_notifications(notifications: List[Dict]) -> bool:
-    """Save notifications to JSON file"""
+    """Replace the whole notification store (bulk maintenance only)"""
     try:
-        os.makedirs(os.path.dirname(NOTIFICATIONS_FILE), exist_ok=True)
-        with open(NOTIFICATIONS_FILE, "w", encoding="utf-8") as f:
-            json.dump(notifications, f, indent=2, ensure_ascii=False)
+        _STORE.replace_all(notifications)
         return True
     except Exception:
         return False
@@ -38,11 +331,11 @@ def add_notification(
     priority: str = "Normal",
     data: Optional[Dict] = None
 ) -> bool:
-    """Add a new notification for a user"""
-    notifications = load_notifications()
+    """Add a new notification for a user (user_id="all" broadcasts to everyone)"""
+    if user_id == ALL_USERS:
+        return add_broadcast(notification_type, title, message, priority=priority, data=data)
     
     notification = {
-        "id": len(notifications) + 1,
         "user_id": user_id,
         "type": notification_type,
         "title": title,
@@ -53,13 +346,40 @@ def add_notification(
         "created_at": datetime.now().isoformat()
     }
     
-    notifications.append(notification)
-    return save_notifications(notifications)
+    try:
+        _STORE.add(notification)
+        return True
+    except Exception:
+        return False
+
+def add_broadcast(
+    notification_type: str,
+    title: str,
+    message: str,
+    priority: str = "Normal",
+    data: Optional[Dict] = None,
+    topic: str = ALL_USERS
+) -> bool:
+    """Store one notification that every user subscribed to `topic` sees"""
+    notification = {
+        "topic": topic,
+        "type": notification_type,
+        "title": title,
+        "message": message,
+        "priority": priority,
+        "data": data or {},
+        "created_at": datetime.now().isoformat()
+    }
+    
+    try:
+        _STORE.add_broadcast(notification)
+        return True
+    except Exception:
+        return False
 
-def get_user_notifications(user_id: str, unread_only: bool = False) -> List[Dict]:
-    """Get notifications for a specific user"""
-    notifications = load_notifications()
-    user_notifications = [n for n in notifications if n.get("user_id") == user_id]
+def get_user_notifications(user_id: str, unread_only: bool = False, topics: Optional[List[str]] = None) -> List[Dict]:
+    """Get notifications for a specific user, including broadcasts to "all" and any extra topics"""
+    user_notifications = _STORE.for_user(user_id, topics=topics)
     
     if unread_only:
         user_notifications = [n for n in user_notifications if not n.get("read", False)]
@@ -73,33 +393,27 @@ def get_user_notifications(user_id: str, unread_only: bool = False) -> List[Dict
     
     return user_notifications
 
-def mark_notification_read(notification_id: int) -> bool:
-    """Mark a notification as read"""
-    notifications = load_notifications()
-    
-    for notification in notifications:
-        if notification.get("id") == notification_id:
-            notification["read"] = True
-            notification["read_at"] = datetime.now().isoformat()
-            return save_notifications(notifications)
-    
-    return False
+def mark_notification_read(notification_id: int, user_id: Optional[str] = None) -> bool:
+    """Mark a notification as read (broadcasts need the reading user's ID)"""
+    try:
+        return _STORE.mark_read(notification_id, user_id=user_id)
+    except Exception:
+        return False
 
-def mark_all_notifications_read(user_id: str) -> bool:
+def mark_all_notifications_read(user_id: str, topics: Optional[List[str]] = None) -> bool:
     """Mark all notifications as read for a user"""
-    notifications = load_notifications()
-    
-    for notification in notifications:
-        if notification.get("user_id") == user_id and not notification.get("read", False):
-            notification["read"] = True
-            notification["read_at"] = datetime.now().isoformat()
-    
-    return save_notifications(notifications)
+    try:
+        _STORE.mark_all_read(user_id, topics=topics)
+        return True
+    except Exception:
+        return False
 
-def get_notification_count(user_id: str, unread_only: bool = True) -> int:
-    """Get notification count for a user"""
-    user_notifications = get_user_notifications(user_id, unread_only=unread_only)
-    return len(user_notifications)
+def get_notification_count(user_id: str, unread_only: bool = True, topics: Optional[List[str]] = None) -> int:
+    """Get notification count for a user (served from cached counters and read cursors)"""
+    try:
+        return _STORE.count(user_id, unread_only=unread_only, topics=topics)
+    except Exception:
+        return 0
 
 def get_notification_badge(count: int, max_show: int = 99) -> str:
     """Generate notification badge HTML"""
@@ -124,9 +438,11 @@ def create_test_notifications(user_id: str, count: int = 3) -> bool:
 
 def clear_all_notifications(user_id: str) -> bool:
     """Clear all notifications for a user"""
-    notifications = load_notifications()
-    filtered_notifications = [n for n in notifications if n.get("user_id") != user_id]
-    return save_notifications(filtered_notifications)
+    try:
+        _STORE.clear(user_id)
+        return True
+    except Exception:
+        return False
 
 def get_priority_color(priority: str) -> str:
     """Get color for notification priority"""
@@ -200,7 +516,10 @@ def create_interaction_notification(
     interaction_type: str,
     content: str = ""
 ) -> bool:
-    """Create an interaction notification (like, comment, share, etc.)"""
+    """Create an interaction notification (like, comment, share, etc.) for one user"""
+    if not to_user_id or to_user_id == ALL_USERS:
+        return False  # interactions are personal; they never go to the broadcast stream
+    
     interaction_titles = {
         "like": "New Like",
         "comment": "New Comment",
@@ -12,10 +12,12 @@ import pandas as pd
 # Try to import QR code libraries, fallback to simple implementation
 try:
     import qrcode
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import Image
+    from lib.badges import BADGE_TYPE, badge_for_delegate, badge_png
     QR_AVAILABLE = True
     print("QR code libraries available. Using real QR code generation.")
 except ImportError:
+    BADGE_TYPE = "delegate_badge"
     QR_AVAILABLE = False
     print("QR code libraries not available. Using fallback implementation.")
 
@@ -31,7 +33,7 @@ def generate_delegate_qr_data(delegate_id, delegate_name, organization):
     }
     return json.dumps(qr_data)
 
-def _normalize_qr_payload(qr_text):
+def normalize_qr_payload(qr_text):
     """Normalize and parse QR code payload"""
     if not qr_text:
         return None, None
@@ -149,7 +151,7 @@ def create_fallback_qr_code(delegate_id, delegate_name, organization, size=200):
 def create_simple_scannable_qr(delegate_id, delegate_name, organization, size=200):
     """Create a simple scannable QR-like code using basic patterns"""
     try:
-        from PIL import Image as PILImage, ImageDraw, ImageFont
+        from PIL import Image as PILImage, ImageDraw
         
         img = PILImage.new('RGB', (size, size), 'white')
         draw = ImageDraw.Draw(img)
@@ -197,7 +199,7 @@ def create_simple_scannable_qr(delegate_id, delegate_name, organization, size=20
 def create_basic_qr_code(delegate_id, delegate_name, organization, size=200):
     """Create a basic QR code using simple text encoding that can be scanned"""
     try:
-        from PIL import Image as PILImage, ImageDraw, ImageFont
+        from PIL import Image as PILImage, ImageDraw
         
         # Create a simple text-based QR code that contains the delegate ID
         # This will be a simple pattern that can be read by basic QR scanners
@@ -359,86 +361,19 @@ def create_qr_code(delegate_id, delegate_name, organization, size=200):
     return qr_img, qr_data
 
 def create_badge_qr_code(delegate_id, delegate_name, organization, title="", size=300):
-    """Create a QR code suitable for printing on badges"""
-    # Generate QR data
-    qr_data = generate_delegate_qr_data(delegate_id, delegate_name, organization)
-    
+    """
+    Create a QR code suitable for printing on badges. The payload is stable
+    per delegate, so the rendered badge comes from the badge cache
+    (lib/badges) unless the delegate's details changed.
+    """
     if not QR_AVAILABLE:
         # Fallback: Create a simple badge without QR code
+        qr_data = generate_delegate_qr_data(delegate_id, delegate_name, organization)
         return create_fallback_badge(delegate_id, delegate_name, organization, title, size), qr_data
     
-    # Create QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_M,
-        box_size=8,
-        border=4,
-    )
-    qr.add_data(qr_data)
-    qr.make(fit=True)
-    
-    # Create QR code image
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Create a larger canvas for the badge
-    badge_width = size + 100
-    badge_height = size + 150
-    
-    # Create badge image with Zambian colors
-    badge_img = Image.new('RGB', (badge_width, badge_height), '#f0f8f0')
-    draw = ImageDraw.Draw(badge_img)
-    
-    # Add Zambian green border
-    border_width = 8
-    draw.rectangle([0, 0, badge_width, badge_height], outline='#198A00', width=border_width)
-    
-    # Add conference title
-    try:
-        # Try to use a system font
-        title_font = ImageFont.truetype("arial.ttf", 16)
-        name_font = ImageFont.truetype("arial.ttf", 14)
-        org_font = ImageFont.truetype("arial.ttf", 12)
-    except:
-        # Fallback to default font
-        title_font = ImageFont.load_default()
-        name_font = ImageFont.load_default()
-        org_font = ImageFont.load_default()
-    
-    # Add conference title at top
-    title_text = "INSAKA CONFERENCE 2025"
-    title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    title_x = (badge_width - title_width) // 2
-    draw.text((title_x, 20), title_text, fill='#198A00', font=title_font)
-    
-    # Add QR code in center
-    qr_x = (badge_width - size) // 2
-    qr_y = 60
-    badge_img.paste(qr_img, (qr_x, qr_y))
-    
-    # Add delegate name below QR code
-    name_text = f"ID: {delegate_id}"
-    name_bbox = draw.textbbox((0, 0), name_text, font=name_font)
-    name_width = name_bbox[2] - name_bbox[0]
-    name_x = (badge_width - name_width) // 2
-    draw.text((name_x, qr_y + size + 20), name_text, fill='#198A00', font=name_font)
-    
-    # Add organization if provided
-    if organization:
-        org_text = str(organization)[:30] + "..." if len(str(organization)) > 30 else str(organization)
-        org_bbox = draw.textbbox((0, 0), org_text, font=org_font)
-        org_width = org_bbox[2] - org_bbox[0]
-        org_x = (badge_width - org_width) // 2
-        draw.text((org_x, qr_y + size + 50), org_text, fill='#666666', font=org_font)
-    
-    # Add title if provided
-    if title:
-        title_text = str(title)[:25] + "..." if len(str(title)) > 25 else str(title)
-        title_bbox = draw.textbbox((0, 0), title_text, font=org_font)
-        title_width = title_bbox[2] - title_bbox[0]
-        title_x = (badge_width - title_width) // 2
-        draw.text((title_x, qr_y + size + 80), title_text, fill='#666666', font=org_font)
-    
+    path, qr_data = badge_png(delegate_id, delegate_name, organization, title, size)
+    with Image.open(path) as badge_img:
+        badge_img.load()
     return badge_img, qr_data
 
 def save_qr_code(qr_img, delegate_id, filename_prefix="qr_code"):
@@ -459,6 +394,10 @@ def scan_qr_code_data(qr_data_string):
     try:
         qr_data = json.loads(qr_data_string)
         
+        # Printed badges never expire and carry no secret, so they only open the door, not an account
+        if qr_data.get("type") == BADGE_TYPE:
+            return None, "Badge QR codes are for door check-in only; use your login QR code"
+        
         # Validate required fields
         required_fields = ["type", "delegate_id", "delegate_name", "organization", "timestamp"]
         for field in required_fields:
@@ -488,8 +427,12 @@ def scan_qr_code_data(qr_data_string):
     except Exception as e:
         return None, f"Error parsing QR code: {str(e)}"
 
-def authenticate_with_qr_code(qr_data_string, staff_df):
-    """Authenticate delegate using QR code data"""
+def authenticate_with_qr_code(qr_data_string, staff_df=None):
+    """Authenticate delegate using QR code data.
+
+    Without a staff_df the delegate is resolved through the cached ID index in
+    staff_service, so a login never re-reads the delegate CSV.
+    """
     qr_data, error = scan_qr_code_data(qr_data_string)
     
     if error:
@@ -498,20 +441,22 @@ def authenticate_with_qr_code(qr_data_string, staff_df):
     # Find delegate in staff data
     delegate_id = qr_data["delegate_id"]
     
-    # Search for delegate by ID
-    delegate_row = staff_df[staff_df['ID'] == int(delegate_id)]
+    if staff_df is None:
+        from staff_service import get_delegate
+        delegate = get_delegate(delegate_id)
+    else:
+        delegate_row = staff_df[staff_df['ID'].astype(str) == str(delegate_id)]
+        delegate = None if delegate_row.empty else delegate_row.iloc[0]
     
-    if delegate_row.empty:
+    if delegate is None:
         return False, f"Delegate with ID {delegate_id} not found", None
     
-    delegate = delegate_row.iloc[0]
-    
     # Verify delegate name matches
-    if delegate.get('Full Name', '').strip() != qr_data["delegate_name"].strip():
+    if str(delegate.get('Full Name') or delegate.get('Name') or '').strip() != qr_data["delegate_name"].strip():
         return False, "Delegate name mismatch", None
     
     # Verify organization matches
-    if delegate.get('Organization', '').strip() != qr_data["organization"].strip():
+    if str(delegate.get('Organization') or '').strip() != qr_data["organization"].strip():
         return False, "Organization mismatch", None
     
     return True, "Authentication successful", delegate
@@ -536,23 +481,31 @@ def get_qr_code_for_delegate(delegate_id, staff_df):
     
     return qr_img, qr_data
 
-def generate_all_delegate_qr_codes(staff_df):
-    """Generate QR codes for all delegates"""
+def generate_all_delegate_qr_codes(staff_df, size=300):
+    """Generate badge QR codes for all delegates (unchanged delegates come from the badge cache)"""
     qr_codes = {}
     
-    for index, delegate in staff_df.iterrows():
+    for delegate in staff_df.to_dict("records"):
         delegate_id = delegate.get('ID')
-        if delegate_id:
-            qr_img, qr_data = create_qr_code(
-                delegate_id,
-                delegate.get('Full Name', ''),
-                delegate.get('Organization', ''),
-                title=delegate.get('Title', '')
-            )
+        if delegate_id and str(delegate_id).lower() != "nan":
+            if QR_AVAILABLE:
+                path, qr_data = badge_for_delegate(delegate, size=size)
+                with Image.open(path) as qr_img:
+                    qr_img.load()
+            else:
+                qr_img, qr_data = create_badge_qr_code(
+                    delegate_id,
+                    delegate.get('Full Name') or delegate.get('Name', ''),
+                    delegate.get('Organization', ''),
+                    title=delegate.get('Title') or delegate.get('RoleTitle', ''),
+                    size=size
+                )
+                path = None
             
             qr_codes[delegate_id] = {
                 'image': qr_img,
                 'data': qr_data,
+                'path': path,
                 'delegate': delegate
             }
     
@@ -0,0 +1,184 @@
+"""
+Delegate recommendation engine for the Matchmaking portal
+
+Profiles are encoded once into integer codes (organization, category,
+nationality) and an inverted index of role-title tokens weighted by IDF.
+Scoring one delegate against everyone else is a handful of NumPy array
+operations, and top-k is an argpartition, so a 5,000-delegate event
+answers in a few milliseconds. Results are cached per user and thrown away
+whenever the profile list changes.
+"""
+
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Score weights (organization and category match the original portal scorer)
+ORG_WEIGHT = 10.0
+CATEGORY_WEIGHT = 5.0
+ROLE_WEIGHT = 3.0
+NATIONALITY_WEIGHT = 2.0
+
+_TOKEN_RE = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+_STOPWORDS = {"and", "of", "the", "for", "in", "to", "at", "on", "de", "la", "le", "et"}
+_CACHE_SIZE = 512
+
+
+def _clean(value) -> str:
+    """Lower-cased text, or "" for missing values (None / NaN / "nan")"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    text = str(value).strip().lower()
+    return "" if text in ("nan", "none") else text
+
+
+def _tokens(value) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(_clean(value)) if t not in _STOPWORDS]
+
+
+def _codes(values: Iterable[str]) -> np.ndarray:
+    """Integer code per value; missing values get -1 so they never match"""
+    vocab: Dict[str, int] = {}
+    return np.array([vocab.setdefault(v, len(vocab)) if v else -1 for v in values], dtype=np.int32)
+
+
+class RecommendationEngine:
+    """Top-k similar delegates over a fixed list of profiles"""
+
+    def __init__(self, profiles: Sequence[Dict]):
+        self.profiles = list(profiles)
+        self.ids = [str(p.get("ID")) for p in self.profiles]
+        self.row_of = {pid: row for row, pid in enumerate(self.ids)}
+        n = len(self.profiles)
+        self.org = _codes(_clean(p.get("Organization")) for p in self.profiles)
+        self.category = _codes(_clean(p.get("Category")) for p in self.profiles)
+        self.nationality = _codes(_clean(p.get("Nationality")) for p in self.profiles)
+
+        # Inverted index of role tokens: token -> rows (CSR layout)
+        postings: Dict[str, List[int]] = {}
+        self.role_tokens: List[List[str]] = []
+        for row, p in enumerate(self.profiles):
+            toks = list(dict.fromkeys(_tokens(p.get("RoleTitle"))))
+            self.role_tokens.append(toks)
+            for t in toks:
+                postings.setdefault(t, []).append(row)
+        self.token_id = {t: i for i, t in enumerate(postings)}
+        lengths = np.array([len(rows) for rows in postings.values()], dtype=np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        self.indices = (np.fromiter((r for rows in postings.values() for r in rows), dtype=np.int32, count=int(lengths.sum()))
+                        if postings else np.zeros(0, dtype=np.int32))
+        # Rare role words ("geologist") say more than common ones ("manager")
+        self.idf = np.log((1 + n) / (1 + lengths)) + 1.0 if postings else np.zeros(0)
+
+    def scores(self, row: int) -> np.ndarray:
+        """Similarity of every profile to the profile at row"""
+        score = np.zeros(len(self.profiles), dtype=np.float64)
+        if self.org[row] >= 0:
+            score += (self.org == self.org[row]) * ORG_WEIGHT
+        if self.category[row] >= 0:
+            score += (self.category == self.category[row]) * CATEGORY_WEIGHT
+        if self.nationality[row] >= 0:
+            score += (self.nationality == self.nationality[row]) * NATIONALITY_WEIGHT
+        toks = [self.token_id[t] for t in self.role_tokens[row]]
+        if toks:
+            # Share of this delegate's role weight that the other role also contains
+            weights = self.idf[toks]
+            role = np.zeros(len(self.profiles), dtype=np.float64)
+            for t, w in zip(toks, weights):
+                role[self.indices[self.indptr[t]:self.indptr[t + 1]]] += w
+            score += role * (ROLE_WEIGHT / weights.sum())
+        return score
+
+    def top_k(self, user_id, k: int = 5, exclude: Iterable = ()) -> List[Tuple[Dict, float]]:
+        """Best k (profile, score) pairs for user_id, skipping themselves and exclude"""
+        row = self.row_of.get(str(user_id))
+        if row is None or k <= 0:
+            return []
+        score = self.scores(row)
+        score[row] = 0.0
+        for other in exclude:
+            other_row = self.row_of.get(str(other))
+            if other_row is not None:
+                score[other_row] = 0.0
+        candidates = np.flatnonzero(score > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-score[candidates], k - 1)[:k]]
+        # Highest score first; ties keep the profile list order
+        candidates = candidates[np.lexsort((candidates, -score[candidates]))]
+        return [(self.profiles[r], round(float(score[r]), 2)) for r in candidates]
+
+    def all_pairs_top_k(self, k: int = 5, exclude: Optional[Dict[str, Iterable]] = None) -> Dict[str, List[Tuple[Dict, float]]]:
+        """Top-k for every profile (offline batch, e.g. pre-event emails)"""
+        exclude = exclude or {}
+        return {pid: self.top_k(pid, k, exclude.get(pid, ())) for pid in self.ids}
+
+
+_PROFILE_FIELDS = ("ID", "Organization", "Category", "Nationality", "RoleTitle")
+
+
+def _fingerprint(profiles: Sequence[Dict]) -> int:
+    """Cheap change detector for the profile fields the engine uses"""
+    return hash(tuple(tuple(p.get(f) for f in _PROFILE_FIELDS) for p in profiles))
+
+
+_LOCK = threading.Lock()
+_ENGINE: Optional[RecommendationEngine] = None
+_ENGINE_KEY: Optional[int] = None
+_RESULTS: "OrderedDict[tuple, List[Tuple[Dict, float]]]" = OrderedDict()
+
+
+def get_engine(profiles: Sequence[Dict]) -> RecommendationEngine:
+    """Engine for this profile list, rebuilt (and the result cache cleared) when profiles change"""
+    global _ENGINE, _ENGINE_KEY
+    key = _fingerprint(profiles)
+    with _LOCK:
+        if _ENGINE is None or key != _ENGINE_KEY:
+            _ENGINE = RecommendationEngine(profiles)
+            _ENGINE_KEY = key
+            _RESULTS.clear()
+        return _ENGINE
+
+
+def recommend(user_id, profiles: Sequence[Dict], k: int = 5, exclude: Iterable = ()) -> List[Tuple[Dict, float]]:
+    """Top-k (profile, score) recommendations for user_id, cached per user"""
+    engine = get_engine(profiles)
+    cache_key = (str(user_id), k, frozenset(str(e) for e in exclude))
+    with _LOCK:
+        if cache_key in _RESULTS:
+            _RESULTS.move_to_end(cache_key)
+            return list(_RESULTS[cache_key])
+    result = engine.top_k(user_id, k, cache_key[2])
+    with _LOCK:
+        if engine is _ENGINE:
+            _RESULTS[cache_key] = result
+            while len(_RESULTS) > _CACHE_SIZE:
+                _RESULTS.popitem(last=False)
+    return list(result)
+
+
+if __name__ == "__main__":
+    # Offline batch: python -m lib.recommendations [k] [out.csv]
+    import sys
+    import pandas as pd
+    from staff_service import load_staff_df
+    from lib.matchmaking_store import get_connected_user_ids
+
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    out = sys.argv[2] if len(sys.argv) > 2 else "data/recommendations.csv"
+    profiles = load_staff_df().to_dict("records")
+    engine = RecommendationEngine(profiles)
+    exclude = {pid: get_connected_user_ids(pid) for pid in engine.ids}
+    rows = [
+        {"ID": pid, "Name": engine.profiles[engine.row_of[pid]].get("Name"),
+         "Email": engine.profiles[engine.row_of[pid]].get("Email"),
+         "Rank": rank, "MatchID": match.get("ID"), "MatchName": match.get("Name"),
+         "MatchOrganization": match.get("Organization"), "Score": score}
+        for pid, matches in engine.all_pairs_top_k(k, exclude).items()
+        for rank, (match, score) in enumerate(matches, start=1)
+    ]
+    pd.DataFrame(rows).to_csv(out, index=False)
+    print(f"Wrote {len(rows)} recommendations for {len(profiles)} delegates to {out}")
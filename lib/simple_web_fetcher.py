@@ -1,8 +1,10 @@
 # lib/simple_web_fetcher.py
+import codecs
+import re
 import requests
 import streamlit as st
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+from lib.http_cache import CHUNK_SIZE, StopWhen, cached_get, get_json, invalidate, memo
 
 def fetch_web_text(url, cache_duration_minutes=30):
     """
@@ -16,86 +18,11 @@ def fetch_web_text(url, cache_duration_minutes=30):
         dict: Contains 'success', 'content', 'timestamp', 'error'
     """
     
-    # Check cache first
-    cache_key = f"web_text_{hash(url)}"
-    if cache_key in st.session_state:
-        cached_data = st.session_state[cache_key]
-        cache_time = datetime.fromisoformat(cached_data['timestamp'])
-        
-        # Check if cache is still valid
-        if datetime.now() - cache_time < timedelta(minutes=cache_duration_minutes):
-            return cached_data
-    
     try:
-        # Make request with proper headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Try with SSL verification first, then without if it fails
-        ssl_fallback_used = False
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=True)
-        except requests.exceptions.SSLError:
-            # Fallback to unverified SSL for problematic certificates
-            ssl_fallback_used = True
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        # Extract images and content
-        import re
-        from urllib.parse import urljoin
-        
-        # Extract images first
-        images_html = ""
-        img_pattern = r'<img[^>]+src=["\']([^"\']+)["\'][^>]*>'
-        img_matches = re.findall(img_pattern, response.text, re.IGNORECASE)
-        
-        for img_src in img_matches:
-            # Handle relative URLs
-            if img_src.startswith('//'):
-                full_img_src = 'https:' + img_src
-            elif img_src.startswith('/'):
-                full_img_src = urljoin(url, img_src)
-            elif not img_src.startswith('http'):
-                full_img_src = urljoin(url, img_src)
-            else:
-                full_img_src = img_src
-            
-            # Add image to HTML
-            images_html += f'<img src="{full_img_src}" alt="Image" style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" /><br/>'
-        
-        # Get text content
-        content_text = response.text
-        
-        # Simple cleanup - remove HTML tags manually
-        # Remove script and style elements
-        content_text = re.sub(r'<script[^>]*>.*?</script>', '', content_text, flags=re.DOTALL | re.IGNORECASE)
-        content_text = re.sub(r'<style[^>]*>.*?</style>', '', content_text, flags=re.DOTALL | re.IGNORECASE)
-        
-        # Remove HTML tags
-        content_text = re.sub(r'<[^>]+>', ' ', content_text)
-        
-        # Clean up whitespace
-        content_text = ' '.join(content_text.split())
-        
-        # Limit content length
-        if len(content_text) > 5000:
-            content_text = content_text[:5000] + "..."
-        
-        # Prepare result
-        result = {
-            'success': True,
-            'content': content_text,
-            'images_html': images_html,
-            'timestamp': datetime.now().isoformat(),
-            'error': None,
-            'ssl_fallback_used': ssl_fallback_used
-        }
-        
-        # Cache the result
-        st.session_state[cache_key] = result
-        
+        # Shared across sessions; a stale copy is served while it revalidates
+        response = cached_get(url, ttl=cache_duration_minutes * 60, until=_SCAN_RULE)
+        result = dict(memo(response, "web_text", _extract_web_text))
+        result['timestamp'] = response.timestamp
         return result
         
     except requests.exceptions.RequestException as e:
@@ -113,6 +40,154 @@ def fetch_web_text(url, cache_duration_minutes=30):
             'error': f"Error: {str(e)}"
         }
 
+MAX_TEXT_CHARS = 5000
+MAX_IMAGES = 20
+MAX_TAG_CHARS = 8192   # longest tag kept across chunk boundaries
+
+_IMG_SRC = re.compile(r'<img[^>]+src=["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
+_SKIP_OPEN = re.compile(r'<(script|style)\b', re.IGNORECASE)
+
+class _PageScanner:
+    """
+    Incremental tag stripper and image collector. Fed the page chunk by
+    chunk, it keeps only the first MAX_TEXT_CHARS of text, the first
+    MAX_IMAGES image URLs and an unfinished tag or word, and reports done
+    once both are full so the rest of the page need not be read.
+    """
+    
+    def __init__(self, encoding=None):
+        self._decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+        self._carry = ""
+        self._skip_until = None   # "</script" or "</style" while inside one
+        self.words = []
+        self.text_len = 0
+        self.images = []
+    
+    @property
+    def text_full(self):
+        # text_len counts a separator per word, so this means the joined text is over the limit
+        return self.text_len > MAX_TEXT_CHARS + 1
+    
+    @property
+    def done(self):
+        return self.text_full and len(self.images) >= MAX_IMAGES
+    
+    def _text(self, text):
+        if self.text_full:
+            return
+        for word in text.split():
+            self.words.append(word)
+            self.text_len += len(word) + 1
+            if self.text_full:
+                break
+    
+    def _tag(self, tag):
+        if len(self.images) < MAX_IMAGES:
+            match = _IMG_SRC.match(tag)
+            if match:
+                self.images.append(match.group(1))
+        skip = _SKIP_OPEN.match(tag)
+        if skip and not tag.endswith("/>"):
+            self._skip_until = "</" + skip.group(1).lower()
+    
+    def feed(self, chunk):
+        """Consume the next chunk of the body; True once nothing more is needed"""
+        buf = self._carry + self._decoder.decode(chunk)
+        self._carry = ""
+        pos = 0
+        while True:
+            if self._skip_until:
+                end = buf.lower().find(self._skip_until, pos)
+                if end == -1:
+                    # Keep just enough to spot the closing tag in the next chunk
+                    self._carry = buf[max(pos, len(buf) - len(self._skip_until)):]
+                    break
+                close = buf.find(">", end)
+                if close == -1:
+                    self._carry = buf[end:]
+                    break
+                self._skip_until = None
+                pos = close + 1
+                continue
+            lt = buf.find("<", pos)
+            if lt == -1:
+                # Hold back a word that may continue in the next chunk
+                cut = max(buf.rfind(" ", pos), buf.rfind("\n", pos))
+                if cut == -1 and len(buf) - pos > MAX_TAG_CHARS:
+                    cut = len(buf)
+                if cut != -1:
+                    self._text(buf[pos:cut])
+                    pos = cut
+                self._carry = buf[pos:]
+                break
+            self._text(buf[pos:lt])
+            gt = buf.find(">", lt)
+            if gt == -1:
+                if len(buf) - lt <= MAX_TAG_CHARS:
+                    self._carry = buf[lt:]
+                break
+            self._tag(buf[lt:gt + 1])
+            pos = gt + 1
+        return self.done
+    
+    def close(self):
+        """Flush whatever is held back at the end of the body"""
+        if self._carry and not self._skip_until and "<" not in self._carry:
+            self._text(self._carry)
+        self._carry = ""
+
+# Lets the shared HTTP cache stop reading the page once the scanner is full
+_SCAN_RULE = StopWhen("web_text", lambda: _PageScanner("latin-1").feed)
+
+def _extract_web_text(response):
+    """Pull images and plain text out of a cached response (run once per body)"""
+    url = response.url
+    
+    from urllib.parse import urljoin
+    
+    scanner = _PageScanner(response.encoding)
+    content = response.content
+    for start in range(0, len(content), CHUNK_SIZE):
+        if scanner.feed(content[start:start + CHUNK_SIZE]):
+            break
+    scanner.close()
+    
+    # Extract images first
+    images_html = ""
+    for img_src in scanner.images:
+        # Handle relative URLs
+        if img_src.startswith('//'):
+            full_img_src = 'https:' + img_src
+        elif img_src.startswith('/'):
+            full_img_src = urljoin(url, img_src)
+        elif not img_src.startswith('http'):
+            full_img_src = urljoin(url, img_src)
+        else:
+            full_img_src = img_src
+        
+        # Add image to HTML
+        images_html += f'<img src="{full_img_src}" alt="Image" style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" /><br/>'
+    
+    # Get text content
+    content_text = ' '.join(scanner.words)
+    
+    # Limit content length
+    if len(content_text) > MAX_TEXT_CHARS:
+        content_text = content_text[:MAX_TEXT_CHARS] + "..."
+    
+    # Prepare result
+    result = {
+        'success': True,
+        'content': content_text,
+        'images_html': images_html,
+        'timestamp': response.timestamp,
+        'error': None,
+        'ssl_fallback_used': response.ssl_fallback_used,
+        'url': url
+    }
+    
+    return result
+
 def fetch_json_api(url):
     """
     Fetch JSON data from an API endpoint
@@ -130,15 +205,8 @@ def fetch_json_api(url):
             'Accept': 'application/json'
         }
         
-        # Try with SSL verification first, then without if it fails
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=True)
-        except requests.exceptions.SSLError:
-            # Fallback to unverified SSL for problematic certificates
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        data = response.json()
+        # Pooled connection, streamed and size-capped; SSL verification falls back like the page fetchers
+        data = get_json(url, headers=headers)
         
         return {
             'success': True,
@@ -187,4 +255,6 @@ def display_simple_content(content_data, show_timestamp=True):
     
     # Add refresh button
     if st.button("🔄 Refresh Content", key=f"refresh_{hash(content_data['timestamp'])}"):
+        if content_data.get('url'):
+            invalidate(content_data['url'])
         st.rerun()
@@ -1,123 +1,28 @@
 # lib/web_scraper.py
 import requests
-from bs4 import BeautifulSoup
 import streamlit as st
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
+from lib.html_extract import extract_page, extract_selector
+from lib.http_cache import DEFAULT_TIMEOUT, cached_get, get_json, invalidate, memo
 
-def fetch_web_content(url, cache_duration_minutes=30):
+def fetch_web_content(url, cache_duration_minutes=30, timeout=DEFAULT_TIMEOUT):
     """
     Fetch content from a website with caching to avoid repeated requests
     
     Args:
         url: The website URL to fetch content from
         cache_duration_minutes: How long to cache the content (default: 30 minutes)
+        timeout: Request timeout in seconds
     
     Returns:
         dict: Contains 'success', 'title', 'content', 'timestamp', 'error'
     """
     
-    # Check cache first
-    cache_key = f"web_content_{hash(url)}"
-    if cache_key in st.session_state:
-        cached_data = st.session_state[cache_key]
-        cache_time = datetime.fromisoformat(cached_data['timestamp'])
-        
-        # Check if cache is still valid
-        if datetime.now() - cache_time < timedelta(minutes=cache_duration_minutes):
-            return cached_data
-    
     try:
-        # Make request with proper headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Try with SSL verification first, then without if it fails
-        ssl_fallback_used = False
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=True)
-        except requests.exceptions.SSLError:
-            # Fallback to unverified SSL for problematic certificates
-            ssl_fallback_used = True
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        # Parse HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Extract title
-        title = soup.find('title')
-        title_text = title.get_text().strip() if title else "No Title Found"
-        
-        # Extract main content (you can customize this based on the website structure)
-        content_selectors = [
-            'main', 'article', '.content', '.post-content', 
-            '.entry-content', '.main-content', '#content'
-        ]
-        
-        main_content = None
-        for selector in content_selectors:
-            main_content = soup.select_one(selector)
-            if main_content:
-                break
-        
-        if not main_content:
-            main_content = soup.find('body')
-        
-        # Extract images and content
-        images_html = ""
-        content_text = ""
-        
-        if main_content:
-            # Extract images first
-            images = main_content.find_all('img')
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Handle relative URLs
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        from urllib.parse import urljoin
-                        src = urljoin(url, src)
-                    elif not src.startswith('http'):
-                        from urllib.parse import urljoin
-                        src = urljoin(url, src)
-                    
-                    # Add image to HTML
-                    alt_text = img.get('alt', 'Image')
-                    images_html += f'<img src="{src}" alt="{alt_text}" style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" /><br/>'
-            
-            # Remove scripts and styles but keep images
-            for script in main_content(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-            
-            # Get text content
-            content_text = main_content.get_text()
-            # Clean up whitespace
-            content_text = ' '.join(content_text.split())
-            
-            # Limit content length
-            if len(content_text) > 5000:
-                content_text = content_text[:5000] + "..."
-        else:
-            content_text = "No main content found"
-        
-        # Prepare result
-        result = {
-            'success': True,
-            'title': title_text,
-            'content': content_text,
-            'images_html': images_html,
-            'timestamp': datetime.now().isoformat(),
-            'error': None,
-            'ssl_fallback_used': ssl_fallback_used
-        }
-        
-        # Cache the result
-        st.session_state[cache_key] = result
-        
+        # Shared across sessions; a stale copy is served while it revalidates
+        response = cached_get(url, ttl=cache_duration_minutes * 60, timeout=timeout)
+        result = dict(memo(response, "web_content", extract_web_content))
+        result['timestamp'] = response.timestamp
         return result
         
     except requests.exceptions.RequestException as e:
@@ -141,7 +46,25 @@ def fetch_web_content(url, cache_duration_minutes=30):
             'error': f"Parsing error: {str(e)}"
         }
 
-def fetch_specific_content(url, selector=None, text_only=True):
+def extract_web_content(response):
+    """Extract title, main text and images from a fetched page (memoized per body by the callers)"""
+    block = extract_page(response.content, response.url)
+    
+    # Prepare result
+    result = {
+        'success': True,
+        'title': block['title'],
+        'content': block['content'],
+        'images_html': block['images_html'],
+        'timestamp': response.timestamp,
+        'error': None,
+        'ssl_fallback_used': response.ssl_fallback_used,
+        'url': response.url
+    }
+    
+    return result
+
+def fetch_specific_content(url, selector=None, text_only=True, cache_duration_minutes=30, timeout=DEFAULT_TIMEOUT):
     """
     Fetch specific content from a website using CSS selectors
     
@@ -149,94 +72,19 @@ def fetch_specific_content(url, selector=None, text_only=True):
         url: The website URL
         selector: CSS selector to target specific content (e.g., '.news-item', '#article-content')
         text_only: Whether to return only text or include HTML
+        cache_duration_minutes: How long the shared page cache serves the page (default: 30 minutes)
+        timeout: Request timeout in seconds
     
     Returns:
         dict: Contains 'success', 'content', 'images_html', 'error'
     """
     
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        # Try with SSL verification first, then without if it fails
-        ssl_fallback_used = False
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=True)
-        except requests.exceptions.SSLError:
-            # Fallback to unverified SSL for problematic certificates
-            ssl_fallback_used = True
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        if selector:
-            elements = soup.select(selector)
-            if not elements:
-                return {
-                    'success': False,
-                    'content': None,
-                    'images_html': None,
-                    'error': f"No content found for selector: {selector}"
-                }
-            
-            # Extract images from selected elements
-            images_html = ""
-            for element in elements:
-                images = element.find_all('img')
-                for img in images:
-                    src = img.get('src')
-                    if src:
-                        # Handle relative URLs
-                        if src.startswith('//'):
-                            src = 'https:' + src
-                        elif src.startswith('/'):
-                            from urllib.parse import urljoin
-                            src = urljoin(url, src)
-                        elif not src.startswith('http'):
-                            from urllib.parse import urljoin
-                            src = urljoin(url, src)
-                        
-                        # Add image to HTML
-                        alt_text = img.get('alt', 'Image')
-                        images_html += f'<img src="{src}" alt="{alt_text}" style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" /><br/>'
-            
-            if text_only:
-                content = ' '.join([elem.get_text().strip() for elem in elements])
-            else:
-                content = str(elements[0]) if elements else None
-        else:
-            # Get all content including images
-            images = soup.find_all('img')
-            images_html = ""
-            for img in images:
-                src = img.get('src')
-                if src:
-                    # Handle relative URLs
-                    if src.startswith('//'):
-                        src = 'https:' + src
-                    elif src.startswith('/'):
-                        from urllib.parse import urljoin
-                        src = urljoin(url, src)
-                    elif not src.startswith('http'):
-                        from urllib.parse import urljoin
-                        src = urljoin(url, src)
-                    
-                    # Add image to HTML
-                    alt_text = img.get('alt', 'Image')
-                    images_html += f'<img src="{src}" alt="{alt_text}" style="max-width: 100%; height: auto; margin: 10px 0; border-radius: 8px;" /><br/>'
-            
-            content = soup.get_text()
-            content = ' '.join(content.split())  # Clean whitespace
-        
-        return {
-            'success': True,
-            'content': content,
-            'images_html': images_html,
-            'ssl_fallback_used': ssl_fallback_used,
-            'error': None
-        }
+        response = cached_get(url, ttl=cache_duration_minutes * 60, timeout=timeout)
+        return dict(memo(
+            response, ("specific_content", selector, text_only),
+            lambda r: extract_specific_content(r, selector, text_only)
+        ))
         
     except Exception as e:
         return {
@@ -246,6 +94,25 @@ def fetch_specific_content(url, selector=None, text_only=True):
             'error': f"Error fetching content: {str(e)}"
         }
 
+def extract_specific_content(response, selector=None, text_only=True):
+    """Apply a CSS selector to a fetched page (memoized per body by the callers)"""
+    block = extract_selector(response.content, response.url, selector, text_only)
+    if block is None:
+        return {
+            'success': False,
+            'content': None,
+            'images_html': None,
+            'error': f"No content found for selector: {selector}"
+        }
+    
+    return {
+        'success': True,
+        'content': block['content'],
+        'images_html': block['images_html'],
+        'ssl_fallback_used': response.ssl_fallback_used,
+        'error': None
+    }
+
 def fetch_json_api(url):
     """
     Fetch JSON data from an API endpoint
@@ -263,15 +130,8 @@ def fetch_json_api(url):
             'Accept': 'application/json'
         }
         
-        # Try with SSL verification first, then without if it fails
-        try:
-            response = requests.get(url, headers=headers, timeout=10, verify=True)
-        except requests.exceptions.SSLError:
-            # Fallback to unverified SSL for problematic certificates
-            response = requests.get(url, headers=headers, timeout=10, verify=False)
-        response.raise_for_status()
-        
-        data = response.json()
+        # Pooled connection, streamed and size-capped; SSL verification falls back like the page fetchers
+        data = get_json(url, headers=headers)
         
         return {
             'success': True,
@@ -324,27 +184,29 @@ def display_web_content(content_data, show_timestamp=True):
     
     # Add refresh button
     if st.button("🔄 Refresh Content", key=f"refresh_{hash(content_data['timestamp'])}"):
+        if content_data.get('url'):
+            invalidate(content_data['url'])
         st.rerun()
 
 # Example usage functions for different types of content
-def fetch_news_content(news_url):
+def fetch_news_content(news_url, timeout=DEFAULT_TIMEOUT):
     """Example: Fetch news content from a news website"""
-    return fetch_specific_content(news_url, '.news-content, .article-body, .post-content')
+    return fetch_specific_content(news_url, '.news-content, .article-body, .post-content', timeout=timeout)
 
-def fetch_announcements(announcement_url):
+def fetch_announcements(announcement_url, timeout=DEFAULT_TIMEOUT):
     """Example: Fetch announcements from a conference website"""
-    return fetch_specific_content(announcement_url, '.announcement, .notice, .alert')
+    return fetch_specific_content(announcement_url, '.announcement, .notice, .alert', timeout=timeout)
 
-def fetch_schedule_data(schedule_url):
+def fetch_schedule_data(schedule_url, timeout=DEFAULT_TIMEOUT):
     """Example: Fetch schedule/agenda data"""
-    return fetch_specific_content(schedule_url, '.schedule, .agenda, .timetable')
+    return fetch_specific_content(schedule_url, '.schedule, .agenda, .timetable', timeout=timeout)
 
-def fetch_exhibitor_logos(url):
+def fetch_exhibitor_logos(url, timeout=DEFAULT_TIMEOUT):
     """
     Fetch exhibitor logos and photos specifically
     Returns organized display of logos in a grid format
     """
-    result = fetch_specific_content(url, '.exhibitor-logo, .sponsor-logo, .company-logo, .logo, img', text_only=False)
+    result = fetch_specific_content(url, '.exhibitor-logo, .sponsor-logo, .company-logo, .logo, img', text_only=False, timeout=timeout)
     
     if result['success'] and result.get('images_html'):
         # Enhance the HTML for better logo display
@@ -1,10 +1,12 @@
 # pages/0_Admin.py
-import os, json, io, pathlib
+import os, json, pathlib
 import streamlit as st
 from lib.ui import apply_brand, top_nav 
 from staff_service import (
     load_staff_df, save_staff_df, register_staff,
-    import_staff_excel, export_staff_excel, set_checked_in
+    import_staff_excel, export_staff_excel_file, set_checked_in,
+    scan_excel_for_duplicates, export_filtered_excel, export_delegate_package,
+    delegate_stats
 )
 from utils_assets import save_upload
 
@@ -70,6 +72,8 @@ with tab_new:
             notes = st.text_area("Notes", "")
             photo = st.file_uploader("Badge Photo (JPG/PNG/WebP)", type=["jpg","jpeg","png","webp"])
 
+        allow_similar = st.checkbox("Save even if a similar delegate already exists",
+                                    help="New delegates that closely match an existing name/organization, email or phone are held back unless this is ticked.")
         submitted = st.form_submit_button("Save")
     if submitted:
         photo_path = ""
@@ -86,6 +90,7 @@ with tab_new:
             badge_photo_path=photo_path,
             notes=notes,
             nationality=nationality,
+            allow_similar=allow_similar,
         )
         st.success(msg) if ok else st.warning(msg)
 
@@ -341,10 +346,15 @@ with tab_manage:
             st.warning("No delegates match your search criteria. Try adjusting your filters.")
 
 # --- Statistics Dashboard ---
+def breakdown_markdown(counts, total) -> str:
+    """One markdown list for a breakdown (a single element instead of one st.write per row)"""
+    return "\n".join(f"- **{label}**: {count} ({count / total * 100:.1f}%)" for label, count in counts.items())
+
 with tab_stats:
-    df = load_staff_df()
+    # One cached snapshot: recomputed only when delegates or check-ins change
+    stats = delegate_stats(top_k=10)
     
-    if len(df) == 0:
+    if stats.total == 0:
         st.info("No delegate records found. Add some records to see statistics.")
     else:
         # Overall statistics
@@ -356,16 +366,15 @@ with tab_stats:
         with col1:
             st.metric(
                 label="Total Delegates",
-                value=len(df),
+                value=stats.total,
                 help="Total number of delegates in the system"
             )
         
         with col2:
-            checked_in_count = len(df[df.get('CheckedIn', False) == True])
             st.metric(
                 label="Checked In",
-                value=checked_in_count,
-                delta=f"{checked_in_count/len(df)*100:.1f}%" if len(df) > 0 else "0%",
+                value=stats.checked_in,
+                delta=f"{stats.checked_in_rate * 100:.1f}%",
                 help="Number and percentage of delegates who have checked in"
             )
         
@@ -374,93 +383,73 @@ with tab_stats:
         # Category breakdown
         st.subheader("👥 Delegates by Category")
         
-        if 'Category' in df.columns:
-            category_counts = df['Category'].value_counts()
-            
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                st.bar_chart(category_counts)
-            
-            with col2:
-                st.write("**Category Breakdown:**")
-                for category, count in category_counts.items():
-                    percentage = (count / len(df)) * 100
-                    st.write(f"• **{category}**: {count} ({percentage:.1f}%)")
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.bar_chart(stats.by_category)
+        
+        with col2:
+            st.write("**Category Breakdown:**")
+            st.markdown(breakdown_markdown(stats.by_category, stats.total))
         
         st.markdown("---")
         
         # Organization breakdown
         st.subheader("🏢 Delegates by Organization")
         
-        if 'Organization' in df.columns:
-            org_counts = df['Organization'].value_counts().head(10)  # Top 10 organizations
+        if len(stats.by_organization) > 0:
+            col1, col2 = st.columns([2, 1])
             
-            if len(org_counts) > 0:
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    st.bar_chart(org_counts)
-                
-                with col2:
-                    st.write("**Top Organizations:**")
-                    for org, count in org_counts.items():
-                        percentage = (count / len(df)) * 100
-                        st.write(f"• **{org}**: {count} ({percentage:.1f}%)")
-            else:
-                st.info("No organization data available.")
+            with col1:
+                st.bar_chart(stats.by_organization)
+            
+            with col2:
+                st.write("**Top Organizations:**")
+                st.markdown(breakdown_markdown(stats.by_organization, stats.total))
+        else:
+            st.info("No organization data available.")
         
         st.markdown("---")
         
         # Nationality breakdown
         st.subheader("🌍 Delegates by Nationality")
         
-        if 'Nationality' in df.columns:
-            nationality_counts = df['Nationality'].value_counts()
+        if len(stats.by_nationality) > 0:
+            col1, col2 = st.columns([2, 1])
             
-            # Filter out empty nationalities
-            nationality_counts = nationality_counts[nationality_counts.index != '']
+            with col1:
+                st.bar_chart(stats.by_nationality)
             
-            if len(nationality_counts) > 0:
-                col1, col2 = st.columns([2, 1])
-                
-                with col1:
-                    st.bar_chart(nationality_counts)
-                
-                with col2:
-                    st.write("**Nationality Breakdown:**")
-                    for nationality, count in nationality_counts.items():
-                        percentage = (count / len(df)) * 100
-                        st.write(f"• **{nationality}**: {count} ({percentage:.1f}%)")
-            else:
-                st.info("No nationality data available.")
+            with col2:
+                st.write("**Nationality Breakdown:**")
+                st.markdown(breakdown_markdown(stats.by_nationality, stats.total))
+        else:
+            st.info("No nationality data available.")
         
         st.markdown("---")
         
-        # Daily check-in status
+        # Daily check-in status (includes scans not yet compacted into the table)
         st.subheader("✅ Daily Check-in Status")
         
-        checkin_columns = [col for col in df.columns if col.startswith('Day') and col.endswith('_CheckIn')]
+        checkin_stats = {f"Day {day}": count for day, count in stats.day_checkins.items()}
         
-        if checkin_columns:
-            checkin_stats = {}
-            for col in checkin_columns:
-                day_num = col.replace('Day', '').replace('_CheckIn', '')
-                checked_count = len(df[df[col] == True])
-                checkin_stats[f"Day {day_num}"] = checked_count
-            
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                st.bar_chart(checkin_stats)
-            
-            with col2:
-                st.write("**Daily Check-in:**")
-                for day, count in checkin_stats.items():
-                    percentage = (count / len(df)) * 100
-                    st.write(f"• **{day}**: {count} ({percentage:.1f}%)")
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.bar_chart(checkin_stats)
+        
+        with col2:
+            st.write("**Daily Check-in:**")
+            st.markdown(breakdown_markdown(checkin_stats, stats.total))
+        
+        # Arrivals over the day
+        st.subheader("🚪 Arrivals per 10 Minutes")
+        
+        if len(stats.arrivals) > 0:
+            st.line_chart(stats.arrivals)
+            st.caption("First check-in of each delegate per day, from the check-in scan log")
         else:
-            st.info("No daily check-in data available.")
+            st.info("No check-in scans recorded yet.")
         
         st.markdown("---")
         
@@ -471,28 +460,30 @@ with tab_stats:
         
         with summary_col1:
             st.info(f"""
-            **Total Delegates:** {len(df)}
+            **Total Delegates:** {stats.total}
             
-            **Checked In:** {checked_in_count} ({checked_in_count/len(df)*100:.1f}%)
+            **Checked In:** {stats.checked_in} ({stats.checked_in_rate * 100:.1f}%)
             
-            **Categories:** {len(df['Category'].unique()) if 'Category' in df.columns else 0}
+            **Categories:** {len(stats.by_category)}
             
-            **Organizations:** {len(df['Organization'].unique()) if 'Organization' in df.columns else 0}
+            **Organizations:** {stats.organizations}
             """)
         
         with summary_col2:
-            if 'Category' in df.columns:
-                top_category = df['Category'].value_counts().index[0] if len(df) > 0 else "N/A"
-                top_category_count = df['Category'].value_counts().iloc[0] if len(df) > 0 else 0
+            if len(stats.by_category) > 0:
+                from datetime import datetime
+                
+                top_category = stats.by_category.index[0]
+                top_category_count = stats.by_category.iloc[0]
                 
                 st.info(f"""
                 **Top Category:** {top_category}
                 
                 **Count:** {top_category_count}
                 
-                **Percentage:** {top_category_count/len(df)*100:.1f}%
+                **Percentage:** {top_category_count / stats.total * 100:.1f}%
                 
-                **Last Updated:** {df.index.max() if len(df) > 0 else "N/A"}
+                **Last Updated:** {datetime.fromtimestamp(stats.built_at).strftime("%Y-%m-%d %H:%M:%S")}
                 """)
 
 # --- Import ---
@@ -500,8 +491,33 @@ with tab_import:
     st.caption("Excel expected columns: Name, Category, Organization, RoleTitle, Email, Phone, Notes")
     up = st.file_uploader("Upload Excel (.xlsx)", type=["xlsx"])
     if up:
-        added, skipped, sheet_info = import_staff_excel(up.read())
-        st.success(f"Added {added} • Skipped duplicates {skipped}")
+        file_bytes = up.getvalue()
+        
+        # Preview first; the workbook is parsed once and the import reuses it
+        existing_df = load_staff_df()
+        existing_names = set(existing_df["Name"].astype(str).str.strip().str.lower())
+        existing_emails = set(existing_df["Email"].astype(str).str.strip().str.lower()) - {""}
+        scan, sheet_info = scan_excel_for_duplicates(file_bytes, existing_names, existing_emails)
+        
+        prev_col1, prev_col2, prev_col3, prev_col4 = st.columns(4)
+        prev_col1.metric("Rows Found", scan["total_found"])
+        prev_col2.metric("New Delegates", len(scan["new_delegates"]))
+        prev_col3.metric("Duplicate Names", sum(scan["duplicate_names"].values()))
+        prev_col4.metric("Duplicate Emails", sum(scan["duplicate_emails"].values()))
+        
+        if scan["new_delegates"]:
+            with st.expander("👀 Preview new delegates"):
+                st.dataframe(scan["new_delegates"][:200], use_container_width=True)
+        
+        if scan["possible_duplicates"]:
+            held_back = sum(not row["Will Import"] for row in scan["possible_duplicates"])
+            with st.expander(f"🔎 Possible duplicates ({len(scan['possible_duplicates'])}, {held_back} will be skipped)"):
+                st.caption("Rows that closely resemble an existing delegate. Likely matches (shared email/phone, or near-identical name at the same organization) are skipped on import.")
+                st.dataframe(scan["possible_duplicates"][:200], use_container_width=True)
+        
+        if st.button("📥 Import Delegates", type="primary", disabled=scan["total_found"] == 0):
+            added, skipped, similar, sheet_info = import_staff_excel(file_bytes)
+            st.success(f"Added {added} • Skipped duplicates {skipped} • Skipped likely duplicates {similar}")
         
         # Show sheet processing details if available
         if sheet_info and (sheet_info.get("processed") or sheet_info.get("skipped")):
@@ -575,64 +591,12 @@ with tab_export:
         with export_col1:
             st.markdown("#### 📋 Excel Export")
             
-            # Create filtered Excel export
+            # Create filtered Excel export (cached until the selection or its data changes)
             if st.button("📥 Generate Filtered Excel Export", type="primary", use_container_width=True):
                 try:
-                    import pandas as pd
-                    import io
                     from datetime import datetime
                     
-                    # Create Excel file with multiple sheets
-                    excel_buffer = io.BytesIO()
-                    
-                    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                        # Main data sheet
-                        filtered_df.to_excel(writer, sheet_name='Delegates', index=False)
-                        
-                        # Summary statistics sheet
-                        summary_data = []
-                        
-                        # By Organization
-                        org_summary = filtered_df.groupby('Organization').agg({
-                            'Name': 'count',
-                            'Category': lambda x: ', '.join(x.unique()),
-                            'Email': lambda x: x.notna().sum(),
-                            'Phone': lambda x: x.notna().sum()
-                        }).rename(columns={
-                            'Name': 'Count',
-                            'Category': 'Categories',
-                            'Email': 'With Email',
-                            'Phone': 'With Phone'
-                        })
-                        org_summary.to_excel(writer, sheet_name='By Organization')
-                        
-                        # By Category
-                        cat_summary = filtered_df.groupby('Category').agg({
-                            'Name': 'count',
-                            'Organization': lambda x: ', '.join(x.unique()),
-                            'Email': lambda x: x.notna().sum(),
-                            'Phone': lambda x: x.notna().sum()
-                        }).rename(columns={
-                            'Name': 'Count',
-                            'Organization': 'Organizations',
-                            'Email': 'With Email',
-                            'Phone': 'With Phone'
-                        })
-                        cat_summary.to_excel(writer, sheet_name='By Category')
-                        
-                        # Overall summary
-                        summary_df = pd.DataFrame({
-                            'Metric': ['Total Delegates', 'Organizations', 'Categories', 'With Email', 'With Phone', 'Checked In'],
-                            'Count': [
-                                len(filtered_df),
-                                filtered_df['Organization'].nunique(),
-                                filtered_df['Category'].nunique(),
-                                filtered_df['Email'].notna().sum(),
-                                filtered_df['Phone'].notna().sum(),
-                                filtered_df['CheckedIn'].sum() if 'CheckedIn' in filtered_df.columns else 0
-                            ]
-                        })
-                        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+                    excel_path = export_filtered_excel(filtered_df)
                     
                     # Generate filename
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -640,15 +604,15 @@ with tab_export:
                     filename = f"delegates_export_{org_names}_{timestamp}.xlsx"
                     
                     # Prepare download
-                    excel_buffer.seek(0)
-                    st.download_button(
-                        "📥 Download Filtered Excel Report",
-                        data=excel_buffer.getvalue(),
-                        file_name=filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                        use_container_width=True,
-                        key="filtered_excel_export"
-                    )
+                    with open(excel_path, "rb") as excel_file:
+                        st.download_button(
+                            "📥 Download Filtered Excel Report",
+                            data=excel_file,
+                            file_name=filename,
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True,
+                            key="filtered_excel_export"
+                        )
                     
                     st.success(f"✅ Excel export generated with {len(filtered_df)} delegates!")
                     
@@ -657,176 +621,53 @@ with tab_export:
             
             st.caption("Includes filtered delegate data with statistics by organization and category")
             
-            # Standard export (all delegates)
+            # Standard export (all delegates); only read into the page when asked for,
+            # since the download button holds the whole file
             st.markdown("#### 📋 Export All Delegates")
-            data, fname = export_staff_excel()
-            st.download_button(
-                "📥 Download Complete Excel Report",
-                data=data,
-                file_name=fname,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                key="complete_excel_export"
-            )
+            if st.button("📥 Generate Complete Excel Report", use_container_width=True):
+                try:
+                    excel_path, fname = export_staff_excel_file()
+                    with open(excel_path, "rb") as excel_file:
+                        st.download_button(
+                            "📥 Download Complete Excel Report",
+                            data=excel_file,
+                            file_name=fname,
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True,
+                            key="complete_excel_export"
+                        )
+                except Exception as e:
+                    st.error(f"❌ Error generating Excel export: {str(e)}")
             st.caption("Includes ALL delegate data (ignores filters above)")
         
         with export_col2:
             st.markdown("#### 📸 Export with Pictures")
             if st.button("📦 Generate Filtered Delegate Package with Photos", type="primary", use_container_width=True):
                 try:
-                    import zipfile
-                    import base64
                     from datetime import datetime
                     
                     # Use filtered data
                     export_df = filtered_df if len(filtered_df) > 0 else df
                     
-                    # Load speakers data
-                    speakers_data = []
-                    try:
-                        speakers_file = pathlib.Path("data/speakers.json")
-                        if speakers_file.exists():
-                            with open(speakers_file, "r", encoding="utf-8") as f:
-                                speakers_data = json.load(f)
-                    except Exception:
-                        speakers_data = []
-                    
-                    # Create a zip file in memory
-                    zip_buffer = io.BytesIO()
+                    # Built on disk, photos streamed from their files; reused until the data changes
+                    package_path, summary = export_delegate_package(export_df)
                     
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                        # Add Excel file to zip (now includes speakers and categories)
-                        excel_data, excel_name = export_staff_excel()
-                        zip_file.writestr(excel_name, excel_data)
-                        
-                        # Create a detailed CSV with filtered delegate information
-                        detailed_csv = export_df.to_csv(index=False)
-                        zip_file.writestr("delegates_detailed.csv", detailed_csv)
-                        
-                        # Create separate CSV files by category
-                        categories = export_df['Category'].dropna().unique()
-                        for category in sorted(categories):
-                            category_df = export_df[export_df['Category'] == category].copy()
-                            category_csv = category_df.to_csv(index=False)
-                            safe_category_name = "".join(c for c in str(category) if c.isalnum() or c in (' ', '-', '_')).strip()
-                            zip_file.writestr(f"delegates_by_category/{safe_category_name}.csv", category_csv)
-                        
-                        # Create speakers CSV if available
-                        if speakers_data:
-                            speakers_df = pd.DataFrame(speakers_data)
-                            speakers_csv = speakers_df.to_csv(index=False)
-                            zip_file.writestr("speakers_detailed.csv", speakers_csv)
-                        
-                        # Create photos folder and add delegate photos
-                        delegate_photos_added = 0
-                        delegate_photos_missing = 0
-                        speaker_photos_added = 0
-                        speaker_photos_missing = 0
-                        
-                        # Process delegate photos
-                        for idx, row in export_df.iterrows():
-                            delegate_name = str(row.get('Name', 'Unknown')).strip()
-                            photo_path = row.get('BadgePhoto', '')
-                            
-                            # Handle NaN values and convert to string safely
-                            if pd.isna(photo_path) or photo_path == '' or str(photo_path).lower() in ['nan', 'none', 'null']:
-                                delegate_photos_missing += 1
-                            else:
-                                try:
-                                    # Try to read the photo file
-                                    photo_path_str = str(photo_path)
-                                    photo_full_path = pathlib.Path(photo_path_str)
-                                    if photo_full_path.exists():
-                                        # Read photo and add to zip
-                                        photo_data = photo_full_path.read_bytes()
-                                        
-                                        # Create a safe filename for the photo
-                                        safe_delegate_name = "".join(c for c in delegate_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                                        zip_photo_name = f"delegate_photos/{safe_delegate_name}_{row.get('ID', 'unknown')}.jpg"
-                                        
-                                        zip_file.writestr(zip_photo_name, photo_data)
-                                        delegate_photos_added += 1
-                                    else:
-                                        delegate_photos_missing += 1
-                                except Exception as e:
-                                    delegate_photos_missing += 1
-                        
-                        # Process speaker photos
-                        for speaker in speakers_data:
-                            speaker_name = speaker.get('name', 'Unknown')
-                            speaker_photo = speaker.get('photo', '')
-                            
-                            if speaker_photo and speaker_photo.strip() and speaker_photo not in ['nan', 'None', 'null']:
-                                try:
-                                    # Try to read the photo file
-                                    photo_path_str = str(speaker_photo)
-                                    photo_full_path = pathlib.Path(photo_path_str)
-                                    if photo_full_path.exists():
-                                        # Read photo and add to zip
-                                        photo_data = photo_full_path.read_bytes()
-                                        
-                                        # Create a safe filename for the photo
-                                        safe_speaker_name = "".join(c for c in speaker_name if c.isalnum() or c in (' ', '-', '_')).strip()
-                                        zip_photo_name = f"speaker_photos/{safe_speaker_name}_{speaker.get('id', 'unknown')}.jpg"
-                                        
-                                        zip_file.writestr(zip_photo_name, photo_data)
-                                        speaker_photos_added += 1
-                                    else:
-                                        speaker_photos_missing += 1
-                                except Exception as e:
-                                    speaker_photos_missing += 1
-                            else:
-                                speaker_photos_missing += 1
-                        
-                        # Create a summary report
-                        total_photos_added = delegate_photos_added + speaker_photos_added
-                        total_photos_missing = delegate_photos_missing + speaker_photos_missing
-                        
-                        summary_report = f"""Conference Export Summary
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-PARTICIPANTS:
-- Total Delegates: {len(export_df)}
-- Total Speakers: {len(speakers_data)}
-- Total Participants: {len(export_df) + len(speakers_data)}
-
-PHOTOS:
-- Delegate Photos Included: {delegate_photos_added}
-- Delegate Photos Missing: {delegate_photos_missing}
-- Speaker Photos Included: {speaker_photos_added}
-- Speaker Photos Missing: {speaker_photos_missing}
-- Total Photos: {total_photos_added}
-- Total Missing: {total_photos_missing}
-
-ORGANIZATIONS:
-- Total Organizations: {export_df['Organization'].nunique() if len(export_df) > 0 else 0}
-- Organizations with Delegates: {', '.join(export_df['Organization'].unique()[:10]) if len(export_df) > 0 else 'None'}
-"""
-                        
-                        # Add detailed category breakdown
-                        if len(export_df) > 0:
-                            category_counts = export_df['Category'].value_counts()
-                            summary_report += "\nCATEGORIES:\n"
-                            for category, count in category_counts.items():
-                                summary_report += f"- {category}: {count} delegates\n"
-                        
-                        zip_file.writestr("README.txt", summary_report)
-                
                     # Generate filename with timestamp
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                     org_names = "_".join([org.replace(" ", "_")[:10] for org in selected_organizations[:3]]) if selected_organizations else "All_Orgs"
                     zip_filename = f"delegates_export_{org_names}_{timestamp}.zip"
                     
-                    st.download_button(
-                        label="📥 Download Complete Package",
-                        data=zip_buffer.getvalue(),
-                        file_name=zip_filename,
-                        mime="application/zip",
-                        use_container_width=True
-                    )
+                    with open(package_path, "rb") as package_file:
+                        st.download_button(
+                            label="📥 Download Complete Package",
+                            data=package_file,
+                            file_name=zip_filename,
+                            mime="application/zip",
+                            use_container_width=True
+                        )
                 
                     st.success(f"✅ Complete conference package created successfully!")
-                    st.info(f"📊 **Summary:** {len(export_df)} delegates, {len(speakers_data)} speakers, {total_photos_added} photos included, {total_photos_missing} photos missing")
+                    st.info(f"📊 **Summary:** {summary['delegates']} delegates, {summary['speakers']} speakers, {summary['photos']} photos included, {summary['photos_missing']} photos missing")
                     
                 except Exception as e:
                     st.error(f"❌ Error creating export package: {str(e)}")
@@ -60,12 +60,10 @@ if hasattr(st.session_state, 'delegate_id_displayed') and st.session_state.deleg
                 if delegate_id.strip():
                     # Verify delegate exists and authenticate
                     try:
-                        from staff_service import load_staff_df
-                        df = load_staff_df()
-                        mask = df["ID"].astype(str) == str(delegate_id.strip())
+                        from staff_service import get_delegate
+                        delegate_record = get_delegate(delegate_id.strip())
                         
-                        if mask.any():
-                            delegate_record = df[mask].iloc[0]
+                        if delegate_record is not None:
                             
                             # Check for dual role (delegate + speaker)
                             from lib.qr_system import check_dual_role_user
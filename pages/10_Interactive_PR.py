@@ -243,11 +243,12 @@ def add_interaction(post_id, user_id, user_name, interaction_type, content=None,
     try:
         from lib.notifications import create_interaction_notification
         
-        # Get post owner (simplified - would need to track post owners)
-        # For now, create notification for all users
-        post_owner_id = "all"  # This would be the actual post owner
+        # Posts do not record an owner yet, so there is nobody to notify.
+        # Never fall back to "all": that is the broadcast stream and would
+        # notify every delegate of every like and share.
+        post_owner_id = None  # This would be the actual post owner
         
-        if post_owner_id != user_id:  # Don't notify self
+        if post_owner_id and post_owner_id != user_id:  # Don't notify self
             create_interaction_notification(
                 from_user_id=user_id,
                 to_user_id=post_owner_id,
@@ -2,8 +2,14 @@
 import streamlit as st
 import json
 import random
-from datetime import datetime
+from datetime import datetime, time
 from lib.ui import apply_brand
+from lib.matchmaking_store import (
+    add_interaction, get_connected_user_ids, get_connection_statuses,
+    get_user_interactions, update_interaction, update_interactions,
+)
+from lib.recommendations import recommend
+from lib.agenda import get_agenda_index, meeting_interval, parse_day_key
 
 st.set_page_config(page_title="Matchmaking Portal — Insaka", page_icon="💼", layout="wide")
 
@@ -251,10 +257,8 @@ except ImportError:
 def get_matchmaking_notifications():
     """Calculate total matchmaking notifications"""
     try:
-        with open("data/matchmaking.json", "r", encoding="utf-8") as f:
-            interactions = json.load(f)
-        
         current_user_id = st.session_state.get('delegate_id', 'anonymous')
+        interactions = get_user_interactions(current_user_id)
         
         # Count pending connection requests and new messages
         pending_requests = len([i for i in interactions if 
@@ -336,7 +340,10 @@ def load_delegates():
     try:
         from staff_service import load_staff_df
         df = load_staff_df()
-        delegates = df[["ID", "Name", "Organization", "Category", "RoleTitle", "Email", "Phone"]].to_dict('records')
+        columns = ["ID", "Name", "Organization", "Category", "RoleTitle", "Email", "Phone"]
+        if "Nationality" in df.columns:
+            columns.append("Nationality")
+        delegates = df[columns].to_dict('records')
         attendees.extend(delegates)
     except Exception:
         pass
@@ -367,19 +374,6 @@ def load_delegates():
     
     return attendees
 
-def load_matchmaking_data():
-    """Load matchmaking interactions"""
-    try:
-        with open("data/matchmaking.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
-
-def save_matchmaking_data(data):
-    """Save matchmaking interactions"""
-    with open("data/matchmaking.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
 def get_relative_time(iso_timestamp):
     """Convert ISO timestamp to relative time"""
     try:
@@ -399,22 +393,15 @@ def get_relative_time(iso_timestamp):
     except:
         return "recently"
 
-def get_user_interactions(user_id):
-    """Get all interactions for a user"""
-    interactions = load_matchmaking_data()
-    return [i for i in interactions if i.get('from_user_id') == user_id or i.get('to_user_id') == user_id]
-
-def get_connection_status(user1_id, user2_id):
-    """Get connection status between two users"""
-    interactions = load_matchmaking_data()
-    
-    # Check for any existing interactions
-    for interaction in interactions:
-        if ((interaction.get('from_user_id') == user1_id and interaction.get('to_user_id') == user2_id) or
-            (interaction.get('from_user_id') == user2_id and interaction.get('to_user_id') == user1_id)):
-            return interaction.get('status', 'pending')
-    
-    return 'none'
+def show_meeting_slot(request):
+    """Show a meeting's time slot and any agenda sessions it overlaps"""
+    slot = meeting_interval(request)
+    if slot is None:
+        return
+    st.write(f"🕒 {request.get('meeting_day')} at {request.get('meeting_time')} ({slot[2] - slot[1]} min)")
+    overlaps = get_agenda_index().overlapping(*slot)
+    if overlaps:
+        st.caption("⚠️ Overlaps: " + "; ".join(f"{s.get('title', 'Untitled')} ({s.get('time', 'TBA')})" for s in overlaps))
 
 # Get current user info
 current_user_id = st.session_state.get('delegate_id', 'anonymous')
@@ -481,6 +468,9 @@ with tab1:
     
     # Display delegates in a grid
     if filtered_delegates:
+        # One lookup for every card's connection status
+        connection_statuses = get_connection_statuses(current_user_id, [d.get('ID') for d in filtered_delegates])
+        
         # Display in rows of 3
         for i in range(0, len(filtered_delegates), 3):
             cols = st.columns(3)
@@ -510,7 +500,7 @@ with tab1:
                                     """, unsafe_allow_html=True)
                             
                             # Connection status indicator
-                            connection_status = get_connection_status(current_user_id, delegate.get('ID'))
+                            connection_status = connection_statuses.get(str(delegate.get('ID')), 'none')
                             
                             # Delegate/Speaker info with connection indicator
                             if connection_status == 'accepted':
@@ -538,9 +528,7 @@ with tab1:
                             if connection_status == 'none':
                                 if st.button(f"🤝 Connect", key=f"connect_{delegate.get('ID')}", width='stretch'):
                                     # Send connection request
-                                    interactions = load_matchmaking_data()
                                     new_interaction = {
-                                        "id": len(interactions) + 1,
                                         "from_user_id": current_user_id,
                                         "to_user_id": delegate.get('ID'),
                                         "from_user_name": current_user_name,
@@ -550,8 +538,7 @@ with tab1:
                                         "message": f"{current_user_name} wants to connect with you",
                                         "created_at": datetime.now().isoformat()
                                     }
-                                    interactions.append(new_interaction)
-                                    save_matchmaking_data(interactions)
+                                    add_interaction(new_interaction)
                                     
                                     # Create notification for the recipient
                                     if NOTIFICATION_SYSTEM_AVAILABLE:
@@ -617,12 +604,7 @@ with tab2:
                 with col_accept:
                     if st.button("✅ Accept Connection", key=f"accept_conn_{request.get('id')}", width='stretch'):
                         # Update connection status
-                        interactions = load_matchmaking_data()
-                        for i in interactions:
-                            if i.get('id') == request.get('id'):
-                                i['status'] = 'accepted'
-                                break
-                        save_matchmaking_data(interactions)
+                        update_interaction(request.get('id'), status='accepted')
                         
                         # Create notification for the sender
                         if NOTIFICATION_SYSTEM_AVAILABLE:
@@ -638,12 +620,7 @@ with tab2:
                 with col_decline:
                     if st.button("❌ Decline", key=f"decline_conn_{request.get('id')}", width='stretch'):
                         # Update connection status
-                        interactions = load_matchmaking_data()
-                        for i in interactions:
-                            if i.get('id') == request.get('id'):
-                                i['status'] = 'declined'
-                                break
-                        save_matchmaking_data(interactions)
+                        update_interaction(request.get('id'), status='declined')
                         st.info(f"❌ Declined connection from {request.get('from_user_name')}")
                         st.rerun()
         
@@ -886,14 +863,11 @@ with tab3:
         # Mark messages as read when viewing chat
         if chat_messages:
             # Mark unread messages as read
-            interactions = load_matchmaking_data()
-            for msg in chat_messages:
-                if msg.get('to_user_id') == current_user_id and msg.get('status') == 'sent':
-                    for i in interactions:
-                        if i.get('id') == msg.get('id'):
-                            i['status'] = 'read'
-                            break
-            save_matchmaking_data(interactions)
+            update_interactions(
+                [msg.get('id') for msg in chat_messages
+                 if msg.get('to_user_id') == current_user_id and msg.get('status') == 'sent'],
+                status='read'
+            )
             
             st.markdown("**Chat History:**")
             
@@ -955,9 +929,7 @@ with tab3:
                 ):
                         if message.strip():
                             # Save chat message to matchmaking data
-                            interactions = load_matchmaking_data()
                             new_message = {
-                                "id": len(interactions) + 1,
                                 "from_user_id": current_user_id,
                                 "to_user_id": st.session_state.selected_chat_user_id,
                                 "from_user_name": current_user_name,
@@ -967,8 +939,7 @@ with tab3:
                                 "message": message.strip(),
                                 "created_at": datetime.now().isoformat()
                             }
-                            interactions.append(new_message)
-                            save_matchmaking_data(interactions)
+                            add_interaction(new_message)
                             st.success(f"✅ Message sent to {st.session_state.selected_chat_user.get('Name')}!")
                             st.rerun()
             
@@ -1038,9 +1009,7 @@ with tab3:
                             contact_message = f"{personal_message}\n\n**My Contact Information:**\n" + "\n".join(contact_info) if personal_message else f"**My Contact Information:**\n" + "\n".join(contact_info)
                             
                             # Save to matchmaking data
-                            interactions = load_matchmaking_data()
                             new_interaction = {
-                                "id": len(interactions) + 1,
                                 "from_user_id": current_user_id,
                                 "to_user_id": st.session_state.contact_target_user.get('ID'),
                                 "from_user_name": current_user_name,
@@ -1054,8 +1023,7 @@ with tab3:
                                 },
                                 "created_at": datetime.now().isoformat()
                             }
-                            interactions.append(new_interaction)
-                            save_matchmaking_data(interactions)
+                            add_interaction(new_interaction)
                             
                             st.success(f"✅ Contact info sent to {st.session_state.contact_target_user.get('Name')}!")
                             st.balloons()
@@ -1196,9 +1164,7 @@ with tab4:
                             contact_message = f"{personal_message}\n\n**My Contact Information:**\n" + "\n".join(contact_info) if personal_message else f"**My Contact Information:**\n" + "\n".join(contact_info)
                             
                             # Save contact sharing interaction
-                            interactions = load_matchmaking_data()
                             new_interaction = {
-                                "id": len(interactions) + 1,
                                 "from_user_id": current_user_id,
                                 "to_user_id": recipient_id,
                                 "from_user_name": current_user_name,
@@ -1214,8 +1180,7 @@ with tab4:
                                 },
                                 "created_at": datetime.now().isoformat()
                             }
-                            interactions.append(new_interaction)
-                            save_matchmaking_data(interactions)
+                            add_interaction(new_interaction)
                             
                             st.success(f"✅ Contact information sent to {recipient_name}!")
                             st.balloons()
@@ -1303,6 +1268,7 @@ with tab5:
                     # Sent requests
                     st.markdown(f"**📤 Sent to: {request.get('to_user_name')}**")
                     st.write(f"📅 Meeting: {request.get('meeting_type', 'General meeting')}")
+                    show_meeting_slot(request)
                     st.write(f"💬 Message: {request.get('message', 'No message')}")
                     status = request.get('status', 'pending')
                     
@@ -1317,6 +1283,7 @@ with tab5:
                     # Received requests
                     st.markdown(f"**📥 From: {request.get('from_user_name')}**")
                     st.write(f"📅 Meeting: {request.get('meeting_type', 'General meeting')}")
+                    show_meeting_slot(request)
                     st.write(f"💬 Message: {request.get('message', 'No message')}")
                     
                     if request.get('status') == 'pending':
@@ -1325,24 +1292,14 @@ with tab5:
                         with col_accept:
                             if st.button("✅ Accept", key=f"accept_meeting_{request.get('id')}"):
                                 # Update meeting status
-                                interactions = load_matchmaking_data()
-                                for i in interactions:
-                                    if i.get('id') == request.get('id'):
-                                        i['status'] = 'accepted'
-                                        break
-                                save_matchmaking_data(interactions)
+                                update_interaction(request.get('id'), status='accepted')
                                 st.success("Meeting accepted!")
                                 st.rerun()
                         
                         with col_decline:
                             if st.button("❌ Decline", key=f"decline_meeting_{request.get('id')}"):
                                 # Update meeting status
-                                interactions = load_matchmaking_data()
-                                for i in interactions:
-                                    if i.get('id') == request.get('id'):
-                                        i['status'] = 'declined'
-                                        break
-                                save_matchmaking_data(interactions)
+                                update_interaction(request.get('id'), status='declined')
                                 st.success("Meeting declined.")
                                 st.rerun()
                     
@@ -1366,6 +1323,17 @@ with tab5:
                 "Collaboration", "General Meeting", "Quick Chat"
             ])
             
+            # Optional time slot, checked against the agenda for clashes
+            agenda_index = get_agenda_index()
+            event_days = [d for d in agenda_index.days() if parse_day_key(d)] or agenda_index.days()
+            col_day, col_time, col_duration = st.columns(3)
+            with col_day:
+                meeting_day = st.selectbox("Day", ["Not scheduled"] + event_days)
+            with col_time:
+                meeting_time = st.time_input("Time", value=time(10, 0), step=900)
+            with col_duration:
+                duration_minutes = st.selectbox("Duration (minutes)", [15, 30, 45, 60], index=1)
+            
             message = st.text_area("Message (Optional)", placeholder="Hi! I'd like to meet with you to discuss...")
             
             col_send, col_cancel = st.columns(2)
@@ -1373,9 +1341,7 @@ with tab5:
             with col_send:
                 if st.form_submit_button("📤 Send Request", width='stretch'):
                     # Create meeting request
-                    interactions = load_matchmaking_data()
                     new_request = {
-                        "id": len(interactions) + 1,
                         "from_user_id": current_user_id,
                         "to_user_id": st.session_state.meeting_target_user.get('ID'),
                         "from_user_name": current_user_name,
@@ -1386,8 +1352,11 @@ with tab5:
                         "message": message.strip() if message.strip() else f"Would like to schedule a {meeting_type.lower()}",
                         "created_at": datetime.now().isoformat()
                     }
-                    interactions.append(new_request)
-                    save_matchmaking_data(interactions)
+                    if meeting_day != "Not scheduled":
+                        new_request["meeting_day"] = meeting_day
+                        new_request["meeting_time"] = meeting_time.strftime("%H:%M")
+                        new_request["duration_minutes"] = duration_minutes
+                    add_interaction(new_request)
                     
                     st.success(f"Meeting request sent to {st.session_state.meeting_target_user.get('Name')}!")
                     st.session_state.show_meeting_request = False
@@ -1403,7 +1372,7 @@ with tab5:
 with tab6:
     st.markdown("### 🎯 Recommended Matches")
     
-    # Simple recommendation algorithm
+    # Profile-similarity recommendations (see lib/recommendations.py)
     current_user_delegate = None
     for d in delegates:
         if str(d.get('ID')) == str(current_user_id):
@@ -1411,35 +1380,18 @@ with tab6:
             break
     
     if current_user_delegate:
-        # Find delegates with similar characteristics
-        recommendations = []
-        
-        for delegate in other_delegates:
-            score = 0
-            
-            # Same organization (higher weight)
-            if delegate.get('Organization') == current_user_delegate.get('Organization'):
-                score += 10
-            
-            # Same category
-            if delegate.get('Category') == current_user_delegate.get('Category'):
-                score += 5
-            
-            # Similar roles
-            if (delegate.get('RoleTitle') and current_user_delegate.get('RoleTitle') and
-                any(word in str(delegate.get('RoleTitle', '')).lower() for word in str(current_user_delegate.get('RoleTitle', '')).lower().split())):
-                score += 3
-            
-            if score > 0:
-                recommendations.append((delegate, score))
-        
-        # Sort by score
-        recommendations.sort(key=lambda x: x[1], reverse=True)
+        # Find delegates with similar characteristics (already-connected delegates are skipped)
+        recommendations = recommend(
+            current_user_id, delegates, k=5,
+            exclude=get_connected_user_ids(current_user_id)
+        )
         
         if recommendations:
             st.markdown("**💡 Based on your profile, we recommend these connections:**")
             
-            for delegate, score in recommendations[:5]:  # Show top 5
+            connection_statuses = get_connection_statuses(current_user_id, [d.get('ID') for d, _ in recommendations])
+            
+            for delegate, score in recommendations:
                 with st.container(border=True):
                     col1, col2 = st.columns([3, 1])
                     
@@ -1456,18 +1408,18 @@ with tab6:
                             reasons.append("Same organization")
                         if delegate.get('Category') == current_user_delegate.get('Category'):
                             reasons.append("Same category")
+                        if delegate.get('Nationality') and delegate.get('Nationality') == current_user_delegate.get('Nationality'):
+                            reasons.append("Same nationality")
                         if reasons:
                             st.caption(f"💡 Recommended: {', '.join(reasons)}")
                     
                     with col2:
-                        connection_status = get_connection_status(current_user_id, delegate.get('ID'))
+                        connection_status = connection_statuses.get(str(delegate.get('ID')), 'none')
                         
                         if connection_status == 'none':
                             if st.button(f"🤝 Connect", key=f"rec_connect_{delegate.get('ID')}", width='stretch'):
                                 # Send connection request
-                                interactions = load_matchmaking_data()
                                 new_interaction = {
-                                    "id": len(interactions) + 1,
                                     "from_user_id": current_user_id,
                                     "to_user_id": delegate.get('ID'),
                                     "from_user_name": current_user_name,
@@ -1477,8 +1429,7 @@ with tab6:
                                     "message": f"{current_user_name} wants to connect with you",
                                     "created_at": datetime.now().isoformat()
                                 }
-                                interactions.append(new_interaction)
-                                save_matchmaking_data(interactions)
+                                add_interaction(new_interaction)
                                 
                                 # Create notification for the recipient
                                 if NOTIFICATION_SYSTEM_AVAILABLE:
@@ -1,8 +1,6 @@
 import json, streamlit as st
 from lib.ui import apply_brand
-from pathlib import Path
-from datetime import datetime, timedelta
-import re
+from lib.agenda import get_agenda_index
 
 st.set_page_config(page_title="Event Schedule — Insaka", page_icon="🗓️", layout="wide")
 
@@ -284,11 +282,8 @@ SEGMENT_COLORS = {
     "other": "#666666"           # Gray
 }
 
-# Load agenda
-try:
-    agenda = json.load(open("data/agenda.json", "r", encoding="utf-8"))
-except Exception:
-    agenda = []
+# Load agenda (parsed and sorted once per file change)
+agenda_index = get_agenda_index()
 
 # Load speakers for bio popup
 try:
@@ -359,47 +354,8 @@ def show_speaker_bio(speaker_name):
     else:
         st.warning(f"Speaker '{speaker_name}' not found in database.")
 
-# Parse time to hour (for sorting)
-def parse_time_to_hour(time_str):
-    """Convert time string to hour (24-hour format) in minutes from midnight"""
-    try:
-        time_str = str(time_str).strip().upper()
-        
-        # Skip invalid times
-        if time_str in ['NAN', 'N/A', '', 'TBA']:
-            return 540  # Default to 9 AM
-        
-        time_str = re.sub(r'\s+', ' ', time_str)
-        
-        # Handle time ranges (e.g., "07:00 - 13:00") - extract start time
-        if '-' in time_str or '–' in time_str:
-            time_str = time_str.split('-')[0].split('–')[0].strip()
-        
-        # Handle "TO" in time ranges
-        if 'TO' in time_str:
-            time_str = time_str.split('TO')[0].strip()
-        
-        # Parse different time formats
-        if 'AM' in time_str or 'PM' in time_str:
-            # 12-hour format with AM/PM
-            time_str_clean = time_str.replace('AM', ' AM').replace('PM', ' PM')
-            time_str_clean = re.sub(r'\s+', ' ', time_str_clean)
-            time_obj = datetime.strptime(time_str_clean.strip(), "%I:%M %p")
-        else:
-            # 24-hour format
-            # Extract just the time part (HH:MM)
-            time_match = re.search(r'(\d{1,2}):(\d{2})', time_str)
-            if time_match:
-                time_obj = datetime.strptime(time_match.group(0), "%H:%M")
-            else:
-                return 540  # Default to 9 AM
-        
-        return time_obj.hour * 60 + time_obj.minute
-    except Exception as e:
-        return 540  # Default to 9 AM if parsing fails
-
 # Get unique days and sort them
-days = sorted(set([item.get("day", "TBA") for item in agenda]))
+days = agenda_index.days()
 
 if not days:
     st.info("No events scheduled yet. Check back soon!")
@@ -422,10 +378,7 @@ else:
         
         # Show only selected day
         day = selected_day
-        day_items = sorted(
-            [a for a in agenda if a.get("day") == day],
-            key=lambda x: parse_time_to_hour(x.get("time", "09:00"))
-        )
+        day_items = agenda_index.day_items(day)
         
         # Count events
         event_count = len(day_items)
@@ -529,10 +482,7 @@ else:
         day = selected_day_timeline
         st.markdown(f"## 📆 {day}")
         
-        day_items = sorted(
-            [a for a in agenda if a.get("day") == day],
-            key=lambda x: parse_time_to_hour(x.get("time", "09:00"))
-        )
+        day_items = agenda_index.day_items(day)
         
         st.markdown('<div class="timeline-container"><div class="timeline-line"></div>', unsafe_allow_html=True)
         
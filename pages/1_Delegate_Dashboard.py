@@ -3,7 +3,9 @@ import streamlit as st
 import json
 from datetime import datetime
 from lib.ui import apply_brand
-from lib.translations import get_translation, create_language_switcher, get_text_direction, is_rtl_language
+from lib.translations import get_translator, create_language_switcher, get_text_direction, is_rtl_language
+from lib.matchmaking_store import get_user_interactions
+from lib.agenda import get_current_and_upcoming_sessions, get_schedule_clashes
 
 # Initialize notification system availability
 NOTIFICATION_SYSTEM_AVAILABLE = False
@@ -218,6 +220,7 @@ try:
         create_test_notifications,
         clear_all_notifications,
         mark_notification_read,
+        mark_all_notifications_read,
         NOTIFICATION_TYPES
     )
     NOTIFICATION_SYSTEM_AVAILABLE = True
@@ -244,7 +247,10 @@ except ImportError:
     def clear_all_notifications(user_id):
         return False
     
-    def mark_notification_read(notification_id):
+    def mark_notification_read(notification_id, user_id=None):
+        return False
+    
+    def mark_all_notifications_read(user_id, topics=None):
         return False
     
     NOTIFICATION_SYSTEM_AVAILABLE = False
@@ -274,25 +280,9 @@ def load_pr_posts():
     except Exception:
         return []
 
-def load_matchmaking_data():
-    """Load matchmaking interactions"""
-    try:
-        with open("data/matchmaking.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
-
 def get_user_connections(user_id):
     """Get user's connection count"""
-    interactions = load_matchmaking_data()
-    connections = 0
-    
-    for interaction in interactions:
-        if interaction.get('status') == 'accepted':
-            if interaction.get('from_user_id') == user_id or interaction.get('to_user_id') == user_id:
-                connections += 1
-    
-    return connections
+    return sum(1 for i in get_user_interactions(user_id) if i.get('status') == 'accepted')
 
 def format_count(count):
     """Format large numbers with k, M suffix (e.g., 1000 -> 1k, 1000000 -> 1M)"""
@@ -360,14 +350,9 @@ def get_total_notifications():
         system_notifications = 0
     
     # Fallback to manual calculation for legacy data
+    # (announcements are broadcast notifications, already in system_notifications)
     total = system_notifications
     
-    # Check announcements
-    announcements = load_announcements()
-    urgent_count = len([a for a in announcements if a.get('priority') == 'Urgent'])
-    high_count = len([a for a in announcements if a.get('priority') == 'High'])
-    total += urgent_count + high_count
-    
     # Check news
     news_list = load_news()
     total += len(news_list)
@@ -388,9 +373,7 @@ def get_total_notifications():
     
     # Check matchmaking
     try:
-        with open("data/matchmaking.json", "r", encoding="utf-8") as f:
-            matchmaking_data = json.load(f)
-        for interaction in matchmaking_data:
+        for interaction in get_user_interactions(current_user_id):
             if (interaction.get('to_user_id') == current_user_id and 
                 interaction.get('status') == 'pending' and 
                 interaction.get('type') in ['connection_request', 'chat_message']):
@@ -593,7 +576,7 @@ def get_total_notifications():
 #                         if st.button("✓", key=f"mark_read_{notification.get('id')}", help="Mark as read"):
 #                             try:
 #                                 if NOTIFICATION_SYSTEM_AVAILABLE:
-#                                     mark_notification_read(notification.get('id'))
+#                                     mark_notification_read(notification.get('id'), user_id=current_user_id)
 #                                     st.success("✅ Marked as read!")
 #                                     st.rerun()
 #                                 else:
@@ -605,15 +588,27 @@ def get_total_notifications():
 # else:
 #     st.info("ℹ️ No notifications at this time. Use the test controls above to create some!")
 
+# Unread notifications (announcement broadcasts included), with a way to clear them
+if NOTIFICATION_SYSTEM_AVAILABLE:
+    unread_notifications = get_notification_count(current_user_id, unread_only=True)
+    if unread_notifications > 0:
+        notif_col1, notif_col2 = st.columns([4, 1])
+        with notif_col1:
+            st.markdown(f"🔔 **Notifications** {get_notification_badge(unread_notifications)}", unsafe_allow_html=True)
+        with notif_col2:
+            if st.button("✓ Mark all read", key="mark_all_notifications_read", width='stretch'):
+                mark_all_notifications_read(current_user_id)
+                st.rerun()
+
 # Full-width personalized greeting with RTL support
+t = get_translator(current_language)
 text_direction = get_text_direction(current_language)
 rtl_style = "direction: rtl; text-align: right;" if is_rtl_language(current_language) else "direction: ltr; text-align: center;"
 
 if hasattr(st.session_state, 'delegate_name') and st.session_state.delegate_name:
     # Get delegate photo
     try:
-        from staff_service import load_staff_df
-        df = load_staff_df()
+        from staff_service import get_delegate
         delegate_id = str(st.session_state.delegate_id)
         
         # Check if it's a speaker ID
@@ -630,11 +625,8 @@ if hasattr(st.session_state, 'delegate_name') and st.session_state.delegate_name
                     break
         else:
             # Load from delegates
-            mask = df["ID"].astype(str) == delegate_id
-            if mask.any():
-                delegate_photo = df[mask].iloc[0].get('BadgePhoto', '')
-            else:
-                delegate_photo = ''
+            record = get_delegate(delegate_id)
+            delegate_photo = record.get('BadgePhoto', '') if record is not None else ''
     except:
         delegate_photo = ''
     
@@ -663,92 +655,21 @@ if hasattr(st.session_state, 'delegate_name') and st.session_state.delegate_name
     with col_greeting:
         st.markdown(f"""
         <div style="background: linear-gradient(135deg, #198A00 0%, #2BA300 50%, #D10000 100%); color: white; padding: 2rem; border-radius: 20px; {rtl_style} box-shadow: 0 8px 32px rgba(25, 138, 0, 0.2);">
-            <h1 style="color: white; margin-bottom: 0.5rem; font-size: 2rem; font-weight: 700;">👋 {get_translation('hello', current_language)}, {st.session_state.delegate_name}!</h1>
-            <p style="color: #f0f8f0; margin-bottom: 0; font-size: 1.1rem; font-weight: 500;">{get_translation('welcome', current_language)} to The Zambian Mining and Investment Insaka Conference 2025</p>
+            <h1 style="color: white; margin-bottom: 0.5rem; font-size: 2rem; font-weight: 700;">👋 {t('hello')}, {st.session_state.delegate_name}!</h1>
+            <p style="color: #f0f8f0; margin-bottom: 0; font-size: 1.1rem; font-weight: 500;">{t('welcome')} to The Zambian Mining and Investment Insaka Conference 2025</p>
             <p style="color: #e8f5e8; margin-bottom: 0; font-size: 0.9rem;">{st.session_state.delegate_organization} • {st.session_state.delegate_category}</p>
         </div>
         """, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
 else:
-    st.markdown(f"# 👤 {get_translation('delegate_dashboard', current_language)}")
+    st.markdown(f"# 👤 {t('delegate_dashboard')}")
     st.markdown("Welcome to your conference dashboard")
 
 
 
 st.markdown('<div class="zambia-accent"></div>', unsafe_allow_html=True)
 
-# Helper functions for agenda snippets
-def load_agenda():
-    """Load agenda from JSON file"""
-    try:
-        with open("data/agenda.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
-
-def parse_time_to_minutes(time_str):
-    """Convert time string to minutes since midnight for comparison"""
-    import re
-    try:
-        time_str = time_str.strip().upper()
-        time_str = re.sub(r'\s+', ' ', time_str)
-        
-        if 'AM' in time_str or 'PM' in time_str:
-            time_obj = datetime.strptime(time_str, "%I:%M %p")
-        else:
-            time_obj = datetime.strptime(time_str, "%H:%M")
-        return time_obj.hour * 60 + time_obj.minute
-    except:
-        return 540  # Default to 9 AM
-
-def get_current_and_upcoming_sessions():
-    """Get current session and next 2 upcoming sessions"""
-    agenda = load_agenda()
-    if not agenda:
-        return None, []
-    
-    # Get current time and day
-    now = datetime.now()
-    current_minutes = now.hour * 60 + now.minute
-    
-    # Simple day name mapping (you may need to adjust based on your day format)
-    current_day_name = now.strftime("%a %d %b")  # e.g., "Sun 6 Oct"
-    
-    # Get today's events
-    today_events = [e for e in agenda if current_day_name in e.get('day', '')]
-    
-    # If no events today, get all future events
-    if not today_events:
-        future_events = sorted(agenda, key=lambda x: parse_time_to_minutes(x.get('time', '09:00')))
-        return None, future_events[:2]
-    
-    # Sort by time
-    today_events.sort(key=lambda x: parse_time_to_minutes(x.get('time', '09:00')))
-    
-    # Find current and upcoming
-    current_session = None
-    upcoming = []
-    
-    for idx, event in enumerate(today_events):
-        event_time = parse_time_to_minutes(event.get('time', '09:00'))
-        
-        # Assume each session lasts 60 minutes (you can adjust this)
-        session_duration = 60
-        
-        if event_time <= current_minutes < event_time + session_duration:
-            # This is the current session
-            current_session = event
-            # Get next 2 sessions
-            upcoming = today_events[idx+1:idx+3]
-            break
-        elif event_time > current_minutes:
-            # This is a future session
-            upcoming = today_events[idx:idx+2]
-            break
-    
-    return current_session, upcoming
-
 # Segment type colors (matching agenda page)
 SEGMENT_COLORS = {
     "keynote": "#D10000",
@@ -762,19 +683,19 @@ SEGMENT_COLORS = {
 }
 
 # Personal section - Check-in first (as dropdown)
-with st.expander(f"👤 {get_translation('my_information', current_language)}", expanded=True):
+with st.expander(f"👤 {t('my_information')}", expanded=True):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button(f"✏️ {get_translation('update_details', current_language)}", width='stretch'):
+        if st.button(f"✏️ {t('update_details')}", width='stretch'):
             st.switch_page("pages/7_Delegate_Self_Service.py")
 
     with col2:
-        if st.button(f"📱 {get_translation('download_materials', current_language)}", width='stretch'):
+        if st.button(f"📱 {t('download_materials')}", width='stretch'):
             st.switch_page("pages/5_Materials.py")
 
     with col3:
-        if st.button(f"✅ {get_translation('daily_checkin', current_language)}", width='stretch'):
+        if st.button(f"✅ {t('daily_checkin')}", width='stretch'):
             st.switch_page("pages/8_Check_In.py")
 
     # QR Code section - HIDDEN FOR NOW
@@ -785,7 +706,7 @@ with st.expander(f"👤 {get_translation('my_information', current_language)}",
 st.write("")
 
 # Quick access buttons (as dropdown)
-with st.expander(f"▶️ {get_translation('quick_access', current_language)}", expanded=True):
+with st.expander(f"▶️ {t('quick_access')}", expanded=True):
     col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
 
     with col1:
@@ -795,11 +716,11 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
         # Create notification badge with HTML
         if agenda_notifications > 0:
             badge_html = get_notification_badge(agenda_notifications)
-            st.markdown(f"📅 **{get_translation('agenda', current_language)}** {badge_html}", unsafe_allow_html=True)
+            st.markdown(f"📅 **{t('agenda')}** {badge_html}", unsafe_allow_html=True)
         else:
-            st.markdown(f"📅 **{get_translation('agenda', current_language)}**")
+            st.markdown(f"📅 **{t('agenda')}**")
         
-        if st.button(get_translation('view_schedule', current_language), width='stretch', help="View conference schedule"):
+        if st.button(t('view_schedule'), width='stretch', help="View conference schedule"):
             st.switch_page("pages/1_Agenda.py")
 
     with col2:
@@ -808,11 +729,11 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
         
         if speakers_notifications > 0:
             badge_html = get_notification_badge(speakers_notifications)
-            st.markdown(f"🎙️ **{get_translation('speakers', current_language)}** {badge_html}", unsafe_allow_html=True)
+            st.markdown(f"🎙️ **{t('speakers')}** {badge_html}", unsafe_allow_html=True)
         else:
-            st.markdown(f"🎙️ **{get_translation('speakers', current_language)}**")
+            st.markdown(f"🎙️ **{t('speakers')}**")
         
-        if st.button(get_translation('meet_speakers', current_language), width='stretch', help="Meet our speakers"):
+        if st.button(t('meet_speakers'), width='stretch', help="Meet our speakers"):
             st.switch_page("pages/2_Speakers.py")
 
     with col3:
@@ -821,11 +742,11 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
         
         if exhibitors_notifications > 0:
             badge_html = get_notification_badge(exhibitors_notifications)
-            st.markdown(f"🏢 **{get_translation('exhibitors', current_language)}** {badge_html}", unsafe_allow_html=True)
+            st.markdown(f"🏢 **{t('exhibitors')}** {badge_html}", unsafe_allow_html=True)
         else:
-            st.markdown(f"🏢 **{get_translation('exhibitors', current_language)}**")
+            st.markdown(f"🏢 **{t('exhibitors')}**")
         
-        if st.button(get_translation('explore_booths', current_language), width='stretch', help="Explore exhibitor booths"):
+        if st.button(t('explore_booths'), width='stretch', help="Explore exhibitor booths"):
             st.switch_page("pages/3_Exhibitors.py")
 
     with col4:
@@ -840,11 +761,11 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
         
         if venue_notifications > 0:
             badge_html = get_notification_badge(venue_notifications)
-            st.markdown(f"🏛️ **{get_translation('venue', current_language)}** {badge_html}", unsafe_allow_html=True)
+            st.markdown(f"🏛️ **{t('venue')}** {badge_html}", unsafe_allow_html=True)
         else:
-            st.markdown(f"🏛️ **{get_translation('venue', current_language)}**")
+            st.markdown(f"🏛️ **{t('venue')}**")
         
-        if st.button(get_translation('venue_info', current_language), width='stretch', help="Venue information"):
+        if st.button(t('venue_info'), width='stretch', help="Venue information"):
             st.switch_page("pages/6_Venue.py")
 
     with col6:
@@ -865,12 +786,9 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
     with col7:
         # Check for matchmaking activity
         try:
-            with open("data/matchmaking.json", "r", encoding="utf-8") as f:
-                matchmaking_data = json.load(f)
-            
             # Count pending connection requests and new messages
             matchmaking_notifications = 0
-            for interaction in matchmaking_data:
+            for interaction in get_user_interactions(current_user_id):
                 if (interaction.get('to_user_id') == current_user_id and 
                     interaction.get('status') == 'pending' and 
                     interaction.get('type') in ['connection_request', 'chat_message']):
@@ -880,19 +798,19 @@ with st.expander(f"▶️ {get_translation('quick_access', current_language)}",
         
         if matchmaking_notifications > 0:
             badge_html = get_notification_badge(matchmaking_notifications)
-            st.markdown(f"💼 **{get_translation('matchmaking', current_language)}** {badge_html}", unsafe_allow_html=True)
+            st.markdown(f"💼 **{t('matchmaking')}** {badge_html}", unsafe_allow_html=True)
         else:
-            st.markdown(f"💼 **{get_translation('matchmaking', current_language)}**")
+            st.markdown(f"💼 **{t('matchmaking')}**")
         
-        if st.button(get_translation('network_now', current_language), width='stretch', help="Network with other delegates"):
+        if st.button(t('network_now'), width='stretch', help="Network with other delegates"):
             st.switch_page("pages/11_Matchmaking.py")
 
 # Conference info
-st.subheader(f"📋 {get_translation('conference_info', current_language)}")
+st.subheader(f"📋 {t('conference_info')}")
 st.info(f"""
-**{get_translation('conference_dates', current_language)}:** October 6-8, 2025  
-**{get_translation('location', current_language)}:** [Venue details will be shown here]  
-**{get_translation('theme', current_language)}:** {get_translation('collaborate_innovate_thrive', current_language)}
+**{t('conference_dates')}:** October 6-8, 2025  
+**{t('location')}:** [Venue details will be shown here]  
+**{t('theme')}:** {t('collaborate_innovate_thrive')}
 """)
 
 # What's Happening Now & Coming Up section
@@ -1004,6 +922,19 @@ else:
     if st.button("📅 View Full Schedule", use_container_width=True, key="schedule_view_btn_alt"):
         st.switch_page("pages/1_Agenda.py")
 
+# Warn about meetings booked over sessions this delegate speaks at or facilitates
+schedule_clashes = get_schedule_clashes(
+    [i for i in get_user_interactions(current_user_id)
+     if i.get('type') == 'meeting_request' and i.get('status') in ('pending', 'accepted')],
+    st.session_state.get('delegate_name', '')
+)
+for meeting, session in schedule_clashes:
+    other_name = meeting.get('to_user_name') if meeting.get('from_user_id') == current_user_id else meeting.get('from_user_name')
+    st.warning(
+        f"⚠️ Your meeting with {other_name} ({meeting.get('meeting_day')} {meeting.get('meeting_time')}) "
+        f"clashes with \"{session.get('title', 'Untitled')}\" ({session.get('time', 'TBA')})"
+    )
+
 st.markdown("---")
 
 # Updates, PR, and Networking sections
@@ -1115,7 +1046,7 @@ with col1:
 
 # Latest PR Posts
 with col2:
-    st.subheader(f"📰 {get_translation('trending_posts', current_language)}")
+    st.subheader(f"📰 {t('trending_posts')}")
     pr_posts = load_pr_posts()
     
     if pr_posts:
@@ -1179,17 +1110,17 @@ with col2:
             if st.button("📰 View All Posts", use_container_width=True, key="view_all_pr"):
                 st.switch_page("pages/10_Interactive_PR.py")
     else:
-        st.info(get_translation('no_trending_posts', current_language))
+        st.info(t('no_trending_posts'))
 
 # Networking Overview
 with col3:
-    st.subheader(f"💼 {get_translation('networking', current_language)}")
+    st.subheader(f"💼 {t('networking')}")
     
     # Get user's connection count
     connection_count = get_user_connections(current_user_id)
     
     # Get pending requests and new messages
-    interactions = load_matchmaking_data()
+    interactions = get_user_interactions(current_user_id)
     pending_requests = len([i for i in interactions if 
                            i.get('to_user_id') == current_user_id and 
                            i.get('type') == 'connection_request' and 
@@ -1206,14 +1137,14 @@ with col3:
     # Add notification indicator to header
     if total_networking_notifications > 0:
         badge_html = get_notification_badge(total_networking_notifications)
-        st.markdown(f"### 💼 {get_translation('networking', current_language)} {badge_html}", unsafe_allow_html=True)
+        st.markdown(f"### 💼 {t('networking')} {badge_html}", unsafe_allow_html=True)
     else:
-        st.subheader(f"💼 {get_translation('networking', current_language)}")
+        st.subheader(f"💼 {t('networking')}")
     
-    st.metric(get_translation('connections', current_language), connection_count)
+    st.metric(t('connections'), connection_count)
     
     if pending_requests > 0:
-        st.metric(get_translation('pending_requests', current_language), pending_requests)
+        st.metric(t('pending_requests'), pending_requests)
         st.error(f"🚨 {pending_requests} pending connection request{'s' if pending_requests > 1 else ''}!")
     elif new_messages > 0:
         st.metric("New Messages", new_messages)
@@ -1245,7 +1176,7 @@ col_footer1, col_footer2, col_footer3 = st.columns([2, 1, 2])
 with col_footer1:
     st.caption("Need help? Contact the conference organizers or visit the registration desks.")
 with col_footer2:
-    if st.button(f"🚪 {get_translation('logout', current_language)}", width='stretch', key="dashboard_logout"):
+    if st.button(f"🚪 {t('logout')}", width='stretch', key="dashboard_logout"):
         # Clear all session state
         for key in list(st.session_state.keys()):
             if key.startswith('delegate_'):
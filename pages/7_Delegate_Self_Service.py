@@ -2,7 +2,7 @@
 import streamlit as st
 import pandas as pd
 from lib.ui import apply_brand
-from staff_service import load_staff_df, save_staff_df
+from staff_service import load_staff_df, save_staff_df, get_delegate, find_delegate_by_email
 
 st.set_page_config(page_title="Delegate Self-Service — Insaka", page_icon="👤", layout="wide")
 
@@ -99,11 +99,9 @@ elif not hasattr(st.session_state, 'delegate_authenticated') or not st.session_s
             if st.form_submit_button("🔑 Quick Login", width='stretch'):
                 if delegate_id.strip():
                     # Verify delegate exists
-                    df = load_staff_df()
-                    mask = df["ID"].astype(str) == str(delegate_id.strip())
+                    delegate_record = get_delegate(delegate_id.strip())
                     
-                    if mask.any():
-                        delegate_record = df[mask].iloc[0]
+                    if delegate_record is not None:
                         
                         # Check for dual role (delegate + speaker)
                         from lib.qr_system import check_dual_role_user
@@ -166,8 +164,13 @@ elif not hasattr(st.session_state, 'delegate_authenticated') or not st.session_s
             except:
                 pass
         else:
-            # Search by email (only delegates have emails)
-            mask = df["Email"].str.contains(search_term, case=False, na=False)
+            # Search by email (only delegates have emails); exact matches hit the index
+            exact = find_delegate_by_email(search_term)
+            if exact is not None:
+                results = exact.to_frame().T
+            else:
+                mask = df["Email"].str.contains(search_term, case=False, na=False)
+                results = df[mask]
             
         if len(results) == 0 and len(speaker_results) == 0:
             st.warning("No records found. Please check your spelling or contact the organizers.")
@@ -547,12 +550,10 @@ if st.session_state.delegate_category == 'Speaker':
 
 else:
     # Handle delegate self-service (existing logic)
-    df = load_staff_df()
-    mask = df["ID"].astype(str) == str(st.session_state.delegate_id)
+    delegate_record = get_delegate(st.session_state.delegate_id)
 
     # Check if delegate record exists
-    if mask.any():
-        delegate_record = df[mask].iloc[0]
+    if delegate_record is not None:
         st.success("✅ Your record found!")
     else:
         # Handle case where delegate record is not found
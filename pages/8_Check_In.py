@@ -136,7 +136,7 @@ for day_num in [1, 2, 3, 4, 5]:
         if is_checked_in:
             st.success("✅ Checked In")
             if st.button(f"❌ Undo Day {day_num}", key=f"undo_{day_num}"):
-                success, message = set_daily_checkin(delegate_id, day_num, False)
+                success, message = set_daily_checkin(delegate_id, day_num, False, station="self-service")
                 if success:
                     st.success("Check-in undone!")
                     st.rerun()
@@ -145,7 +145,7 @@ for day_num in [1, 2, 3, 4, 5]:
         else:
             st.info("⏳ Not Checked In")
             if st.button(f"✅ Check In Day {day_num}", key=f"checkin_{day_num}"):
-                success, message = set_daily_checkin(delegate_id, day_num, True)
+                success, message = set_daily_checkin(delegate_id, day_num, True, station="self-service")
                 if success:
                     st.success("🎉 Check-in successful!")
                     st.balloons()
@@ -188,7 +188,7 @@ else:
             st.balloons()
         else:
             if st.button(f"✅ Check In for {day_info['title']}", width='stretch', type="primary"):
-                success, message = set_daily_checkin(delegate_id, current_day, True)
+                success, message = set_daily_checkin(delegate_id, current_day, True, station="self-service")
                 if success:
                     st.success("🎉 Check-in successful!")
                     st.balloons()
@@ -3,6 +3,7 @@ import streamlit as st
 import json
 from datetime import datetime
 from lib.ui import apply_brand
+from lib.content_refresher import get_refresher
 
 # # Try to import the advanced web scraper, fallback to simple version
 # try:
@@ -306,6 +307,29 @@ def display_local_exhibitors(exhibitors):
                 if exhibitor.get('url'):
                     st.markdown(f"🌐 {exhibitor['url']}")
 
+def display_content_snapshot(snapshot):
+    """Display the latest published snapshot of an external source"""
+    if snapshot is None or not snapshot.ready:
+        if snapshot is not None and snapshot.error:
+            st.warning(f"Summit website unavailable ({snapshot.error}). Retrying in the background.")
+        else:
+            st.info("⏳ Loading content from the summit website...")
+        return
+
+    content_data = snapshot.data
+    if content_data.get('title'):
+        st.markdown(f"**{content_data['title']}**")
+    if content_data.get('images_html'):
+        st.markdown(content_data['images_html'], unsafe_allow_html=True)
+    if content_data.get('content'):
+        st.markdown(content_data['content'])
+
+    fetched = get_relative_time(datetime.fromtimestamp(snapshot.fetched_at).isoformat())
+    if snapshot.error:
+        st.caption(f"📅 Updated {fetched} • latest refresh failed, showing last good copy")
+    else:
+        st.caption(f"📅 Updated {fetched}")
+
 # Zambian-themed header
 st.markdown('<div class="zambia-accent"></div>', unsafe_allow_html=True)
 
@@ -457,6 +481,19 @@ with auto_col2:
 
 st.markdown('<div class="zambia-accent"></div>', unsafe_allow_html=True)
 
+# Live summit website content, kept fresh by the background refresher (only when INSAKA_EXTERNAL_FETCH=1)
+refresher = get_refresher()
+if refresher is not None:
+    st.markdown("### 🌐 From the Summit Website")
+    for name, source in refresher.sources.items():
+        with st.expander(f"{source.label or name}", expanded=False):
+            display_content_snapshot(refresher.snapshot(name))
+            if st.button("🔄 Refresh", key=f"refresh_source_{name}"):
+                refresher.request_refresh(name)
+                st.toast("Refresh requested — new content appears on the next reload")
+
+    st.markdown('<div class="zambia-accent"></div>', unsafe_allow_html=True)
+
 # Back button
 if st.button("← Back to Dashboard", type="secondary"):
     st.switch_page("pages/1_Delegate_Dashboard.py")
@@ -49,7 +49,17 @@ def add_announcement(title, content, priority="Normal"):
     }
     
     announcements.append(new_announcement)
-    return save_announcements(announcements)
+    if not save_announcements(announcements):
+        return False
+    
+    # One broadcast record reaches every delegate's notification feed
+    try:
+        from lib.notifications import add_broadcast
+        add_broadcast("announcement", title, content[:200], priority=priority,
+                      data={"announcement_id": new_announcement["id"]})
+    except ImportError:
+        pass
+    return True
 
 def delete_announcement(announcement_id):
     """Delete an announcement by ID"""
@@ -3,13 +3,16 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
+import time
 from datetime import datetime
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lib.ui import apply_brand
-from lib.qr_system import create_badge_qr_code, save_qr_code, generate_all_delegate_qr_codes
+from lib.qr_system import create_badge_qr_code, save_qr_code
+from lib.badge_export import start_badge_export
+from lib.badge_sheets import PAPER_SIZES, PER_PAGE, start_sheet_export
 from staff_service import load_staff_df, save_staff_df
 
 st.set_page_config(page_title="QR Code Management — Insaka Admin", page_icon="📱", layout="wide")
@@ -33,6 +36,47 @@ if not hasattr(st.session_state, 'admin_authenticated') or not st.session_state.
         st.switch_page("pages/Admin_Access.py")
     st.stop()
 
+def show_badge_job(job, download_label, file_prefix, extension, mime):
+    """Progress of a running badge export, or its download once finished"""
+    progress_bar = st.progress(job.progress)
+    status_text = st.empty()
+    # The job runs on its own thread; poll it (leaving the page does not stop it)
+    while job.running:
+        progress_bar.progress(job.progress)
+        status_text.text(f"{job.stage or 'Rendering badges'}... {job.done}/{job.total}")
+        time.sleep(0.5)
+    progress_bar.progress(job.progress)
+    
+    if job.status == "failed":
+        status_text.empty()
+        st.error(f"❌ Error generating badges: {job.error}")
+        st.info("💡 Badges rendered so far are kept; generating again resumes from there.")
+        return
+    
+    status_text.text(f"✅ {job.total} badges ready!")
+    
+    with open(job.path, "rb") as export_file:
+        st.download_button(
+            label=download_label,
+            data=export_file,
+            file_name=f"{file_prefix}_{datetime.fromtimestamp(job.finished_at or time.time()).strftime('%Y%m%d_%H%M%S')}.{extension}",
+            mime=mime,
+            width='stretch'
+        )
+    
+    # Show summary
+    st.markdown("### 📊 Generation Summary")
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric("Total Generated", job.total)
+    
+    with col2:
+        st.metric("Newly Rendered", job.rendered)
+    
+    with col3:
+        st.metric("File Size", f"{job.path.stat().st_size // 1024} KB")
+
 # Load staff data
 try:
     staff_df = load_staff_df()
@@ -133,64 +177,49 @@ with col2:
     st.markdown("Generate QR codes for all delegates at once.")
     
     if st.button("🎫 Generate All QR Codes", type="secondary", width='stretch'):
-        with st.spinner("Generating QR codes for all delegates..."):
-            try:
-                qr_codes = generate_all_delegate_qr_codes(staff_df)
-                
-                st.success(f"✅ Generated {len(qr_codes)} QR codes successfully!")
-                
-                # Show progress
-                progress_bar = st.progress(0)
-                status_text = st.empty()
-                
-                saved_files = []
-                for i, (delegate_id, qr_info) in enumerate(qr_codes.items()):
-                    # Update progress
-                    progress = (i + 1) / len(qr_codes)
-                    progress_bar.progress(progress)
-                    status_text.text(f"Processing delegate {delegate_id}...")
-                    
-                    # Save QR code
-                    filepath = save_qr_code(qr_info['image'], delegate_id, "badge_qr")
-                    saved_files.append(filepath)
-                
-                status_text.text("✅ All QR codes generated successfully!")
-                
-                # Create zip file for download
-                import zipfile
-                import io
-                
-                zip_buffer = io.BytesIO()
-                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    for filepath in saved_files:
-                        if os.path.exists(filepath):
-                            zip_file.write(filepath, os.path.basename(filepath))
-                
-                zip_buffer.seek(0)
-                
-                st.download_button(
-                    label="📥 Download All QR Codes (ZIP)",
-                    data=zip_buffer.getvalue(),
-                    file_name=f"insaka_qr_codes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                    mime="application/zip",
-                    width='stretch'
-                )
-                
-                # Show summary
-                st.markdown("### 📊 Generation Summary")
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Total Generated", len(qr_codes))
-                
-                with col2:
-                    st.metric("Success Rate", "100%")
-                
-                with col3:
-                    st.metric("File Size", f"{len(zip_buffer.getvalue()) // 1024} KB")
-            
-            except Exception as e:
-                st.error(f"❌ Error generating batch QR codes: {str(e)}")
+        try:
+            st.session_state.badge_export_job = start_badge_export(staff_df)
+        except Exception as e:
+            st.error(f"❌ Error generating batch QR codes: {str(e)}")
+    
+    if st.session_state.get('badge_export_job') is not None:
+        show_badge_job(st.session_state.badge_export_job, "📥 Download All QR Codes (ZIP)",
+                       "insaka_qr_codes", "zip", "application/zip")
+
+# Print-ready sheets
+st.markdown("## 🖨️ Print-Ready Badge Sheets")
+
+st.markdown("Lay out badges several to a page, with crop marks and a colour band per category, as one PDF for the print shop.")
+
+sheet_col1, sheet_col2 = st.columns(2)
+
+with sheet_col1:
+    sheet_categories = st.multiselect(
+        "Categories",
+        sorted(staff_df['Category'].dropna().astype(str).str.strip().unique()),
+        help="Leave empty to include every category"
+    )
+    sheet_organizations = st.multiselect(
+        "Organizations",
+        sorted(staff_df['Organization'].dropna().astype(str).str.strip().unique()),
+        help="Leave empty to include every organization"
+    )
+
+with sheet_col2:
+    sheet_paper = st.radio("Paper", list(PAPER_SIZES), horizontal=True)
+    sheet_per_page = st.select_slider("Badges per page", options=list(PER_PAGE), value=6)
+
+if st.button("🖨️ Generate Badge Sheets (PDF)", type="secondary", width='stretch'):
+    try:
+        st.session_state.badge_sheet_job = start_sheet_export(
+            staff_df, sheet_categories, sheet_organizations, sheet_paper, sheet_per_page
+        )
+    except Exception as e:
+        st.error(f"❌ Error generating badge sheets: {str(e)}")
+
+if st.session_state.get('badge_sheet_job') is not None:
+    show_badge_job(st.session_state.badge_sheet_job, "📥 Download Badge Sheets (PDF)",
+                   "insaka_badge_sheets", "pdf", "application/pdf")
 
 # QR Code Management
 st.markdown("## 🔧 QR Code Management")
@@ -267,7 +296,7 @@ with st.expander("📖 How to Use QR Codes", expanded=True):
     **For Conference Organizers:**
     
     1. **Generate QR Codes** - Use the individual or batch generation tools above
-    2. **Print on Badges** - Include QR codes on delegate badges
+    2. **Print on Badges** - Send the badge sheets PDF to the printer and cut along the crop marks
     3. **Distribute Badges** - Give badges to delegates at registration
     4. **Test Login** - Verify QR codes work with the login system
     
@@ -281,8 +310,8 @@ with st.expander("📖 How to Use QR Codes", expanded=True):
     **QR Code Features:**
     
     - ✅ **Unique per delegate** - Each QR code is personalized
-    - ✅ **Time-limited** - QR codes expire after 24 hours
-    - ✅ **Secure** - Contains encrypted delegate information
+    - ✅ **Time-limited logins** - Login QR codes expire after 24 hours
+    - ✅ **Door check-in badges** - Printed badge codes stay valid for the whole event but only check delegates in at the door; they cannot be used to log in
     - ✅ **Mobile-friendly** - Works on any smartphone
     - ✅ **Badge-ready** - Optimized for printing on badges
     """)
@@ -12,7 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from lib.ui import apply_brand
 from lib.qr_system import authenticate_with_qr_code, create_qr_scanner_script
-from staff_service import load_staff_df
+from staff_service import delegate_count
 from lib.translations import get_translation, get_text_direction, is_rtl_language
 
 st.set_page_config(page_title="QR Code Login — Insaka", page_icon="📱", layout="wide")
@@ -59,8 +59,7 @@ st.markdown(f"""
 
 # Load staff data
 try:
-    staff_df = load_staff_df()
-    if staff_df.empty:
+    if delegate_count() == 0:
         st.error("No delegate data found. Please contact administrator.")
         st.stop()
 except Exception as e:
@@ -349,7 +348,7 @@ if login_method == "📱 Scan QR Code":
     if qr_data_input:
         st.success("QR Code detected! Processing...")
         with st.spinner("Authenticating..."):
-            success, message, delegate = authenticate_with_qr_code(qr_data_input, staff_df)
+            success, message, delegate = authenticate_with_qr_code(qr_data_input)
             if success:
                 st.success(f"✅ {message}")
                 # Stage delegate and show confirmation button (no client-side nav needed)
@@ -373,7 +372,7 @@ else:
     if st.button("🔐 Login with QR Code", type="primary", width='stretch'):
         if qr_data_input.strip():
             with st.spinner("Authenticating..."):
-                success, message, delegate = authenticate_with_qr_code(qr_data_input.strip(), staff_df)
+                success, message, delegate = authenticate_with_qr_code(qr_data_input.strip())
                 
                 if success:
                     st.success(f"✅ {message}")
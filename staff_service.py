@@ -3,9 +3,18 @@ from __future__ import annotations
 from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
-from typing import Tuple, List
+from typing import Tuple, List, Optional, Dict
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 import pandas as pd
 import datetime as dt
+from checkin_log import EVENT_DAY, CheckinLog
+from lib.delegate_stats import DelegateStats, StatsSnapshot
+from lib.duplicate_index import Candidate, DuplicateIndex, get_index
+from lib.exports import data_version, delegate_package, file_version, frame_version, xlsx_artifact
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -50,16 +59,296 @@ def _ensure_schema(df: pd.DataFrame) -> pd.DataFrame:
     
     return df[COLUMNS]
 
+def _norm_id(value) -> str:
+    """Normalize an ID for lookups so "12", "12.0" and 12 all match."""
+    s = str(value).strip()
+    if s.endswith(".0") and s[:-2].isdigit():
+        return s[:-2]
+    return s
+
+def delegate_key(delegate_id) -> str:
+    """Normalized form of a delegate ID: two IDs name the same delegate when their keys are equal."""
+    return _norm_id(delegate_id)
+
+def _checkin_column(day: int) -> str:
+    """Delegate table column a check-in log day is compacted into."""
+    return "CheckedIn" if day == EVENT_DAY else f"Day{day}_CheckIn"
+
+def _norm_email(value) -> str:
+    s = str(value or "").strip().lower()
+    return "" if s in ("nan", "none", "null") else s
+
+def _truthy(value) -> bool:
+    """Interpret a CSV cell as a boolean; NaN/blank/"False" are False."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    if pd.isna(value):
+        return False
+    return bool(value)
+
+
+class _CsvBackend:
+    """The original storage: one CSV rewritten on every save."""
+
+    name = "csv"
+    supports_row_updates = False
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read_frame(self) -> pd.DataFrame:
+        if not self.path.exists():
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.read_csv(self.path)
+
+    def write_frame(self, df: pd.DataFrame):
+        # Write to a temp file and swap it in so readers never see a half-written CSV
+        tmp = self.path.with_suffix(".csv.tmp")
+        df.to_csv(tmp, index=False)
+        os.replace(tmp, self.path)
+        return self.signature()
+
+
+class _DelegateStore:
+    """
+    Process-wide cache of the normalized delegate frame.
+    The backend is only re-read when its signature (CSV mtime/size, SQLite
+    version counter) changes; lookups by ID, email and name+organization are
+    served from in-memory indexes.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.RLock()
+        self._sig = None
+        self._df: Optional[pd.DataFrame] = None
+        self._by_id: dict = {}
+        self._by_email: dict = {}
+        self._by_key: dict = {}
+        # Returns pending check-in events {(id_key, day): checked} to lay over the frame.
+        # Never called with self._lock held (see snapshot)
+        self.pending = lambda: {}
+
+    def _build(self, df: pd.DataFrame, sig) -> None:
+        df = df.reset_index(drop=True)
+        ids = [_norm_id(v) for v in df["ID"].tolist()]
+        emails = [_norm_email(v) for v in df["Email"].tolist()]
+        keys = (_norm_str(df["Name"]) + "|" + _norm_str(df["Organization"])).tolist()
+        by_id, by_email, by_key = {}, {}, {}
+        # First occurrence wins, matching the old `df[mask].iloc[0]` behaviour
+        for pos in range(len(df) - 1, -1, -1):
+            by_id[ids[pos]] = pos
+            if emails[pos]:
+                by_email[emails[pos]] = pos
+            by_key[keys[pos]] = pos
+        self._df, self._sig = df, sig
+        self._by_id, self._by_email, self._by_key = by_id, by_email, by_key
+
+    def frame(self) -> pd.DataFrame:
+        """Return the cached frame, reloading it if the backend changed. Do not mutate."""
+        with self._lock:
+            sig = self.backend.signature()
+            if self._df is None or sig != self._sig:
+                self._build(_ensure_schema(self.backend.read_frame()), sig)
+            return self._df
+
+    def version(self):
+        """Signature of the current table (reloading first if the backend changed)."""
+        with self._lock:
+            self.frame()
+            return self._sig
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._df = None
+            self._sig = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        with self._lock:
+            self.backend.write_frame(_ensure_schema(df))
+            self.invalidate()
+
+    def set_flags(self, ids: List[str], column: str, value: bool) -> set:
+        """
+        Set a check-in column for the given IDs in one write.
+        Returns the set of normalized IDs that matched a delegate.
+        """
+        return self.set_many({(column, bool(value)): ids})
+
+    def set_many(self, groups: Dict[Tuple[str, bool], List[str]]) -> set:
+        """Apply several {(column, value): ids} updates; one rewrite on CSV."""
+        with self._lock:
+            if self.backend.supports_row_updates:
+                matched_all = set()
+                for (column, value), ids in groups.items():
+                    before, after, matched = self.backend.set_flags(ids, column, value)
+                    if matched and self._df is not None and self._sig == before:
+                        # Nobody else wrote in between: patch a copy of the cached frame instead of
+                        # reloading. Readers may still hold the old frame, so it is swapped, never edited
+                        positions = [self._by_id[k] for k in matched if k in self._by_id]
+                        values = self._df[column].astype(object)
+                        values.iloc[positions] = bool(value)
+                        df = self._df.copy(deep=False)
+                        df[column] = values
+                        self._df, self._sig = df, after
+                    elif matched:
+                        self.invalidate()
+                    matched_all |= matched
+                return matched_all
+            df = self.frame()
+            keys = df["ID"].map(_norm_id)
+            matched_all = set()
+            for (column, value), ids in groups.items():
+                matched = {_norm_id(i) for i in ids} & self._by_id.keys()
+                if not matched:
+                    continue
+                if not matched_all:
+                    df = df.copy()
+                df[column] = df[column].astype(object)
+                df.loc[keys.isin(matched), column] = bool(value)
+                matched_all |= matched
+            if matched_all:
+                self.write(df)
+            return matched_all
+
+    def snapshot(self) -> pd.DataFrame:
+        """Writable copy of the frame with pending check-in events applied."""
+        # Read the pending events before taking our lock: compaction holds the
+        # check-in log lock while it writes through set_many, so the lock
+        # order is always log -> store, never store -> log
+        pending = self.pending()
+        with self._lock:
+            df = self.frame().copy()
+            if pending:
+                for day in {d for _, d in pending}:
+                    df[_checkin_column(day)] = df[_checkin_column(day)].astype(object)
+                for (key, day), checked in pending.items():
+                    pos = self._by_id.get(key)
+                    if pos is not None:
+                        df.iat[pos, df.columns.get_loc(_checkin_column(day))] = checked
+            return df
+
+    def _row(self, index_name: str, key) -> Optional[pd.Series]:
+        with self._lock:
+            df = self.frame()
+            pos = getattr(self, index_name).get(key)
+            return None if pos is None else df.iloc[pos].copy()
+
+    def by_id(self, delegate_id) -> Optional[pd.Series]:
+        return self._row("_by_id", _norm_id(delegate_id))
+
+    def by_email(self, email) -> Optional[pd.Series]:
+        key = _norm_email(email)
+        return self._row("_by_email", key) if key else None
+
+    def by_name_org(self, name: str, organization: str) -> Optional[pd.Series]:
+        return self._row("_by_key", _dedupe_key(name, organization))
+
+    def known(self, ids: List[str]) -> List[str]:
+        """The subset of ids that belong to a delegate, in input order."""
+        with self._lock:
+            self.frame()
+            return [i for i in ids if _norm_id(i) in self._by_id]
+
+    def has_key(self, name: str, organization: str) -> bool:
+        with self._lock:
+            self.frame()
+            return _dedupe_key(name, organization) in self._by_key
+
+
+BOOL_COLUMNS = ["CheckedIn", "Day1_CheckIn", "Day2_CheckIn", "Day3_CheckIn", "Day4_CheckIn", "Day5_CheckIn"]
+STAFF_DB = DATA_DIR / "delegates.db"
+
+def _make_backend(kind: str):
+    if kind == "sqlite":
+        from staff_sqlite import SqliteBackend
+        return SqliteBackend(STAFF_DB, COLUMNS, BOOL_COLUMNS, _norm_id)
+    return _CsvBackend(STAFF_CSV)
+
+def _new_store(kind: str) -> _DelegateStore:
+    store = _DelegateStore(_make_backend(kind))
+    store.pending = lambda: _CHECKINS.state()
+    return store
+
+def _apply_checkin_state(state: Dict[Tuple[str, int], bool]) -> None:
+    """Compaction target: persist folded check-in events into the delegate table."""
+    groups: Dict[Tuple[str, bool], List[str]] = {}
+    for (key, day), checked in state.items():
+        groups.setdefault((_checkin_column(day), checked), []).append(key)
+    _STORE.set_many(groups)
+
+CHECKIN_LOG = DATA_DIR / "checkin_events.jsonl"
+_CHECKINS = CheckinLog(CHECKIN_LOG, _norm_id)
+_CHECKINS.set_compaction_target(_apply_checkin_state)
+
+# INSAKA_STAFF_BACKEND=sqlite switches to the SQLite engine (run migrate_csv_to_sqlite() first)
+_STORE = _new_store(os.environ.get("INSAKA_STAFF_BACKEND", "csv").strip().lower())
+
+def set_storage_backend(kind: str) -> None:
+    """Switch the process-wide delegate store to "csv" or "sqlite"."""
+    global _STORE
+    _CHECKINS.compact()
+    _STORE = _new_store(kind)
+
+def storage_backend_name() -> str:
+    return _STORE.backend.name
+
+def migrate_csv_to_sqlite(overwrite: bool = False) -> int:
+    """
+    One-shot copy of the delegate CSV into the SQLite database.
+    Refuses to clobber a non-empty database unless overwrite=True.
+    Returns the number of rows migrated.
+    """
+    from staff_sqlite import SqliteBackend
+    target = SqliteBackend(STAFF_DB, COLUMNS, BOOL_COLUMNS, _norm_id)
+    if not overwrite and len(target.read_frame()):
+        raise RuntimeError(f"{STAFF_DB} already has delegates; pass overwrite=True to replace them.")
+    df = _ensure_schema(_CsvBackend(STAFF_CSV).read_frame())
+    target.write_frame(df)
+    return len(df)
+
 def load_staff_df() -> pd.DataFrame:
-    if STAFF_CSV.exists():
-        df = pd.read_csv(STAFF_CSV)
-    else:
-        df = pd.DataFrame(columns=COLUMNS)
-    return _ensure_schema(df)
+    # Callers routinely edit the frame in place before saving, so hand out a copy
+    return _STORE.snapshot()
 
 def save_staff_df(df: pd.DataFrame) -> None:
-    df = _ensure_schema(df)
-    df.to_csv(STAFF_CSV, index=False)
+    _STORE.write(df)
+
+def get_delegate(delegate_id) -> Optional[pd.Series]:
+    """Return the delegate row for an ID, or None. O(1) against the cached index."""
+    return _STORE.by_id(delegate_id)
+
+def find_delegate_by_email(email: str) -> Optional[pd.Series]:
+    """Exact (case-insensitive) email lookup."""
+    return _STORE.by_email(email)
+
+def find_delegate_by_name_org(name: str, organization: str) -> Optional[pd.Series]:
+    """Lookup by normalized name + organization (the registration dedupe key)."""
+    return _STORE.by_name_org(name, organization)
+
+def delegate_count() -> int:
+    return len(_STORE.frame())
+
+def compact_checkin_log() -> int:
+    """Fold pending check-in events into the delegate table now. Returns entries written."""
+    return _CHECKINS.compact()
+
+_STATS = DelegateStats(lambda: _STORE, _CHECKINS, _norm_id)
+
+def delegate_stats(top_k: int = 10) -> StatsSnapshot:
+    """Dashboard statistics as one cached snapshot; cheap to call on every rerun."""
+    return _STATS.snapshot(top_k)
+
+def get_checkin_history(delegate_id=None) -> List[dict]:
+    """Audit trail of check-in events (who was scanned, when, at which station)."""
+    return _CHECKINS.history(delegate_id)
 
 # --- keep your imports and constants as-is ---
 
@@ -85,6 +374,20 @@ def _next_id(df: pd.DataFrame) -> str:
     except Exception:
         return str(len(df) + 1)
 
+DUPLICATE_FIELDS = ["ID", "Name", "Organization", "Email", "Phone"]
+
+def _duplicate_index(df: pd.DataFrame) -> DuplicateIndex:
+    """Fuzzy duplicate index over these delegates (cached until they change)"""
+    return get_index(df[DUPLICATE_FIELDS].to_dict("records"))
+
+def find_similar_delegates(name: str, organization: str = "", email: str = "", phone: str = "",
+                           k: int = 3) -> List[Candidate]:
+    """Existing delegates that look like this person, best match first."""
+    df = load_staff_df()
+    if df.empty:
+        return []
+    return _duplicate_index(df).match(name, organization, email, phone, k=k)
+
 def register_staff(
     name: str,
     category: str,
@@ -94,21 +397,26 @@ def register_staff(
     phone: str = "",
     badge_photo_path: str = "",
     notes: str = "",
-    nationality: str = ""
+    nationality: str = "",
+    allow_similar: bool = False
 ) -> tuple[bool, str]:
     if not name.strip():
         return False, "Name is required."
     if not category.strip():
         return False, "Category is required."
 
+    if _STORE.has_key(name, organization):
+        return False, "This person already exists for that organization."
+
     df = load_staff_df()
 
-    # Build vectorized key column (no apply)
-    if len(df):
-        df_keys = _norm_str(df["Name"]) + "|" + _norm_str(df["Organization"])
-        key = _dedupe_key(name, organization)
-        if (df_keys == key).any():
-            return False, "This person already exists for that organization."
+    # Near-duplicates ("Dr. J. Banda" at "Min. of Mines") need an explicit override
+    if not allow_similar and len(df):
+        similar = [c for c in _duplicate_index(df).match(name, organization, email, phone) if c.likely]
+        if similar:
+            c = similar[0]
+            return False, (f"Possible duplicate of {c.name} ({c.organization or 'no organization'}, "
+                           f"ID {c.delegate_id}), matched on {c.reason}.")
 
     # Next ID
     new_id = _next_id(df)
@@ -132,274 +440,133 @@ def register_staff(
     return True, f"Saved: {new_id}"
 
 
-def set_checked_in(ids: List[str], checked: bool = True) -> Tuple[int, int]:
-    """Mark a list of IDs as checked-in/out. Returns (updated, not_found)."""
-    df = load_staff_df()
-    updated = 0
-    not_found = 0
-    for i in ids:
-        mask = df["ID"].astype(str) == str(i)
-        if not mask.any():
-            not_found += 1
-            continue
-        df.loc[mask, "CheckedIn"] = bool(checked)
-        updated += 1
-    if updated:
-        save_staff_df(df)
-    return updated, not_found
-
-def set_daily_checkin(delegate_id: str, day: int, checked: bool = True) -> Tuple[bool, str]:
-    """Mark a delegate as checked in for a specific day. Day: 1, 2, 3, 4, or 5."""
+def set_checked_in(ids: List[str], checked: bool = True, station: str = "") -> Tuple[int, int]:
+    """
+    Mark a list of IDs as checked-in/out for the event with a single log
+    append; compaction writes the CheckedIn column later.
+    Returns (updated, not_found).
+    """
+    found = _STORE.known(ids)
+    _CHECKINS.append_many(found, EVENT_DAY, checked, station)
+    return len(found), len(ids) - len(found)
+
+def set_daily_checkin(delegate_id: str, day: int, checked: bool = True, station: str = "") -> Tuple[bool, str]:
+    """
+    Mark a delegate as checked in for a specific day. Day: 1, 2, 3, 4, or 5.
+    The scan is appended to the check-in event log; the delegate table is
+    updated later by compaction.
+    """
     if day not in [1, 2, 3, 4, 5]:
         return False, "Invalid day. Must be 1, 2, 3, 4, or 5."
     
-    df = load_staff_df()
-    mask = df["ID"].astype(str) == str(delegate_id)
-    
-    if not mask.any():
+    if get_delegate(delegate_id) is None:
         return False, "Delegate not found."
     
-    day_column = f"Day{day}_CheckIn"
-    df.loc[mask, day_column] = bool(checked)
-    save_staff_df(df)
-    
+    _CHECKINS.append(delegate_id, day, checked, station)
     return True, f"Check-in updated for Day {day}"
 
+def bulk_daily_checkin(ids: List[str], day: int, checked: bool = True, station: str = "") -> Tuple[int, int]:
+    """
+    Check in many delegates for one day with a single log append.
+    Returns (updated, not_found) like set_checked_in.
+    """
+    if day not in [1, 2, 3, 4, 5]:
+        raise ValueError("Invalid day. Must be 1, 2, 3, 4, or 5.")
+    found = _STORE.known(ids)
+    _CHECKINS.append_many(found, day, checked, station)
+    return len(found), len(ids) - len(found)
+
 def get_daily_checkin_status(delegate_id: str) -> dict:
     """Get check-in status for all days for a delegate."""
-    df = load_staff_df()
-    mask = df["ID"].astype(str) == str(delegate_id)
-    
-    if not mask.any():
+    delegate = get_delegate(delegate_id)
+    if delegate is None:
         return {"error": "Delegate not found"}
     
-    delegate = df[mask].iloc[0]
-    return {
-        "Day1": bool(delegate.get("Day1_CheckIn", False)),
-        "Day2": bool(delegate.get("Day2_CheckIn", False)),
-        "Day3": bool(delegate.get("Day3_CheckIn", False)),
-        "Day4": bool(delegate.get("Day4_CheckIn", False)),
-        "Day5": bool(delegate.get("Day5_CheckIn", False))
-    }
+    status = {}
+    for d in range(1, 6):
+        pending = _CHECKINS.get(delegate_id, d)
+        status[f"Day{d}"] = pending if pending is not None else _truthy(delegate.get(f"Day{d}_CheckIn", False))
+    return status
 
-def scan_excel_for_duplicates(file_bytes: bytes, existing_names: set, existing_emails: set) -> tuple[dict, list]:
+METADATA_SHEET_WORDS = ['summary', 'stats', 'overview', 'total']
+
+def read_workbook_sheets(file_bytes: bytes) -> tuple[list, list]:
     """
-    Scan Excel file for duplicates before importing.
-    Returns scan results and sheet information.
+    Parse an uploaded workbook once (openpyxl in read-only mode, which streams rows).
+    Returns ([(sheet, DataFrame or the exception reading it raised)], skipped sheet notes).
     """
-    # Read all sheets from Excel file
-    excel_file = BytesIO(file_bytes)
-    
-    # Get all sheet names
+    parsed = []
+    skipped = []
     try:
-        sheet_names = pd.ExcelFile(excel_file).sheet_names
-    except Exception:
-        sheet_names = [0]
-    
-    all_delegates = []
-    processed_sheets = []
-    skipped_sheets = []
-    
-    # Process each sheet (similar to import but without saving)
-    for sheet in sheet_names:
-        try:
-            # Skip metadata sheets
-            if isinstance(sheet, str) and any(skip_word in sheet.lower() for skip_word in ['summary', 'stats', 'overview', 'total']):
-                skipped_sheets.append(f"{sheet} (metadata/summary)")
-                continue
-                
-            sheet_data = pd.read_excel(excel_file, sheet_name=sheet)
-            
-            if sheet_data.empty:
-                skipped_sheets.append(f"{sheet} (empty)")
-                continue
-                
-            sheet_data.columns = [c.strip() for c in sheet_data.columns]
-            
-            # Apply same column mapping and processing as import
-            column_mapping = {
-                "Full Name": "Name",
-                "Attendee Type": "Category", 
-                "Title": "RoleTitle",
-                "Role": "RoleTitle",
-                "Role Title": "RoleTitle",
-                "Contact Number": "Phone",
-                "Contact": "Phone",
-                "Phone Number": "Phone",
-                "Mobile": "Phone",
-                "Mobile Number": "Phone",
-                "Surname": "Last Name",
-                "First Name": "First Name",
-                "Email Address": "Email",
-                "Email Adress": "Email",
-                "Email": "Email"
-            }
-            sheet_data = sheet_data.rename(columns=column_mapping)
-            
-            # Process names (same logic as import)
-            if "Name" not in sheet_data.columns:
-                name_col = None
-                first_name_col = None
-                last_name_col = None
-                
-                for col in sheet_data.columns:
-                    col_lower = col.lower()
-                    if col_lower in ['name', 'full name', 'fullname', 'full_name', 'delegate name', 'attendee name']:
-                        name_col = col
-                        break
-                    elif col_lower in ['first name', 'firstname', 'first_name', 'given name']:
-                        first_name_col = col
-                    elif col_lower in ['last name', 'lastname', 'last_name', 'surname', 'family name']:
-                        last_name_col = col
-                
-                if name_col:
-                    sheet_data["Name"] = sheet_data[name_col].astype(str).str.strip()
-                elif first_name_col and last_name_col:
-                    first_names = sheet_data[first_name_col].astype(str).str.strip()
-                    last_names = sheet_data[last_name_col].astype(str).str.strip()
-                    first_names = first_names.replace(['nan', 'None', 'null', ''], '')
-                    last_names = last_names.replace(['nan', 'None', 'null', ''], '')
-                    sheet_data["Name"] = (first_names + " " + last_names).str.strip()
-                    sheet_data["Name"] = sheet_data["Name"].str.replace(r'\s+', ' ', regex=True)
-                elif first_name_col:
-                    sheet_data["Name"] = sheet_data[first_name_col].astype(str).str.strip()
-                elif last_name_col:
-                    sheet_data["Name"] = sheet_data[last_name_col].astype(str).str.strip()
-                else:
-                    for col in sheet_data.columns:
-                        if col and not col.lower() in ['id', 'email', 'phone', 'contact', 'category', 'organization', 'notes']:
-                            sample_data = sheet_data[col].astype(str).str.strip()
-                            sample_data = sample_data.replace(['nan', 'None', 'null'], '')
-                            if not sample_data.empty and len(sample_data.iloc[0]) > 2:
-                                sheet_data["Name"] = sample_data
-                                break
-            
-            # Clean up emails
-            if "Email" in sheet_data.columns:
-                sheet_data["Email"] = sheet_data["Email"].astype(str).str.strip().str.lower()
-                sheet_data["Email"] = sheet_data["Email"].replace(['nan', 'None', 'null'], '')
-            
-            # Filter valid rows
-            sheet_data["Name"] = sheet_data["Name"].astype(str)
-            valid_rows = sheet_data[
-                (sheet_data["Name"].str.strip() != "") & 
-                (sheet_data["Name"].str.strip() != "nan") & 
-                (sheet_data["Name"].str.strip() != "None") & 
-                (sheet_data["Name"].str.strip() != "null")
-            ].copy()
-            
-            if valid_rows.empty:
-                skipped_sheets.append(f"{sheet} (no valid names found)")
+        workbook = pd.ExcelFile(BytesIO(file_bytes), engine="openpyxl")
+    except Exception as e:
+        return [(0, e)], skipped
+    with workbook:
+        for sheet in workbook.sheet_names:
+            # Skip sheets that might be metadata or summaries (without parsing them)
+            if isinstance(sheet, str) and any(skip_word in sheet.lower() for skip_word in METADATA_SHEET_WORDS):
+                skipped.append(f"{sheet} (metadata/summary)")
                 continue
-            
-            # Extract organization from sheet name
-            sheet_name = sheet if isinstance(sheet, str) else f"Sheet_{sheet + 1}"
-            clean_org_name = sheet_name.replace("_", " ").replace("-", " ").title()
-            for suffix in ["Sheet", "Tab", "Data", "List"]:
-                if clean_org_name.endswith(suffix):
-                    clean_org_name = clean_org_name[:-len(suffix)].strip()
-            
-            if not clean_org_name or clean_org_name.strip() == "":
-                clean_org_name = f"Organization_{sheet_name}"
-            
-            # Ensure columns exist
-            for c in ["Name","Category","Organization","RoleTitle","Email","Phone","Notes","Nationality"]:
-                if c not in valid_rows.columns:
-                    valid_rows[c] = ""
-            
-            # Set organization
-            if "Organization" not in valid_rows.columns or valid_rows["Organization"].isna().all() or (valid_rows["Organization"].str.strip() == "").all():
-                valid_rows["Organization"] = clean_org_name
-            else:
-                mask = valid_rows["Organization"].isna() | (valid_rows["Organization"].astype(str).str.strip().isin(['nan', 'None', 'null', '']))
-                valid_rows.loc[mask, "Organization"] = clean_org_name
-            
-            # Convert to delegate records
-            for _, row in valid_rows.iterrows():
-                delegate = {
-                    "Name": str(row.get("Name","")).strip(),
-                    "Category": str(row.get("Category","")).strip(),
-                    "Organization": str(row.get("Organization","")).strip(),
-                    "RoleTitle": str(row.get("RoleTitle","")).strip(),
-                    "Email": str(row.get("Email","")).strip(),
-                    "Phone": str(row.get("Phone","")).strip(),
-                    "Notes": str(row.get("Notes","")).strip(),
-                    "Nationality": str(row.get("Nationality","")).strip(),
-                }
-                all_delegates.append(delegate)
-            
-            processed_sheets.append(f"{sheet_name} ({len(valid_rows)} rows)")
-            
-        except Exception as e:
-            skipped_sheets.append(f"{sheet} (error: {str(e)[:50]})")
-            continue
-    
-    # Analyze for duplicates
-    duplicate_names = {}
-    duplicate_emails = {}
-    new_delegates = []
-    
-    for delegate in all_delegates:
-        name = delegate["Name"].lower().strip()
-        email = delegate["Email"].lower().strip()
-        
-        # Check for name duplicates
-        if name in existing_names:
-            if name not in duplicate_names:
-                duplicate_names[name] = 0
-            duplicate_names[name] += 1
-        
-        # Check for email duplicates
-        if email and email in existing_emails:
-            if email not in duplicate_emails:
-                duplicate_emails[email] = 0
-            duplicate_emails[email] += 1
-        
-        # Check if this is a new delegate (not duplicate name or email)
-        if name not in existing_names and (not email or email not in existing_emails):
-            new_delegates.append(delegate)
-    
-    scan_results = {
-        "total_found": len(all_delegates),
-        "new_delegates": new_delegates,
-        "duplicate_names": duplicate_names,
-        "duplicate_emails": duplicate_emails,
-    }
-    
-    sheet_info = {"processed": processed_sheets, "skipped": skipped_sheets}
-    
-    return scan_results, sheet_info
+            try:
+                parsed.append((sheet, workbook.parse(sheet)))
+            except Exception as e:
+                parsed.append((sheet, e))
+    return parsed, skipped
 
-def import_staff_excel(file_bytes: bytes) -> tuple[int, int, list]:
-    # Read all sheets from Excel file
-    excel_file = BytesIO(file_bytes)
-    
-    # Get all sheet names
-    try:
-        sheet_names = pd.ExcelFile(excel_file).sheet_names
-    except Exception:
-        # Fallback to single sheet if there's an issue
-        sheet_names = [0]
+STAGED_COLUMNS = ["Name","Category","Organization","RoleTitle","Email","Phone","Notes","Nationality"]
+MAX_STAGED_WORKBOOKS = 4
+
+@dataclass(frozen=True)
+class StagedWorkbook:
+    """An uploaded workbook parsed and normalized once; treat `frame` as read-only."""
+    digest: str
+    frame: pd.DataFrame          # STAGED_COLUMNS (stripped strings) + __source_sheet__
+    processed: tuple
+    skipped: tuple
+
+    @property
+    def sheet_info(self) -> dict:
+        return {"processed": list(self.processed), "skipped": list(self.skipped)}
+
+_STAGED: "OrderedDict[str, StagedWorkbook]" = OrderedDict()
+_STAGED_LOCK = threading.Lock()
+
+def stage_workbook(file_bytes: bytes) -> StagedWorkbook:
+    """
+    Parse, map columns, join names and clean emails/phones for every sheet
+    of an upload, once per distinct file content. The duplicate preview and
+    the import both read this staged frame.
+    """
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    with _STAGED_LOCK:
+        staged = _STAGED.get(digest)
+        if staged is not None:
+            _STAGED.move_to_end(digest)
+            return staged
+    staged = _stage_workbook(file_bytes, digest)
+    with _STAGED_LOCK:
+        _STAGED[digest] = staged
+        while len(_STAGED) > MAX_STAGED_WORKBOOKS:
+            _STAGED.popitem(last=False)
+    return staged
+
+def _stage_workbook(file_bytes: bytes, digest: str) -> StagedWorkbook:
+    parsed_sheets, skipped_sheets = read_workbook_sheets(file_bytes)
     
     all_incoming = []
     processed_sheets = []
-    skipped_sheets = []
     
     # Process each sheet
-    for sheet in sheet_names:
+    for sheet, sheet_data in parsed_sheets:
         try:
-            # Skip sheets that might be metadata or summaries
-            if isinstance(sheet, str) and any(skip_word in sheet.lower() for skip_word in ['summary', 'stats', 'overview', 'total']):
-                skipped_sheets.append(f"{sheet} (metadata/summary)")
-                continue
-                
-            sheet_data = pd.read_excel(excel_file, sheet_name=sheet)
+            if isinstance(sheet_data, Exception):
+                raise sheet_data
             
             # Skip empty sheets
             if sheet_data.empty:
                 skipped_sheets.append(f"{sheet} (empty)")
                 continue
-                
+            
             sheet_data.columns = [c.strip() for c in sheet_data.columns]
             
             # Debug: Log what columns we found
@@ -618,135 +785,234 @@ def import_staff_excel(file_bytes: bytes) -> tuple[int, int, list]:
             continue
     
     # Combine all sheets
-    if not all_incoming:
-        return 0, 0, {"processed": processed_sheets, "skipped": skipped_sheets}
+    if all_incoming:
+        frame = pd.concat(all_incoming, ignore_index=True)
+        for c in STAGED_COLUMNS:
+            frame[c] = frame[c].map(lambda v: str(v).strip())
+        frame = frame[STAGED_COLUMNS + ["__source_sheet__"]]
+    else:
+        frame = pd.DataFrame(columns=STAGED_COLUMNS + ["__source_sheet__"])
+    return StagedWorkbook(digest, frame, tuple(processed_sheets), tuple(skipped_sheets))
+
+def _similar_rows(rows: pd.DataFrame, existing: pd.DataFrame) -> List[List[Candidate]]:
+    """Fuzzy matches against existing delegates for each staged row"""
+    if rows.empty or existing.empty:
+        return [[] for _ in range(len(rows))]
+    return _duplicate_index(existing).score(rows[["Name", "Organization", "Email", "Phone"]].to_dict("records"))
+
+def scan_excel_for_duplicates(file_bytes: bytes, existing_names: set, existing_emails: set) -> tuple[dict, list]:
+    """
+    Scan Excel file for duplicates before importing.
+    Returns scan results and sheet information; rows that only fuzzily
+    match an existing delegate are listed under "possible_duplicates".
+    """
+    # Same staged rows the import will commit (parsed once, cached by content)
+    staged = stage_workbook(file_bytes)
+    frame = staged.frame
     
-    incoming = pd.concat(all_incoming, ignore_index=True)
+    names = frame["Name"].str.lower().str.strip()
+    emails = frame["Email"].str.lower().str.strip()
+    name_dup = names.isin(existing_names)
+    email_dup = (emails != "") & emails.isin(existing_emails)
+    
+    # Fuzzy pass over the rows the exact checks let through
+    fresh = frame.loc[~name_dup & ~email_dup]
+    matches = _similar_rows(fresh, load_staff_df())
+    likely = pd.Series([any(c.likely for c in m) for m in matches], index=fresh.index, dtype=bool)
+    possible = [
+        {"Name": row["Name"], "Organization": row["Organization"], "Email": row["Email"],
+         "Similar To": m[0].name, "Similar Organization": m[0].organization, "Similar ID": m[0].delegate_id,
+         "Score": m[0].score, "Matched On": m[0].reason, "Will Import": not any(c.likely for c in m)}
+        for row, m in zip(fresh.to_dict("records"), matches) if m
+    ]
+    
+    scan_results = {
+        "total_found": len(frame),
+        # New delegate: neither the name nor the email is already registered, and no likely fuzzy match
+        "new_delegates": fresh.loc[~likely, STAGED_COLUMNS].to_dict("records"),
+        "possible_duplicates": possible,
+        "duplicate_names": names[name_dup].value_counts(sort=False).to_dict(),
+        "duplicate_emails": emails[email_dup].value_counts(sort=False).to_dict(),
+    }
+    
+    return scan_results, staged.sheet_info
+
+def import_staff_excel(file_bytes: bytes) -> tuple[int, int, int, dict]:
+    """
+    Import an uploaded workbook. Returns (added, skipped exact duplicates,
+    skipped likely fuzzy duplicates, sheet info).
+    """
+    # Staged once per upload: a preview scan of the same bytes already did the parsing
+    staged = stage_workbook(file_bytes)
+    if staged.frame.empty:
+        return 0, 0, 0, staged.sheet_info
     
     # Build keys vectorized
-    incoming["__key__"] = _norm_str(incoming["Name"]) + "|" + _norm_str(incoming["Organization"])
+    incoming = staged.frame.assign(__key__=_norm_str(staged.frame["Name"]) + "|" + _norm_str(staged.frame["Organization"]))
 
     # Internal dedupe within the file
     incoming = incoming.drop_duplicates(subset="__key__", keep="first")
 
     existing = load_staff_df()
     if len(existing):
-        existing_keys = (_norm_str(existing["Name"]) + "|" + _norm_str(existing["Organization"])).tolist()
+        existing_keys = set(_norm_str(existing["Name"]) + "|" + _norm_str(existing["Organization"]))
     else:
-        existing_keys = []
+        existing_keys = set()
 
-    to_add = incoming[~incoming["__key__"].isin(existing_keys)].copy()
+    to_add = incoming[~incoming["__key__"].isin(existing_keys)]
     skipped = int(len(incoming) - len(to_add))
+    # Likely fuzzy duplicates of existing delegates, reported separately from exact ones
+    likely = pd.Series([any(c.likely for c in m) for m in _similar_rows(to_add, existing)],
+                       index=to_add.index, dtype=bool)
+    to_add = to_add[~likely]
+    similar = int(likely.sum())
 
     if to_add.empty:
-        return 0, skipped, {"processed": processed_sheets, "skipped": skipped_sheets}
-
-    # Assign IDs & defaults
-    out_rows = []
-    df_cur = existing.copy()
-    for _, r in to_add.iterrows():
-        nid = _next_id(df_cur)
-        out_rows.append({
-            "ID": nid,
-            "Name": str(r.get("Name","")).strip(),
-            "Category": str(r.get("Category","")).strip(),
-            "Organization": str(r.get("Organization","")).strip(),
-            "RoleTitle": str(r.get("RoleTitle","")).strip(),
-            "Email": str(r.get("Email","")).strip(),
-            "Phone": str(r.get("Phone","")).strip(),
-            "BadgePhoto": "",
-            "Notes": str(r.get("Notes","")).strip(),
-            "Nationality": str(r.get("Nationality","")).strip(),
-            "CheckedIn": False,
-            "CreatedAt": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        })
-        df_cur = pd.concat([df_cur, pd.DataFrame([out_rows[-1]])], ignore_index=True)
-
-    final = pd.concat([existing, pd.DataFrame(out_rows)], ignore_index=True)
+        return 0, skipped, similar, staged.sheet_info
+
+    # Assign IDs & defaults: one contiguous ID range, one frame, one write
+    first_id = int(_next_id(existing))
+    new_rows = pd.DataFrame({
+        "ID": [str(i) for i in range(first_id, first_id + len(to_add))],
+        **{c: to_add[c].to_numpy() for c in ["Name", "Category", "Organization", "RoleTitle", "Email", "Phone"]},
+        "BadgePhoto": "",
+        "Notes": to_add["Notes"].to_numpy(),
+        "Nationality": to_add["Nationality"].to_numpy(),
+        "CheckedIn": False,
+        "CreatedAt": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+    final = pd.concat([existing, new_rows], ignore_index=True)
     save_staff_df(final)
-    return len(out_rows), skipped, {"processed": processed_sheets, "skipped": skipped_sheets}
+    return len(new_rows), skipped, similar, staged.sheet_info
 
 
-def export_staff_excel() -> Tuple[bytes, str]:
-    df = load_staff_df()
-    out = BytesIO()
-    
-    # Load speakers data
+SPEAKERS_JSON = DATA_DIR / "speakers.json"
+
+def load_speakers() -> List[dict]:
+    """Speakers from speakers.json ([] when missing or unreadable)."""
     try:
-        import json
-        from pathlib import Path
-        speakers_file = Path("data/speakers.json")
-        if speakers_file.exists():
-            with open(speakers_file, "r", encoding="utf-8") as f:
-                speakers_data = json.load(f)
-            
-            # Convert speakers to DataFrame
-            speakers_df = pd.DataFrame(speakers_data)
-            # Rename columns to match delegate format
-            if not speakers_df.empty:
-                speakers_df = speakers_df.rename(columns={
-                    'name': 'Name',
-                    'position': 'RoleTitle', 
-                    'organization': 'Organization',
-                    'email': 'Email',
-                    'phone': 'Phone',
-                    'nationality': 'Nationality',
-                    'photo': 'BadgePhoto'
-                })
-                # Add missing columns
-                for col in df.columns:
-                    if col not in speakers_df.columns:
-                        if col == 'Category':
-                            speakers_df[col] = 'Speaker'
-                        elif col == 'ID':
-                            speakers_df[col] = speakers_df.index + 10000  # Start speaker IDs from 10000
-                        else:
-                            speakers_df[col] = ''
-                
-                # Reorder columns to match delegates
-                speakers_df = speakers_df[df.columns]
-        else:
-            speakers_df = pd.DataFrame()
+        with open(SPEAKERS_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
     except Exception:
-        speakers_df = pd.DataFrame()
+        return []
+
+def _speakers_frame(columns) -> pd.DataFrame:
+    """Speakers laid out like the delegate table (for the export)."""
+    speakers_df = pd.DataFrame(load_speakers())
+    if speakers_df.empty:
+        return speakers_df
+    # Rename columns to match delegate format
+    speakers_df = speakers_df.rename(columns={
+        'name': 'Name',
+        'position': 'RoleTitle', 
+        'organization': 'Organization',
+        'email': 'Email',
+        'phone': 'Phone',
+        'nationality': 'Nationality',
+        'photo': 'BadgePhoto'
+    })
+    # Add missing columns
+    for col in columns:
+        if col not in speakers_df.columns:
+            if col == 'Category':
+                speakers_df[col] = 'Speaker'
+            elif col == 'ID':
+                speakers_df[col] = speakers_df.index + 10000  # Start speaker IDs from 10000
+            else:
+                speakers_df[col] = ''
+    # Reorder columns to match delegates
+    return speakers_df[list(columns)]
+
+def _conference_sheets(df: pd.DataFrame):
+    """(sheet name, frame) for the complete conference workbook, built lazily"""
+    speakers_df = _speakers_frame(df.columns)
+    
+    # All delegates sheet
+    yield "All Delegates", df
     
-    with pd.ExcelWriter(out, engine="openpyxl") as w:
-        # All delegates sheet
-        df.to_excel(w, sheet_name="All Delegates", index=False)
-        
-        # Delegates by category (separate sheets)
-        categories = df['Category'].dropna().unique()
-        for category in sorted(categories):
-            category_df = df[df['Category'] == category].copy()
-            safe_sheet_name = str(category)[:31]  # Excel sheet name limit
-            category_df.to_excel(w, sheet_name=f"Delegates - {safe_sheet_name}", index=False)
-        
-        # Speakers sheet (if available)
-        if not speakers_df.empty:
-            speakers_df.to_excel(w, sheet_name="Speakers", index=False)
-        
-        # Statistics sheets
-        by_cat = df.groupby("Category", dropna=False).agg(Count=("ID","count")).reset_index()
-        by_org = df.groupby("Organization", dropna=False).agg(Count=("ID","count")).reset_index()
-        by_nationality = df.groupby("Nationality", dropna=False).agg(Count=("ID","count")).reset_index()
-        
-        by_cat.to_excel(w, sheet_name="Stats - By Category", index=False)
-        by_org.to_excel(w, sheet_name="Stats - By Organization", index=False)
-        by_nationality.to_excel(w, sheet_name="Stats - By Nationality", index=False)
-        
-        # Summary sheet
-        summary_data = {
-            'Metric': ['Total Delegates', 'Total Speakers', 'Total Categories', 'Total Organizations'],
-            'Count': [
-                len(df),
-                len(speakers_df) if not speakers_df.empty else 0,
-                len(categories),
-                len(df['Organization'].dropna().unique())
-            ]
-        }
-        summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(w, sheet_name="Summary", index=False)
+    # Delegates by category (separate sheets)
+    categories = sorted(df['Category'].dropna().unique())
+    for category in categories:
+        yield f"Delegates - {str(category)[:31]}", df[df['Category'] == category]
     
-    out.seek(0)
-    fname = f"conference_export_{dt.datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-    return out.read(), fname
+    # Speakers sheet (if available)
+    if not speakers_df.empty:
+        yield "Speakers", speakers_df
+    
+    # Statistics sheets
+    yield "Stats - By Category", df.groupby("Category", dropna=False).agg(Count=("ID","count")).reset_index()
+    yield "Stats - By Organization", df.groupby("Organization", dropna=False).agg(Count=("ID","count")).reset_index()
+    yield "Stats - By Nationality", df.groupby("Nationality", dropna=False).agg(Count=("ID","count")).reset_index()
+    
+    # Summary sheet
+    yield "Summary", pd.DataFrame({
+        'Metric': ['Total Delegates', 'Total Speakers', 'Total Categories', 'Total Organizations'],
+        'Count': [
+            len(df),
+            len(speakers_df),
+            len(categories),
+            len(df['Organization'].dropna().unique())
+        ]
+    })
+
+def export_staff_excel_file() -> Tuple[Path, str]:
+    """
+    The complete conference workbook on disk (streamed with openpyxl
+    write-only mode) and a download name. Rebuilt only when the delegates
+    or speakers.json change.
+    """
+    df = load_staff_df()
+    version = data_version(frame_version(df), file_version(SPEAKERS_JSON))
+    path = xlsx_artifact("workbook", version, lambda: _conference_sheets(df))
+    # Named after when this data was exported, so the cached package can embed it unchanged
+    built = dt.datetime.fromtimestamp(path.stat().st_mtime)
+    fname = f"conference_export_{built.strftime('%Y%m%d_%H%M')}.xlsx"
+    return path, fname
+
+def export_staff_excel() -> Tuple[bytes, str]:
+    path, fname = export_staff_excel_file()
+    return path.read_bytes(), fname
+
+def _joined(values: pd.Series) -> str:
+    return ', '.join(values.dropna().astype(str).unique())
+
+def _filtered_sheets(filtered_df: pd.DataFrame):
+    # Main data sheet
+    yield "Delegates", filtered_df
+    
+    # By Organization
+    yield "By Organization", filtered_df.groupby('Organization').agg(
+        Count=('Name', 'count'),
+        Categories=('Category', _joined),
+        **{'With Email': ('Email', lambda x: x.notna().sum()), 'With Phone': ('Phone', lambda x: x.notna().sum())},
+    ).reset_index()
+    
+    # By Category
+    yield "By Category", filtered_df.groupby('Category').agg(
+        Count=('Name', 'count'),
+        Organizations=('Organization', _joined),
+        **{'With Email': ('Email', lambda x: x.notna().sum()), 'With Phone': ('Phone', lambda x: x.notna().sum())},
+    ).reset_index()
+    
+    # Overall summary
+    yield "Summary", pd.DataFrame({
+        'Metric': ['Total Delegates', 'Organizations', 'Categories', 'With Email', 'With Phone', 'Checked In'],
+        'Count': [
+            len(filtered_df),
+            filtered_df['Organization'].nunique(),
+            filtered_df['Category'].nunique(),
+            filtered_df['Email'].notna().sum(),
+            filtered_df['Phone'].notna().sum(),
+            filtered_df['CheckedIn'].map(_truthy).sum() if 'CheckedIn' in filtered_df.columns else 0
+        ]
+    })
+
+def export_filtered_excel(filtered_df: pd.DataFrame) -> Path:
+    """Workbook for a filtered delegate selection with per-organization/category stats (cached)."""
+    return xlsx_artifact("filtered", data_version(frame_version(filtered_df)), lambda: _filtered_sheets(filtered_df))
+
+def export_delegate_package(export_df: pd.DataFrame) -> Tuple[Path, dict]:
+    """ZIP of the complete workbook, CSVs and photos for these delegates (cached); returns path and counts."""
+    workbook, workbook_name = export_staff_excel_file()
+    return delegate_package(export_df, load_speakers(), workbook, workbook_name)
@@ -0,0 +1,146 @@
+# staff_sqlite.py
+"""
+SQLite storage engine for staff_service.
+
+Delegates live in one table (WAL mode) so door stations can flip check-in
+flags with single-row UPDATEs instead of rewriting the whole CSV. A counter
+in the meta table is bumped on every write; staff_service uses it as the
+cache signature the same way it uses mtime/size for the CSV backend.
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, List, Sequence, Set, Tuple
+import pandas as pd
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_CHUNK = 500
+
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+
+class SqliteBackend:
+    """Delegate table stored in an embedded SQLite database."""
+
+    name = "sqlite"
+    supports_row_updates = True
+
+    def __init__(self, path: Path, columns: Sequence[str], bool_columns: Sequence[str],
+                 id_key: Callable[[object], str]):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.bool_columns = [c for c in bool_columns if c in self.columns]
+        self.id_key = id_key
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    # --- connection handling -------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(str(self.path), timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+            with self._init_lock:
+                if not self._initialized:
+                    self._create_schema(conn)
+                    self._initialized = True
+        return conn
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        cols = ", ".join(
+            f"{_quote(c)} INTEGER" if c in self.bool_columns else f"{_quote(c)} TEXT"
+            for c in self.columns
+        )
+        conn.execute(f"CREATE TABLE IF NOT EXISTS delegates (id_key TEXT NOT NULL, {cols})")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_delegates_id_key ON delegates(id_key)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+
+    def _bump(self, conn: sqlite3.Connection) -> int:
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+        return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    # --- backend interface ---------------------------------------------------
+
+    def signature(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return ("sqlite", row[0] if row else 0)
+
+    def read_frame(self) -> pd.DataFrame:
+        conn = self._conn()
+        select = ", ".join(_quote(c) for c in self.columns)
+        df = pd.read_sql_query(f"SELECT {select} FROM delegates ORDER BY rowid", conn)
+        for c in self.bool_columns:
+            # 1/0 -> True/False, NULL stays NaN like an empty CSV cell
+            df[c] = df[c].map({1: True, 0: False}).astype(object)
+        return df
+
+    def _row_values(self, df: pd.DataFrame) -> List[tuple]:
+        frame = df[self.columns].astype(object).where(df[self.columns].notna(), None)
+        for c in self.bool_columns:
+            frame[c] = [None if v is None or v == "" else int(bool(v)) for v in frame[c]]
+        keys = [self.id_key(v) for v in frame["ID"]]
+        return [(k, *row) for k, row in zip(keys, frame.itertuples(index=False, name=None))]
+
+    def write_frame(self, df: pd.DataFrame):
+        rows = self._row_values(df)
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        insert_cols = ", ".join(["id_key"] + [_quote(c) for c in self.columns])
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM delegates")
+            conn.executemany(f"INSERT INTO delegates ({insert_cols}) VALUES ({placeholders})", rows)
+            version = self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return ("sqlite", version)
+
+    def set_flags(self, ids: Iterable, column: str, value: bool) -> Tuple[tuple, tuple, Set[str]]:
+        """
+        Set a boolean column for every delegate whose ID is in ids, in a single
+        transaction. Returns (signature_before, signature_after, matched_id_keys).
+        """
+        if column not in self.bool_columns:
+            raise ValueError(f"{column} is not a check-in column")
+        keys = sorted({self.id_key(i) for i in ids})
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            matched: Set[str] = set()
+            for start in range(0, len(keys), _CHUNK):
+                chunk = keys[start:start + _CHUNK]
+                marks = ", ".join("?" for _ in chunk)
+                matched.update(r[0] for r in conn.execute(
+                    f"SELECT DISTINCT id_key FROM delegates WHERE id_key IN ({marks})", chunk))
+                conn.execute(
+                    f"UPDATE delegates SET {_quote(column)} = ? WHERE id_key IN ({marks})",
+                    [int(bool(value)), *chunk],
+                )
+            after = self._bump(conn) if matched else before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return ("sqlite", before), ("sqlite", after), matched
+
+
+if __name__ == "__main__":
+    # One-shot migration: python staff_sqlite.py [--overwrite]
+    import sys
+    import staff_service
+    count = staff_service.migrate_csv_to_sqlite(overwrite="--overwrite" in sys.argv)
+    print(f"Migrated {count} delegates from {staff_service.STAFF_CSV} to {staff_service.STAFF_DB}")
@@ -8,8 +8,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import required functions
-from lib.qr_system import authenticate_with_qr_code, _normalize_qr_payload
-from staff_service import load_staff_df
+from lib.qr_system import BADGE_TYPE, authenticate_with_qr_code, normalize_qr_payload
+from staff_service import delegate_count, get_delegate
 
 # Add PWA meta tags and service worker registration
 st.markdown("""
@@ -229,8 +229,7 @@ if raw_param:
         
         # Load staff data
         try:
-            staff_df = load_staff_df()
-            if staff_df.empty:
+            if delegate_count() == 0:
                 st.error("No delegate data found. Please contact administrator.")
                 st.stop()
         except Exception as e:
@@ -238,18 +237,19 @@ if raw_param:
             st.stop()
         
         # Normalize / parse (your helper)
-        norm_text, payload = _normalize_qr_payload(qr_data_from_url)
+        norm_text, payload = normalize_qr_payload(qr_data_from_url)
 
         with st.spinner("Authenticating..."):
-            success, message, delegate = authenticate_with_qr_code(norm_text, staff_df)
+            success, message, delegate = authenticate_with_qr_code(norm_text)
 
-            # Fallback: direct lookup by ID
-            if not success and isinstance(payload, dict) and payload.get("delegate_id"):
+            # Fallback: direct lookup by ID (never for printed badges, they only open the door)
+            if (not success and isinstance(payload, dict) and payload.get("delegate_id")
+                    and payload.get("type") != BADGE_TYPE):
                 norm_id = str(payload["delegate_id"])
                 try:
-                    match_df = staff_df[staff_df["ID"].astype(str) == norm_id]
-                    if not match_df.empty:
-                        row = match_df.iloc[0].to_dict()
+                    match = get_delegate(norm_id)
+                    if match is not None:
+                        row = match.to_dict()
                         delegate = {
                             'ID': row.get('ID'),
                             'Full Name': row.get('Full Name') or row.get('Name') or '',
@@ -0,0 +1,35 @@
+"""Session time ranges on 12- and 24-hour clocks"""
+
+import pytest
+
+from lib.agenda import parse_time_range
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("8:00 - 5:00 PM", (8 * 60, 17 * 60)),
+    ("11:00 - 1:00 PM", (11 * 60, 13 * 60)),
+    ("11:00 - 12:00 PM", (11 * 60, 12 * 60)),
+    ("10:30 - 2:00 PM", (10 * 60 + 30, 14 * 60)),
+])
+def test_range_across_noon_starts_in_the_morning(text, expected):
+    assert parse_time_range(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("9:00 to 10:30 AM", (9 * 60, 10 * 60 + 30)),
+    ("1:00 - 2:00 PM", (13 * 60, 14 * 60)),
+    ("12:30 - 1:30 PM", (12 * 60 + 30, 13 * 60 + 30)),
+    ("13:00 - 2:00 PM", (13 * 60, 14 * 60)),
+])
+def test_start_shares_the_end_meridiem_within_the_same_half_day(text, expected):
+    assert parse_time_range(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("07:00 - 13:00", (7 * 60, 13 * 60)),
+    ("11:30 - 1:00", (11 * 60 + 30, 13 * 60)),
+    ("9:30 AM", (9 * 60 + 30, 10 * 60 + 30)),
+    ("TBA", (9 * 60, 10 * 60)),
+])
+def test_other_formats(text, expected):
+    assert parse_time_range(text) == expected
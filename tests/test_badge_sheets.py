@@ -0,0 +1,25 @@
+"""Badge sheet jobs: each badge keeps its own delegate's category band"""
+
+import pandas as pd
+
+from lib import badge_sheets
+
+
+def test_categories_stay_aligned_when_rows_lack_an_id(monkeypatch, tmp_path):
+    captured = {}
+
+    def fake_start_job(job_id, path, total, target, rows, labels, *args):
+        captured.update(rows=rows, labels=labels)
+
+    monkeypatch.setattr(badge_sheets, "start_job", fake_start_job)
+    staff = pd.DataFrame({
+        "ID": [None, 2.0, 3.0],
+        "Name": ["No Id", "Media Person", "Vip Person"],
+        "Category": ["Delegate", "Media", "VIP"],
+        "Organization": ["Org A", "Org B", "Org C"],
+        "RoleTitle": ["", "", ""],
+    })
+    badge_sheets.start_sheet_export(staff, export_dir=str(tmp_path))
+
+    pairs = sorted((row[0], label) for row, label in zip(captured["rows"], captured["labels"]))
+    assert pairs == [("2.0", "Media"), ("3.0", "VIP")]
@@ -0,0 +1,115 @@
+"""Compaction and delegate reads running on different threads must not deadlock"""
+
+import threading
+import time
+
+import pandas as pd
+
+import staff_service
+from checkin_log import CheckinLog
+from lib.delegate_stats import DelegateStats
+
+
+def _store_and_log(tmp_path, apply_delay):
+    csv = tmp_path / "delegates.csv"
+    rows = [{**{c: "" for c in staff_service.COLUMNS}, "ID": str(i), "Name": f"Delegate {i}",
+             "Category": "Delegate", "Organization": "Org", "CheckedIn": False} for i in range(1, 4)]
+    pd.DataFrame(rows, columns=staff_service.COLUMNS).to_csv(csv, index=False)
+
+    store = staff_service._DelegateStore(staff_service._CsvBackend(csv))
+    log = CheckinLog(tmp_path / "checkin_events.jsonl", staff_service._norm_id, compact_every=0)
+    store.pending = log.state
+
+    def apply(state):
+        time.sleep(apply_delay)       # widen the window in which a reader can take the store lock
+        groups = {}
+        for (key, day), checked in state.items():
+            groups.setdefault((f"Day{day}_CheckIn", checked), []).append(key)
+        store.set_many(groups)
+
+    log.set_compaction_target(apply)
+    return store, log
+
+
+def test_compaction_and_snapshot_do_not_deadlock(tmp_path):
+    store, log = _store_and_log(tmp_path, apply_delay=0.5)
+    log.append_many(["1", "2"], 1, True, "door")
+
+    compacted = []
+    compactor = threading.Thread(target=lambda: compacted.append(log.compact()), daemon=True)
+    reader = threading.Thread(target=store.snapshot, daemon=True)
+    compactor.start()
+    time.sleep(0.1)                   # compaction now holds the log lock inside apply()
+    reader.start()
+    compactor.join(5)
+    reader.join(5)
+
+    assert not compactor.is_alive() and not reader.is_alive(), "compaction and snapshot deadlocked"
+    assert compacted == [2]
+    df = store.snapshot()
+    assert df.loc[df["ID"].map(staff_service._norm_id).isin(["1", "2"]), "Day1_CheckIn"].map(staff_service._truthy).all()
+
+
+def test_snapshot_sees_pending_and_compacted_checkins(tmp_path):
+    store, log = _store_and_log(tmp_path, apply_delay=0)
+    log.append("3", 2, True, "door")
+    pending = store.snapshot()
+    log.compact()
+    compacted = store.snapshot()
+    for df in (pending, compacted):
+        assert staff_service._truthy(df.loc[df["ID"].map(staff_service._norm_id) == "3", "Day2_CheckIn"].iloc[0])
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_threshold_wakes_the_compactor_instead_of_compacting_inline(tmp_path):
+    log = CheckinLog(tmp_path / "checkin_events.jsonl", staff_service._norm_id, compact_every=60, compact_after=2)
+    threads = []
+    log.set_compaction_target(lambda state: threads.append(threading.current_thread().name))
+
+    log.append("1", 1, True, "door")
+    log.append("2", 1, True, "door")
+
+    assert _wait_for(lambda: threads), "the compactor was not woken"
+    assert threads == ["checkin-compactor"]
+    assert _wait_for(lambda: not log.state())
+
+
+def test_compaction_failure_is_recorded(tmp_path):
+    log = CheckinLog(tmp_path / "checkin_events.jsonl", staff_service._norm_id, compact_every=60, compact_after=1)
+
+    def fail(state):
+        raise OSError("delegate table is locked")
+
+    log.set_compaction_target(fail)
+    log.append("1", 1, True, "door")
+
+    assert _wait_for(lambda: log.last_error is not None)
+    assert "locked" in log.last_error
+    assert log.get("1", 1) is True    # the event stays pending for the next run
+
+
+def test_event_checkins_go_through_the_log(tmp_path, monkeypatch):
+    store, log = _store_and_log(tmp_path, apply_delay=0)
+    log.set_compaction_target(staff_service._apply_checkin_state)
+    monkeypatch.setattr(staff_service, "_STORE", store)
+    monkeypatch.setattr(staff_service, "_CHECKINS", log)
+    table_writes = []
+    write_frame = store.backend.write_frame
+    monkeypatch.setattr(store.backend, "write_frame", lambda df: (table_writes.append(1), write_frame(df)))
+
+    assert staff_service.set_checked_in(["1", "2.0", "9"], True, station="door") == (2, 1)
+    assert table_writes == []
+    assert log.get("2", 0) is True
+    assert DelegateStats(lambda: store, log, staff_service._norm_id).snapshot().checked_in == 2
+
+    log.compact()
+    assert table_writes == [1]
+    df = store.frame()
+    checked = df.set_index(df["ID"].map(staff_service._norm_id))["CheckedIn"].map(staff_service._truthy)
+    assert checked.to_dict() == {"1": True, "2": True, "3": False}
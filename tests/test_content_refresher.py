@@ -0,0 +1,31 @@
+"""The external content refresher is opt-in and fetches each distinct source once"""
+
+import json
+
+from lib import content_refresher
+
+
+def test_refresher_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(content_refresher, "FETCH_ENABLED", False)
+    monkeypatch.setattr(content_refresher, "_REFRESHER", None)
+    assert content_refresher.get_refresher() is None
+    assert content_refresher.get_content_snapshot("updates") is None
+    assert content_refresher._REFRESHER is None
+
+
+def test_default_sources_are_distinct(tmp_path):
+    sources = content_refresher.load_sources(str(tmp_path / "missing.json"))
+    keys = [(s.url, s.kind, s.selector) for s in sources]
+    assert len(keys) == len(set(keys))
+
+
+def test_duplicate_configured_sources_are_dropped(tmp_path):
+    url = "https://example.org/"
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps([
+        {"name": "updates", "url": url, "kind": "page"},
+        {"name": "schedule", "url": url, "kind": "page", "interval": 3600},
+        {"name": "logos", "url": url, "kind": "selector", "selector": "img", "text_only": False},
+        {"name": "updates", "url": url + "news", "kind": "page"},
+    ]))
+    assert [s.name for s in content_refresher.load_sources(str(path))] == ["updates", "logos"]
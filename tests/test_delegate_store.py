@@ -0,0 +1,24 @@
+"""Row updates on the SQLite store never change a frame a reader already holds"""
+
+import pandas as pd
+
+import staff_service
+from staff_sqlite import SqliteBackend
+
+
+def test_set_many_swaps_the_cached_frame(tmp_path):
+    backend = SqliteBackend(tmp_path / "delegates.db", staff_service.COLUMNS, staff_service.BOOL_COLUMNS,
+                            staff_service._norm_id)
+    rows = [{**{c: "" for c in staff_service.COLUMNS}, "ID": str(i), "Name": f"Delegate {i}",
+             "Category": "Delegate", "Organization": "Org"} for i in range(1, 4)]
+    backend.write_frame(staff_service._ensure_schema(pd.DataFrame(rows, columns=staff_service.COLUMNS)))
+    store = staff_service._DelegateStore(backend)
+
+    held = store.frame()
+    before = held["CheckedIn"].tolist()
+    assert store.set_flags(["2"], "CheckedIn", True) == {"2"}
+
+    assert held["CheckedIn"].tolist() == before
+    current = store.frame()
+    assert current is not held
+    assert staff_service._truthy(current.loc[current["ID"].map(staff_service._norm_id) == "2", "CheckedIn"].iloc[0])
@@ -0,0 +1,24 @@
+"""Fuzzy duplicate rules: contact details alone do not make two people the same"""
+
+from lib.duplicate_index import DuplicateIndex
+
+EXISTING = [{"ID": "1", "Name": "John Banda", "Organization": "Ministry of Mines",
+             "Email": "info@mines.gov.zm", "Phone": "0211123456"}]
+
+
+def test_shared_inbox_is_not_a_likely_duplicate():
+    index = DuplicateIndex(EXISTING)
+    for candidate in index.match("Mary Phiri", "Ministry of Mines", email="info@mines.gov.zm"):
+        assert not candidate.likely
+    for candidate in index.match("Mary Phiri", "Ministry of Finance", phone="+260 211 123456"):
+        assert not candidate.likely
+
+
+def test_shared_contact_with_similar_name_is_likely():
+    [best, *_] = DuplicateIndex(EXISTING).match("Dr. John Banda", "Bank of Zambia", email="INFO@mines.gov.zm")
+    assert best.reason == "email" and best.likely
+
+
+def test_reordered_name_at_abbreviated_organization_is_likely():
+    [best, *_] = DuplicateIndex(EXISTING).match("Banda, John", "Min. of Mines")
+    assert best.delegate_id == "1" and best.likely
@@ -0,0 +1,32 @@
+"""Broadcast notifications: interactions stay personal, read cursors clear the badge"""
+
+import pytest
+
+from lib import notifications
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = notifications._NotificationStore(str(tmp_path / "notifications"), str(tmp_path / "legacy.json"))
+    monkeypatch.setattr(notifications, "_STORE", store)
+    return store
+
+
+def test_interactions_never_broadcast(store):
+    assert not notifications.create_interaction_notification("u1", notifications.ALL_USERS, "like")
+    assert notifications.get_notification_count("u2") == 0
+
+    assert notifications.create_interaction_notification("u1", "u2", "like")
+    assert notifications.get_notification_count("u2") == 1
+    assert notifications.get_notification_count("u3") == 0
+
+
+def test_mark_all_read_clears_broadcasts(store):
+    notifications.add_broadcast("announcement", "Welcome", "Doors open at 8")
+    notifications.add_notification("u1", "system", "Badge ready", "Collect it at the desk")
+    assert notifications.get_notification_count("u1") == 2
+    assert notifications.get_notification_count("u2") == 1
+
+    assert notifications.mark_all_notifications_read("u1")
+    assert notifications.get_notification_count("u1") == 0
+    assert notifications.get_notification_count("u2") == 1
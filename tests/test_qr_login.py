@@ -0,0 +1,27 @@
+"""Printed badge QR codes check delegates in at the door but never log them in"""
+
+import pandas as pd
+
+from lib.badges import badge_payload
+from lib.qr_system import authenticate_with_qr_code, generate_delegate_qr_data, normalize_qr_payload
+
+STAFF = pd.DataFrame({"ID": ["7"], "Full Name": ["Mary Banda"], "Name": ["Mary Banda"],
+                      "Organization": ["ZCCM"]})
+
+
+def test_badge_payload_is_rejected_for_login():
+    success, message, delegate = authenticate_with_qr_code(badge_payload("7", "Mary Banda", "ZCCM"), STAFF)
+    assert not success
+    assert delegate is None
+    assert "door check-in" in message
+
+
+def test_badge_payload_still_parses_for_door_checkin():
+    _, payload = normalize_qr_payload(badge_payload("7", "Mary Banda", "ZCCM"))
+    assert payload["delegate_id"] == "7"
+
+
+def test_login_qr_still_authenticates():
+    success, _, delegate = authenticate_with_qr_code(generate_delegate_qr_data("7", "Mary Banda", "ZCCM"), STAFF)
+    assert success
+    assert delegate["ID"] == "7"
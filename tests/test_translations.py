@@ -0,0 +1,17 @@
+"""Every locale catalog is valid JSON and translates every English key"""
+
+import json
+
+import pytest
+
+from lib import translations
+
+
+@pytest.mark.parametrize("code", sorted(translations.CATALOG_CODES))
+def test_catalog_is_valid_json(code):
+    with open(translations.LOCALES_DIR / f"{code}.json", "r", encoding="utf-8") as f:
+        assert isinstance(json.load(f), dict)
+
+
+def test_no_missing_keys():
+    assert translations.missing_keys() == {}